@@ -0,0 +1,71 @@
+"""
+Measure single-query latency (p50/p99) and recall@k of the index types IndexFactory can
+build, at several corpus sizes, including the type "auto" would pick for each size.
+
+Vectors are synthetic (see index_compression), so no API key is needed. Recall@k is
+measured against exact search. Search parameters are swept to show the speed/recall
+trade-off of VECTOR_INDEX_NPROBE and VECTOR_INDEX_EF_SEARCH.
+
+Usage: python -m benchmarks.ann_latency [sizes, e.g. 1000,10000,50000] [dim]
+"""
+import sys
+import time
+
+import faiss
+import numpy as np
+
+from benchmarks.index_compression import recall_at_k, synthetic_embeddings
+from src.knowledgeBase.IndexFactory import build_faiss_index, resolve_index_type, tune_index
+
+# (index type, search parameter name, values swept)
+CONFIGS = [
+    ("flat", None, [None]),
+    ("hnsw", "ef_search", [16, 64, 256]),
+    ("ivf", "nprobe", [4, 16, 64]),
+]
+
+
+def latencies_ms(index, queries, k):
+    timings = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), k)
+        timings.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+    return np.asarray(timings), found
+
+
+def main(sizes=(1_000, 10_000, 50_000), dim=768, k=10, n_queries=500):
+    queries = synthetic_embeddings(n_queries, dim, seed=1)
+    print(f"dim {dim}, {n_queries} single queries, recall@{k}")
+    print(f"{'vectors':>8}  {'index':<13}{'param':<16}{'build (s)':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'recall':>8}")
+
+    for n_vectors in sizes:
+        vectors = synthetic_embeddings(n_vectors, dim)
+        exact = faiss.IndexFlatL2(dim)
+        exact.add(vectors)
+        _, truth = exact.search(queries, k)
+        auto_type = resolve_index_type("auto", n_vectors)
+
+        for index_type, param, values in CONFIGS:
+            start = time.perf_counter()
+            index = build_faiss_index(vectors, index_type)
+            index.add(vectors)
+            build_seconds = time.perf_counter() - start
+
+            for value in values:
+                if param:
+                    tune_index(index, **{param: value})
+                timings, found = latencies_ms(index, queries, k)
+                label = index_type + (" (auto)" if index_type == auto_type else "")
+                print(f"{n_vectors:>8}  {label:<13}{f'{param}={value}' if param else '-':<16}"
+                      f"{build_seconds:>10.2f}{np.percentile(timings, 50):>10.3f}"
+                      f"{np.percentile(timings, 99):>10.3f}{recall_at_k(found, truth, k):>8.3f}")
+
+
+if __name__ == "__main__":
+    main(
+        tuple(int(size) for size in sys.argv[1].split(",")) if len(sys.argv) > 1 else (1_000, 10_000, 50_000),
+        int(sys.argv[2]) if len(sys.argv) > 2 else 768
+    )
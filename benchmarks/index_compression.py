@@ -0,0 +1,58 @@
+"""
+Compare memory footprint and recall of the FAISS index types offered by IndexFactory.
+
+Vectors are synthetic (clustered points on a low-dimensional subspace, like sentence
+embeddings), so no API key is needed. Recall@k is measured against exact search on the uncompressed vectors.
+
+Usage: python -m benchmarks.index_compression [n_vectors] [dim]
+"""
+import sys
+import time
+
+import faiss
+import numpy as np
+
+from src.knowledgeBase.IndexFactory import build_faiss_index, index_description, index_memory_bytes
+
+
+def synthetic_embeddings(n_vectors, dim, latent_dim=64, n_clusters=64, seed=0):
+    # Fixed projection and centers so queries and corpus share the same subspace
+    projection = np.random.default_rng(42).normal(size=(latent_dim, dim))
+    centers = np.random.default_rng(43).normal(size=(n_clusters, latent_dim))
+    rng = np.random.default_rng(seed)
+    latent = centers[rng.integers(0, n_clusters, size=n_vectors)] + 0.5 * rng.normal(size=(n_vectors, latent_dim))
+    vectors = latent @ projection + 0.05 * rng.normal(size=(n_vectors, dim))
+    return vectors.astype(np.float32)
+
+
+def recall_at_k(found, truth, k):
+    return float(np.mean([len(set(f[:k]) & set(t[:k])) / k for f, t in zip(found, truth)]))
+
+
+def main(n_vectors=20_000, dim=768, k=10, n_queries=200):
+    vectors = synthetic_embeddings(n_vectors, dim)
+    queries = synthetic_embeddings(n_queries, dim, seed=1)
+
+    exact = faiss.IndexFlatL2(dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    print(f"{n_vectors} vectors, dim {dim}, {n_queries} queries, recall@{k}")
+    print(f"{'index':<22}{'memory (MB)':>12}{'ratio':>8}{'recall':>9}{'ms/query':>10}")
+    flat_bytes = index_memory_bytes(exact)
+    for index_type in ("flat", "sq8", "ivfpq"):
+        for pca_dim in (None, 256):
+            index = build_faiss_index(vectors, index_type, pca_dim)
+            index.add(vectors)
+            start = time.perf_counter()
+            _, found = index.search(queries, k)
+            elapsed = (time.perf_counter() - start) * 1000 / n_queries
+
+            size = index_memory_bytes(index)
+            print(f"{index_description(dim, n_vectors, index_type, pca_dim):<22}"
+                  f"{size / 1e6:>12.1f}{flat_bytes / size:>7.1f}x"
+                  f"{recall_at_k(found, truth, k):>9.3f}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
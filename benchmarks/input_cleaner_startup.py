@@ -0,0 +1,74 @@
+"""
+Measure the startup cost of InputCleaner: import, first construction, first clean (which
+loads the stop words), and the construction every Streamlit rerun pays.
+
+Each measurement of the cold start runs in a fresh interpreter with outgoing sockets
+blocked and counted, so any network I/O during initialization shows up as attempts.
+
+Usage: python -m benchmarks.input_cleaner_startup [reruns]
+"""
+import json
+import subprocess
+import sys
+import time
+
+COLD_START = """
+import json, socket, time
+attempts = []
+def blocked(self, *args, **kwargs):
+    attempts.append(args)
+    raise OSError("network disabled by benchmark")
+socket.socket.connect = blocked
+socket.socket.connect_ex = blocked
+
+started = time.perf_counter()
+from src.interface.chat.InputCleaner import InputCleaner
+imported = time.perf_counter()
+cleaner = InputCleaner()
+constructed = time.perf_counter()
+cleaner.clean_input("Qual é a capital do Brasil? What is the capital of Brazil?")
+cleaned = time.perf_counter()
+
+reruns = {reruns}
+for _ in range(reruns):
+    InputCleaner().clean_input("Qual é a capital do Brasil?")
+rerun_end = time.perf_counter()
+
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "first_clean_ms": (cleaned - constructed) * 1000,
+    "rerun_us": (rerun_end - cleaned) / reruns * 1e6,
+    "network_attempts": len(attempts),
+    "stop_words": len(cleaner.stop_words),
+}}))
+"""
+
+
+def cold_start(reruns):
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START.format(reruns=reruns)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(reruns=1000, runs=5):
+    results = [cold_start(reruns) for _ in range(runs)]
+    print(f"{runs} cold starts, {reruns} reruns each (median)")
+    for key in ("import_ms", "construct_ms", "first_clean_ms", "rerun_us"):
+        values = sorted(result[key] for result in results)
+        print(f"  {key:<16} {values[len(values) // 2]:10.3f}")
+    print(f"  {'network_attempts':<16} {max(result['network_attempts'] for result in results):10d}")
+    print(f"  {'stop_words':<16} {results[0]['stop_words']:10d}")
+
+    # Batch cleaning throughput in this process
+    from src.interface.chat.InputCleaner import InputCleaner
+    texts = ["Quais são os principais pontos do documento sobre a reforma tributária?"] * 10_000
+    started = time.perf_counter()
+    InputCleaner().clean_many(texts)
+    print(f"clean_many: {(time.perf_counter() - started) / len(texts) * 1e6:.2f} us/text")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,79 @@
+"""
+Measure the latency of a Streamlit rerun of the whole app with AppTest.
+
+The Gemini clients are constructed for real (with a dummy API key), but their network
+calls are replaced by offline fakes and outgoing sockets are blocked, so the numbers
+only reflect the app's own work. Two modes are compared:
+
+- shared: the normal app, where AppResources builds the heavyweight objects once
+- rebuilt: the resource caches are dropped before every rerun, which is what the app
+  did before (three embeddings clients, helpers and the background image per rerun)
+
+Usage: python -m benchmarks.rerun_latency [reruns]
+"""
+import os
+import socket
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+# Keys AppResources keeps per session
+SESSION_RESOURCES = ("_pdf_vector_helper", "_web_vector_helper")
+
+
+def install_stubs():
+    """Use a dummy API key, fake the Gemini network calls and block outgoing sockets."""
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    fake = DeterministicFakeEmbedding(size=768)
+    GoogleGenerativeAIEmbeddings.embed_documents = lambda self, texts, *args, **kwargs: fake.embed_documents(texts)
+    GoogleGenerativeAIEmbeddings.embed_query = lambda self, text, *args, **kwargs: fake.embed_query(text)
+
+    def blocked(*args, **kwargs):
+        raise OSError("network disabled by benchmark")
+
+    socket.socket.connect = blocked
+    socket.create_connection = blocked
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def measure(reruns, rebuild):
+    import streamlit as st
+
+    at = AppTest.from_file("app.py", default_timeout=60)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    timings = []
+    for _ in range(reruns):
+        if rebuild:
+            st.cache_resource.clear()
+            for key in SESSION_RESOURCES:
+                if key in at.session_state:
+                    del at.session_state[key]
+        started = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(reruns=20):
+    install_stubs()
+    print(f"{reruns} reruns of app.py (ms)")
+    print(f"{'mode':<10} {'p50':>8} {'p95':>8} {'max':>8}")
+    for mode, rebuild in (("shared", False), ("rebuilt", True)):
+        timings = measure(reruns, rebuild)
+        print(f"{mode:<10} {percentile(timings, 0.5):8.1f} {percentile(timings, 0.95):8.1f} {max(timings):8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,116 @@
+import base64
+
+import streamlit as st
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+from src.interface.chat.InputCleaner import InputCleaner
+from src.knowledgeBase.EmbeddingCache import CachedEmbeddings
+from src.knowledgeBase.EmbeddingScheduler import EmbeddingScheduler
+from src.knowledgeBase.PdfVectorHelper import PdfVectorHelper
+from src.knowledgeBase.WebVectorHelper import WebVectorHelper
+from src.knowledgeBase.WikiHelper import WikiHelper
+from src.promptConfig.GeminiHelper import GeminiHelper
+
+# Background of the app, relative to the directory the app is started from
+BACKGROUND_IMAGE_PATH = "src/interface/utils/img.png"
+
+# Heavyweight objects are built here once, instead of by the UI classes on every rerun:
+# process-wide ones with st.cache_resource, per-session ones in st.session_state.
+
+
+@st.cache_resource(show_spinner=False)
+def get_embeddings():
+    """
+    Return the embeddings client shared by every helper and session.
+
+    One scheduler means one rate limiter for the whole process, in front of the
+    shared on-disk cache.
+
+    Returns:
+        CachedEmbeddings: Cached, batched and rate-limited Gemini embeddings
+    """
+    return CachedEmbeddings(EmbeddingScheduler(GoogleGenerativeAIEmbeddings(model="models/embedding-001")))
+
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_helper():
+    """
+    Return the process-wide GeminiHelper.
+
+    Returns:
+        GeminiHelper: Helper over the shared Gemini clients
+    """
+    return GeminiHelper()
+
+
+@st.cache_resource(show_spinner=False)
+def get_wiki_helper():
+    """
+    Return the process-wide WikiHelper, with its cache connection and offline index.
+
+    Returns:
+        WikiHelper: The shared helper
+    """
+    return WikiHelper()
+
+
+@st.cache_resource(show_spinner=False)
+def get_input_cleaner():
+    """
+    Return the process-wide InputCleaner.
+
+    Returns:
+        InputCleaner: The shared cleaner
+    """
+    return InputCleaner()
+
+
+@st.cache_resource(show_spinner=False)
+def get_background_css(image_path=BACKGROUND_IMAGE_PATH):
+    """
+    Return the CSS setting the app background, reading and encoding the image once.
+
+    Args:
+        image_path (str): PNG file to use as background
+
+    Returns:
+        str: <style> block with the image inlined as base64
+    """
+    with open(image_path, "rb") as img_file:
+        base64_img = base64.b64encode(img_file.read()).decode()
+
+    return f"""
+            <style>
+            .stApp {{
+                background-image: url("data:image/png;base64,{base64_img}");
+                background-size: cover;
+            }}
+            </style>
+            """
+
+
+def _session_resource(key, build):
+    """Return the object stored under key in this session, building it on first use."""
+    if key not in st.session_state:
+        st.session_state[key] = build()
+    return st.session_state[key]
+
+
+def get_pdf_vector_helper():
+    """
+    Return this session's PdfVectorHelper (its store path depends on the session).
+
+    Returns:
+        PdfVectorHelper: The session's helper, using the shared embeddings
+    """
+    return _session_resource("_pdf_vector_helper", lambda: PdfVectorHelper(embeddings=get_embeddings()))
+
+
+def get_web_vector_helper():
+    """
+    Return this session's WebVectorHelper (its store path depends on the session).
+
+    Returns:
+        WebVectorHelper: The session's helper, using the shared embeddings
+    """
+    return _session_resource("_web_vector_helper", lambda: WebVectorHelper(embeddings=get_embeddings()))
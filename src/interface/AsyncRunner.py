@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import TimeoutError
+
+
+class AsyncRunner:
+    def __init__(self):
+        """
+        Initialize a process-wide event loop running on a background thread.
+
+        Streamlit scripts are synchronous, so each session hands its coroutines to this
+        loop and waits for the result. The I/O waits of every user then overlap on one
+        loop instead of each blocking its own thread inside the backend clients.
+        """
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="async-runner", daemon=True).start()
+            return self._loop
+
+    def run(self, coroutine, timeout=None):
+        """
+        Run a coroutine on the shared loop and wait for its result.
+
+        Args:
+            coroutine: The coroutine to run
+            timeout (float, optional): Seconds to wait before giving up; the coroutine
+                is then cancelled and TimeoutError raised
+
+        Returns:
+            The coroutine's result (its exception is raised here)
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, async_iterable, timeout=None):
+        """
+        Consume an async iterator from synchronous code, e.g. to render a streamed answer.
+
+        Args:
+            async_iterable: Async iterable (such as an async generator) to consume
+            timeout (float, optional): Seconds to wait for each item, see run
+
+        Yields:
+            Its items, as soon as each one is produced
+        """
+        iterator = async_iterable.__aiter__()
+
+        async def next_item():
+            return await iterator.__anext__()
+
+        finished = False
+        try:
+            while True:
+                try:
+                    yield self.run(next_item(), timeout)
+                except StopAsyncIteration:
+                    finished = True
+                    return
+        finally:
+            # The consumer stopped early: let the generator clean up on the loop
+            if not finished and hasattr(iterator, "aclose"):
+                self.run(iterator.aclose())
+
+
+# Shared by every session in the process
+async_runner = AsyncRunner()
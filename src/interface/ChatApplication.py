@@ -1,22 +1,39 @@
+import os
+import uuid
+
 import streamlit as st
 
+from src.interface.AppResources import (get_embeddings, get_gemini_helper, get_input_cleaner,
+                                        get_pdf_vector_helper, get_web_vector_helper, get_wiki_helper)
+from src.interface.AsyncRunner import async_runner
 from src.interface.chat.ChatHistoryManager import ChatHistoryManager
 from src.interface.chat.ChatRenderer import ChatRenderer
-from src.promptConfig.GeminiHelper import GeminiHelper
-from src.interface.chat.InputCleaner import InputCleaner
-from src.knowledgeBase.PdfVectorHelper import PdfVectorHelper
-from src.knowledgeBase.WebVectorHelper import WebVectorHelper
-from src.knowledgeBase.WikiHelper import WikiHelper
+from src.knowledgeBase.RetrievalFanout import RetrievalFanout
+from src.promptConfig.GeminiHelper import ErrorText
+from src.promptConfig.AnswerCache import get_answer_cache
+from src.promptConfig.HistoryWindow import HistoryWindow
 
 
 class ChatApplication:
     def __init__(self):
         self.chat_manager = ChatHistoryManager()
-        self.pdf_vector_helper = PdfVectorHelper()
-        self.web_vector_helper = WebVectorHelper()
-        self.gemini_helper = GeminiHelper()
-        self.cleaner = InputCleaner()
-        self.wiki_helper = WikiHelper()
+        # Built once per process or session by AppResources, not on every rerun
+        self.pdf_vector_helper = get_pdf_vector_helper()
+        self.web_vector_helper = get_web_vector_helper()
+        self.gemini_helper = get_gemini_helper()
+        self.cleaner = get_input_cleaner()
+        self.wiki_helper = get_wiki_helper()
+        self.answer_cache = get_answer_cache(get_embeddings())
+        # Same history policy for the RAG and direct Gemini paths
+        self.history_window = HistoryWindow(self.gemini_helper.summarize_history)
+        # Queries every enabled source at once when more than one is on
+        self.fanout = RetrievalFanout()
+        # Longest wait for retrieval, and then for each piece of the streamed answer
+        self.turn_timeout = float(os.getenv("CHAT_TURN_TIMEOUT", "60"))
+        # Internet answers depend on no store, so they are only shared within this session
+        if "answer_cache_session" not in st.session_state:
+            st.session_state.answer_cache_session = uuid.uuid4().hex
+        self.session_id = st.session_state.answer_cache_session
 
     def render_clear_chat_button(self):
         """Render button to clear chat history and vector stores."""
@@ -42,6 +59,144 @@ class ChatApplication:
             # Rerun to refresh the UI
             st.rerun()
 
+    @staticmethod
+    def _track_failure(chunks, status):
+        """Pass the chunks through, setting status["failed"] if generation reported an error."""
+        for chunk in chunks:
+            if isinstance(chunk, ErrorText):
+                status["failed"] = True
+            yield chunk
+
+    def _retrieval_sources(self, input_text, toggles):
+        """
+        Return the retrieval sources enabled by the toggles that have content.
+
+        Args:
+            input_text (str): The question as typed (Wikipedia searches work better uncleaned)
+            toggles (dict): Whether "wikipedia", "web" and "pdfs" are enabled and have content
+
+        Returns:
+            dict: Source name -> async callable(question) returning Documents
+        """
+        sources = {}
+        if toggles["wikipedia"]:
+            sources["Wikipedia"] = lambda _: self.wiki_helper.asearch_documents(input_text)
+        if toggles["web"]:
+            sources["Web"] = self.web_vector_helper.aget_relevant_documents
+        if toggles["pdfs"]:
+            sources["PDFs"] = self.pdf_vector_helper.aget_relevant_documents
+        return sources
+
+    async def _astore_plan(self, helper, question, chat_history, emoji, notices):
+        """Retrieve from one vector store and start the RAG answer, or return None if nothing was found."""
+        try:
+            docs = await helper.aget_relevant_documents(question)
+        except Exception as e:
+            notices.append(("error", f"Error retrieving documents: {e}", None))
+            return None
+        if not docs:
+            return None
+
+        return {
+            "chunks": self.gemini_helper.astream_rag_response({
+                "context": docs,
+                "question": question,
+                "chat_history": chat_history
+            }),
+            "emoji": emoji,
+            "answer_scope": (helper.vector_store_path, docs, helper.get_store_version()),
+            "notices": notices
+        }
+
+    async def aplan_response(self, input_text, clean_input, chat_history, toggles):
+        """
+        Async orchestrator of a chat turn: pick the sources, retrieve, and set up generation.
+
+        Runs on the shared event loop and does not use Streamlit, so the I/O waits of
+        every session overlap instead of each holding a thread.
+
+        Args:
+            input_text (str): The question as typed
+            clean_input (str): The question after InputCleaner
+            chat_history (str): Previous conversation, as built by HistoryWindow
+            toggles (dict): Whether "wikipedia", "web" and "pdfs" are enabled and have content
+
+        Returns:
+            dict: "chunks" (list, or async iterator of the streamed answer), "emoji",
+                "answer_scope" for the answer cache (None = not cacheable) and "notices",
+                (kind, message, icon) tuples for the UI to show
+        """
+        notices = []
+        sources = self._retrieval_sources(input_text, toggles)
+
+        if len(sources) > 1:
+            # Fan-out RAG response over every enabled source
+            notices.append(("toast", f"Your questions will be answered based on {', '.join(sources)}.", "🔀"))
+            # Per-source latency and outcomes accumulate in self.fanout.stats()
+            retrieval = await self.fanout.aretrieve(sources, clean_input)
+            for name, report in retrieval["sources"].items():
+                if report["status"] == "timeout":
+                    notices.append(("warning", f"{name} did not answer in time and was skipped.", None))
+                elif report["status"] == "failed":
+                    notices.append(("warning", f"{name} retrieval failed: {report['error']}", None))
+
+            if retrieval["docs"]:
+                # The answer depends on every enabled store; versions only grow, so their sum changes with any of them
+                version = (self.web_vector_helper.get_store_version() if "Web" in sources else 0) + \
+                    (self.pdf_vector_helper.get_store_version() if "PDFs" in sources else 0)
+                return {
+                    "chunks": self.gemini_helper.astream_rag_response({
+                        "context": retrieval["docs"],
+                        "question": clean_input,
+                        "chat_history": chat_history
+                    }),
+                    "emoji": "🔀AI",
+                    "answer_scope": ("fanout:" + ",".join(sorted(sources)), retrieval["docs"], version),
+                    "notices": notices
+                }
+            # Fallback to internet response if no source found anything
+            notices.append(("warning", "No relevant content found in the selected sources. "
+                                       "Using internet-based response.", None))
+
+        elif toggles["wikipedia"]:
+            # Wikipedia-based response
+            notices.append(("toast", "Your questions will be answered using Wikipedia.", "🌐"))
+            return {
+                "chunks": [await self.wiki_helper.asearch_wikipedia(input_text)],
+                "emoji": "🌐AI",
+                "answer_scope": None,
+                "notices": notices
+            }
+
+        elif toggles["web"]:
+            # Web-based RAG response
+            notices.append(("toast", "Your questions will be answered based on the web page content.", "📄"))
+            plan = await self._astore_plan(self.web_vector_helper, clean_input, chat_history, "📄AI", notices)
+            if plan is not None:
+                return plan
+            # Fallback to internet response if no relevant web docs found
+            notices.append(("warning", "No relevant web content found. Using internet-based response.", None))
+
+        elif toggles["pdfs"]:
+            # PDF-based RAG response
+            notices.append(("toast", "Your questions will be answered based on the PDFs.", "📂"))
+            plan = await self._astore_plan(self.pdf_vector_helper, clean_input, chat_history, "📂AI", notices)
+            if plan is not None:
+                return plan
+            # Fallback to internet response if no relevant PDF docs found
+            notices.append(("warning", "No relevant PDF context found. Using internet-based response.", None))
+
+        else:
+            # Default to internet response if no toggle is selected
+            notices.append(("toast", "Your questions will be answered using the internet.", "🛜"))
+
+        return {
+            "chunks": self.gemini_helper.astream_gemini_response(question=clean_input, chat_history=chat_history),
+            "emoji": "🛜AI",
+            "answer_scope": ("internet:" + self.session_id, [], 0),
+            "notices": notices
+        }
+
     def process_user_input(self, input_text):
         """Process and handle user input based on selected toggles."""
         try:
@@ -50,76 +205,52 @@ class ChatApplication:
             self.chat_manager.add_message("User", input_text)  # preserve the original input for display
             self.chat_manager.render_chat_history()
 
-            # Determine response generation method based on toggles
-            if st.session_state.wikipedia_toggle:
-                # Wikipedia-based response
-                st.toast("Your questions will be answered using Wikipedia.", icon="🌐")
-                response = self.wiki_helper.search_wikipedia(input_text)
-                emoji = "🌐AI"
-
-            elif st.session_state.web_toggle and not st.session_state.hasNoWeb:
-                # Web-based RAG response
-                st.toast("Your questions will be answered based on the web page content.", icon="📄")
-                # Get related chunks from the web vector store
-                web_docs = self.web_vector_helper.get_relevant_documents(clean_input)
-
-                if web_docs:
-                    # Create the conversational chain
-                    chain = self.gemini_helper.create_rag_chain()
-                    response = chain.invoke({
-                        "context": web_docs,
-                        "question": clean_input,
-                        "chat_history": self.chat_manager.get_chat_history()
-                    })
-                    emoji = "📄AI"
-                else:
-                    # Fallback to internet response if no relevant web_docs found
-                    st.warning("No relevant web content found. Using internet-based response.")
-                    response = self.gemini_helper.get_gemini_response(
-                        question=clean_input,
-                        chat_history=self.chat_manager.get_chat_history()
-                    )
-                    emoji = "🛜AI"
-                    st.warning("No relevant web content found. Using internet-based response.")
-
-            elif st.session_state.pdfs_toggle and not st.session_state.hasNoPdf:
-                # PDF-based RAG response
-                st.toast("Your questions will be answered based on the PDFs.", icon="📂")
-                # Get related chunks from the vector store
-                pdf_docs = self.pdf_vector_helper.get_relevant_documents(clean_input)
-
-                if pdf_docs:
-                    # Create the conversational chain
-                    chain = self.gemini_helper.create_rag_chain()
-                    response = chain.invoke({
-                        "context": pdf_docs,
-                        "question": clean_input,
-                        "chat_history": self.chat_manager.get_chat_history()
-                    })
-                    emoji = "📂AI"
+            # Recent turns verbatim plus a summary of older ones, without the question itself.
+            # Message and token counts accumulate in history_window.stats() and the memory's stats()
+            chat_history = self.history_window.build(self.chat_manager.get_memory(),
+                                                     self.chat_manager.get_chat_history()[:-1])["text"]
+
+            # Snapshot the toggles here: the orchestrator runs on the shared event loop, away from Streamlit
+            toggles = {
+                "wikipedia": st.session_state.wikipedia_toggle,
+                "web": st.session_state.web_toggle and not st.session_state.hasNoWeb,
+                "pdfs": st.session_state.pdfs_toggle and not st.session_state.hasNoPdf
+            }
+            plan = async_runner.run(self.aplan_response(input_text, clean_input, chat_history, toggles),
+                                    timeout=self.turn_timeout)
+
+            for kind, message, icon in plan["notices"]:
+                if kind == "toast":
+                    st.toast(message, icon=icon)
                 else:
-                    # Fallback to internet response if no relevant pdf_docs found
-                    st.warning("No relevant PDF context found. Using internet-based response.")
-                    response = self.gemini_helper.get_gemini_response(
-                        question=clean_input,
-                        chat_history=self.chat_manager.get_chat_history()
-                    )
-                    emoji = "🛜AI"
-                    st.warning("No relevant PDF context found. Using internet-based response.")
-
-            else:
-                # Default to internet response if no toggle is selected
-                st.toast("Your questions will be answered using the internet.", icon="🛜")
-                response = self.gemini_helper.get_gemini_response(
-                    question=clean_input,
-                    chat_history=self.chat_manager.get_chat_history()
-                )
-                emoji = "🛜AI"
-
-            # Add AI message to chat history
+                    getattr(st, kind)(message)
+
+            response_chunks = plan["chunks"]
+            emoji = plan["emoji"]
+            # Source, retrieved chunks and store version the answer depends on (None = not cacheable)
+            answer_scope = plan["answer_scope"]
+
+            # Serve repeated questions from the answer cache instead of calling Gemini
+            cached_answer = None
+            if answer_scope:
+                cached_answer = self.answer_cache.lookup(input_text, *answer_scope, chat_history=chat_history)
+                if cached_answer is not None:
+                    response_chunks = [cached_answer]
+
+            # Render the answer as it streams in, then commit the full text to chat history
+            if hasattr(response_chunks, "__aiter__"):
+                # Generation was started on the event loop; pull the chunks from there
+                response_chunks = async_runner.iterate(response_chunks, timeout=self.turn_timeout)
+            # A stream can fail after part of the answer was sent; such answers are not cached
+            status = {"failed": False}
+            response = ChatRenderer.render_stream(emoji, self._track_failure(response_chunks, status))
             self.chat_manager.add_message(emoji, response)
-            ChatRenderer.render_message(emoji, response, True)
 
+            if answer_scope and cached_answer is None and not status["failed"]:
+                self.answer_cache.store(input_text, *answer_scope, response, chat_history=chat_history)
+
+        except TimeoutError:
+            st.error(f"No answer after {self.turn_timeout:.0f} seconds. Please try again.")
         except Exception as e:
             st.error(f"An error occurred: {e}")
 
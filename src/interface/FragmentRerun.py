@@ -0,0 +1,15 @@
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+
+def rerun_fragment():
+    """
+    Rerun only the fragment being executed, or the whole app if this is a full run.
+
+    st.rerun(scope="fragment") is only allowed during a fragment rerun, while the
+    sidebar and chat fragments also execute as part of full app runs.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
@@ -0,0 +1,48 @@
+import streamlit as st
+
+from src.knowledgeBase.IngestionQueue import STAGES, ingestion_queue
+
+
+class IngestionProgress:
+    @staticmethod
+    def finished_job(job_key):
+        """
+        Return the job stored under a session key once it has finished.
+
+        Args:
+            job_key (str): st.session_state key holding the job id
+
+        Returns:
+            dict: Final job state (see IngestionJob.snapshot), or None while it is still
+                queued or running
+        """
+        job = ingestion_queue.get(st.session_state.get(job_key))
+        if job is None:
+            # Unknown job (e.g. the server restarted): treat it as failed
+            return {"status": "failed", "error": "The ingestion job was lost.", "result": None}
+        return None if job["status"] in ("queued", "running") else job
+
+    @staticmethod
+    @st.fragment(run_every=1.0)
+    def render(job_key):
+        """
+        Show per-stage progress of a background ingestion job, refreshed every second.
+
+        Only this fragment reruns while the job is active, so the chat stays usable.
+        When the job finishes, the whole app reruns to pick up the result.
+
+        Args:
+            job_key (str): st.session_state key holding the job id
+        """
+        job = ingestion_queue.get(st.session_state.get(job_key))
+        if job is None or job["status"] not in ("queued", "running"):
+            st.rerun()
+
+        if job["status"] == "queued":
+            st.caption("Waiting for another job on this store...")
+        for stage in STAGES:
+            done, total = job["progress"][stage]
+            st.progress(done / total if total else 0.0, text=f"{stage.capitalize()}: {done}/{total}")
+
+        if st.button("Cancel", key=f"{job_key}_cancel"):
+            ingestion_queue.cancel(job["id"])
@@ -1,21 +1,21 @@
+import os
+
 import streamlit as st
+from src.interface.AppResources import get_background_css
 from src.interface.ChatApplication import ChatApplication
-from src.interface.chat.ChatHistoryManager import ChatHistoryManager
-from src.interface.chat.InputCleaner import InputCleaner
 from src.interface.PdfSideBar import PdfSideBar
 from src.interface.WebSideBar import WebSideBar
-import base64
-
+from src.knowledgeBase.SessionStores import session_stores
 
 
 class Interface:
     def __init__(self):
         """Initialize the interface with the chat application."""
+        # The UI classes are cheap; the helpers they use come from AppResources
         self.app = ChatApplication()
-        self.chat_manager = ChatHistoryManager()
+        self.chat_manager = self.app.chat_manager
         self.pdf_sidebar = PdfSideBar()
         self.web_sidebar = WebSideBar()
-        self.cleaner = InputCleaner()
         self._initialize_page_config()
         self._initialize_session_state()
 
@@ -25,26 +25,8 @@ class Interface:
         st.set_page_config(page_title="LangChain Chat with Google Generative AI", layout="wide")
         st.header("LangChain Chat with Google Generative AI")
 
-        # Function to encode image
-        def get_base64_image(image_path):
-            with open(image_path, "rb") as img_file:
-                return base64.b64encode(img_file.read()).decode()
-
-        image_path = "src/interface/utils/img.png"  # Update if necessary
-        base64_img = get_base64_image(image_path)
-
-        # Apply custom CSS for background image
-        st.markdown(
-            f"""
-            <style>
-            .stApp {{
-                background-image: url("data:image/png;base64,{base64_img}");
-                background-size: cover;
-            }}
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
+        # Apply custom CSS for background image (encoded once per process)
+        st.markdown(get_background_css(), unsafe_allow_html=True)
 
     @staticmethod
     def _initialize_session_state():
@@ -59,11 +41,14 @@ class Interface:
             if key not in st.session_state:
                 st.session_state[key] = default_value
 
-    def run(self):
-        """Main application runner."""
-        # Clear chat history button
-        self.app.render_clear_chat_button()
+    @st.fragment
+    def render_chat(self):
+        """
+        Render the chat panel.
 
+        A fragment: typing a question or flipping a toggle reruns only this panel,
+        not the sidebars.
+        """
         # Response and input containers
         with st.container():
             st.subheader("Chat History:")
@@ -71,6 +56,8 @@ class Interface:
                 # Process input if available
                 input_text = st.session_state['input_holder']
                 if input_text:
+                    # Fragment reruns skip main(), so keep the session's stores alive here
+                    session_stores.touch()
                     self.app.process_user_input(input_text)
                     st.session_state.input_holder = ''
                 else:
@@ -79,22 +66,48 @@ class Interface:
                 # Render input interface
                 self.app.create_input_interface()
 
+    @st.fragment
+    def render_pdf_sidebar(self):
+        """Render the PDF sidebar section as a fragment, rerun only by its own widgets."""
+        self.pdf_sidebar.render()
+
+    @st.fragment
+    def render_web_sidebar(self):
+        """Render the Web sidebar section as a fragment, rerun only by its own widgets."""
+        self.web_sidebar.render()
+
+    def run(self):
+        """Main application runner."""
+        # Clear chat history button (resets every panel, so it reruns the whole app)
+        self.app.render_clear_chat_button()
+
+        self.render_chat()
+
         with st.sidebar:
             st.title("Menu:")
 
             # Render PDF sidebar section
-            self.pdf_sidebar.render()
+            self.render_pdf_sidebar()
 
             # Add some spacing between sections
             st.markdown("---")
 
             # Render Web sidebar section
-            self.web_sidebar.render()
+            self.render_web_sidebar()
 
 
 def main():
     """Entry point for the Streamlit application."""
     interface = Interface()
+
+    # Keep this session's vector stores alive and delete those of abandoned sessions
+    session_stores.touch()
+    session_stores.collect_idle()
+
+    # Optionally build the Gemini clients and RAG chain before the first question
+    if os.getenv("GEMINI_WARMUP"):
+        interface.app.gemini_helper.warm_up(ping=os.getenv("GEMINI_WARMUP") == "ping")
+
     interface.run()
 
 
@@ -1,10 +1,12 @@
 import streamlit as st
-from src.knowledgeBase.PdfVectorHelper import PdfVectorHelper
+from src.interface.AppResources import get_pdf_vector_helper
+from src.interface.FragmentRerun import rerun_fragment
+from src.interface.IngestionProgress import IngestionProgress
 
 
 class PdfSideBar:
     def __init__(self):
-        self.pdf_vector_helper = PdfVectorHelper()
+        self.pdf_vector_helper = get_pdf_vector_helper()
 
         # Initialize processing state if not exists
         if 'processing_pdf' not in st.session_state:
@@ -28,34 +30,58 @@ class PdfSideBar:
         if st.button("Process PDFs",
                      disabled=(not pdf_docs or st.session_state.processing_pdf),
                      key='process_pdf_button'):
-            # Set processing to True
+            # Index in the background; the chat stays usable meanwhile
+            st.session_state.pdf_job = self.pdf_vector_helper.submit_pdfs(pdf_docs)
             st.session_state.processing_pdf = True
-            # Trigger a rerun
-            st.rerun()
+            # Rerun this sidebar section only
+            rerun_fragment()
 
-        # If processing PDF is true, run the actual processing
+        # While processing, poll the job instead of blocking the script
         if st.session_state.processing_pdf:
-            try:
-                with st.spinner("Processing PDFs..."):
-                    self.pdf_vector_helper.process_pdf(pdf_docs)
-                # Set a success flag before rerun
-                st.session_state.processing_pdf_success = True
-            except Exception as e:
-                st.error(f"PDF processing failed: {e}")
-            finally:
-                # Always reset processing state
+            job = IngestionProgress.finished_job('pdf_job')
+            if job is None:
+                IngestionProgress.render('pdf_job')
+            else:
+                # Keep the outcome for the next run, then reset processing state
+                st.session_state.processing_pdf_result = job
                 st.session_state.processing_pdf = False
-                st.session_state.hasNoPdf = False
-                st.rerun()
+                if job["status"] == "done":
+                    # A removal can leave the index empty
+                    st.session_state.hasNoPdf = not self.pdf_vector_helper.get_manifest()
+                rerun_fragment()
 
-        # Check for PDF success message after rerun
-        if st.session_state.get('processing_pdf_success', False):
-            st.success("PDF processing completed successfully!")
-            # Clear the success flag
-            st.session_state.processing_pdf_success = False
+        # Check for the PDF job outcome after rerun
+        job = st.session_state.pop('processing_pdf_result', None)
+        if job is not None:
+            removal = job.get("kind") == "pdf-remove"
+            if job["status"] == "done":
+                added, removed = job["result"]
+                if removal:
+                    st.success(f"Removed {removed} PDF(s) from the index.")
+                else:
+                    st.success(f"PDF processing completed successfully! ({added} added, {removed} removed)")
+            elif job["status"] == "cancelled":
+                st.info("PDF removal was cancelled." if removal else "PDF processing was cancelled.")
+            else:
+                st.error(f"PDF {'removal' if removal else 'processing'} failed: {job['error']}")
+            if removal and job["status"] != "done":
+                # Don't start the same removal again until the uploads change
+                st.session_state.pdf_remove_skipped = self._upload_names(pdf_docs)
 
         # Clear vector stores if no content
         if not pdf_docs and not st.session_state.processing_pdf:
             self.pdf_vector_helper.clear_vector_store(False)
+        # Drop only the vectors of PDFs removed from the uploader, with progress like an upload
+        elif pdf_docs and not st.session_state.processing_pdf and \
+                st.session_state.get('pdf_remove_skipped') != self._upload_names(pdf_docs):
+            job_id = self.pdf_vector_helper.remove_missing_documents(pdf_docs)
+            if job_id is not None:
+                st.session_state.pdf_job = job_id
+                st.session_state.processing_pdf = True
+                rerun_fragment()
 
-        return pdf_docs
\ No newline at end of file
+        return pdf_docs
+
+    @staticmethod
+    def _upload_names(pdf_docs):
+        return frozenset(getattr(pdf, "name", None) for pdf in pdf_docs or [])
\ No newline at end of file
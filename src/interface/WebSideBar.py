@@ -1,10 +1,12 @@
 import streamlit as st
-from src.knowledgeBase.WebVectorHelper import WebVectorHelper
+from src.interface.AppResources import get_web_vector_helper
+from src.interface.FragmentRerun import rerun_fragment
+from src.interface.IngestionProgress import IngestionProgress
 
 
 class WebSideBar:
     def __init__(self):
-        self.web_vector_helper = WebVectorHelper()
+        self.web_vector_helper = get_web_vector_helper()
 
         # Initialize session state variables if not exist
         if 'processing_web' not in st.session_state:
@@ -46,7 +48,7 @@ class WebSideBar:
                 if cleaned_url not in st.session_state.web_urls:
                     st.session_state.web_urls.append(cleaned_url)
                     # Don't modify session state directly for the widget
-                    st.rerun()
+                    rerun_fragment()
             else:
                 st.warning(f"Please enter a valid URL starting with http:// or https://")
 
@@ -60,35 +62,45 @@ class WebSideBar:
                 with col2:
                     if st.button("❌", key=f"remove_url_{i}", disabled=st.session_state.processing_web):
                         st.session_state.web_urls.pop(i)
-                        st.rerun()
+                        rerun_fragment()
 
         # Process URLs button
         if st.button("Process URLs",
                      disabled=(not st.session_state.web_urls or st.session_state.processing_web),
                      key='process_web_button'):
+            # Fetch and index in the background; the chat stays usable meanwhile
+            st.session_state.web_job = self.web_vector_helper.submit_urls(st.session_state.web_urls)
             st.session_state.processing_web = True
-            st.rerun()
+            rerun_fragment()
 
-        # If processing web is true, run the actual processing
+        # While processing, poll the job instead of blocking the script
         if st.session_state.processing_web:
-            try:
-                with st.spinner("Processing Web Content..."):
-                    self.web_vector_helper.process_urls(st.session_state.web_urls)
-                # Set a success flag before rerun
-                st.session_state.processing_web_success = True
-            except Exception as e:
-                st.error(f"Web processing failed: {e}")
-            finally:
-                # Always reset processing state
+            job = IngestionProgress.finished_job('web_job')
+            if job is None:
+                IngestionProgress.render('web_job')
+            else:
+                # Keep the outcome for the next run, then reset processing state
+                st.session_state.processing_web_result = job
                 st.session_state.processing_web = False
-                st.session_state.hasNoWeb = False
-                st.rerun()
+                if job["status"] == "done" and job["result"]["pages"]:
+                    st.session_state.hasNoWeb = False
+                rerun_fragment()
 
-        # Check for web success message after rerun
-        if st.session_state.get('processing_web_success', False):
-            st.success("Web content processing completed successfully!")
-            # Clear the success flag
-            st.session_state.processing_web_success = False
+        # Check for the web job outcome after rerun
+        job = st.session_state.pop('processing_web_result', None)
+        if job is not None:
+            if job["status"] == "done":
+                # Report failing URLs without discarding the pages that did load
+                for url, error in job["result"]["failures"].items():
+                    st.warning(f"Could not load {url}: {error}")
+                if job["result"]["pages"]:
+                    st.success("Web content processing completed successfully!")
+                else:
+                    st.error("Failed to extract content from the provided URLs.")
+            elif job["status"] == "cancelled":
+                st.info("Web processing was cancelled.")
+            else:
+                st.error(f"Web processing failed: {job['error']}")
 
         # Clear vector stores if no content and not processing
         if not st.session_state.web_urls and not st.session_state.processing_web:
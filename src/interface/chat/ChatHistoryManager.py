@@ -1,8 +1,13 @@
 import streamlit as st
 
+from src.interface.FragmentRerun import rerun_fragment
 from src.interface.chat.ChatRenderer import ChatRenderer
+from src.promptConfig.HistoryWindow import ConversationMemory
 
 class ChatHistoryManager:
+    # Number of messages drawn initially and added by each "load earlier" click
+    PAGE_SIZE = 20
+
     def __init__(self, session_state_key='chat_history'):
         """
         Initialize the ChatHistoryManager.
@@ -11,10 +16,19 @@ class ChatHistoryManager:
             session_state_key (str): Key to use in st.session_state for chat history
         """
         self.session_state_key = session_state_key
+        self.html_cache_key = f"{session_state_key}_html"
+        self.window_key = f"{session_state_key}_window"
+        self.memory_key = f"{session_state_key}_memory"
 
         # Initialize chat history if not exists
         if self.session_state_key not in st.session_state:
             st.session_state[self.session_state_key] = []
+        if self.html_cache_key not in st.session_state:
+            st.session_state[self.html_cache_key] = {}
+        if self.window_key not in st.session_state:
+            st.session_state[self.window_key] = self.PAGE_SIZE
+        if self.memory_key not in st.session_state:
+            st.session_state[self.memory_key] = ConversationMemory()
 
     def add_message(self, role, text):
         """
@@ -36,15 +50,67 @@ class ChatHistoryManager:
         """
         return st.session_state[self.session_state_key]
 
+    def get_memory(self):
+        """
+        Retrieve the rolling summary state of the conversation.
+
+        Returns:
+            ConversationMemory: Summary of the turns older than the history window
+        """
+        return st.session_state[self.memory_key]
+
     def clear_chat_history(self):
         """
         Clear the entire chat history.
         """
         st.session_state[self.session_state_key] = []
+        st.session_state[self.html_cache_key] = {}
+        st.session_state[self.window_key] = self.PAGE_SIZE
+        st.session_state[self.memory_key] = ConversationMemory()
+
+    def _get_message_html(self, message_id, role, text):
+        """
+        Return the rendered HTML of a message, building it only the first time.
+
+        Args:
+            message_id (int): Position of the message in the history (history is append-only)
+            role (str): Role of the message sender
+            text (str): Message text
+
+        Returns:
+            str: HTML fragment for the message
+        """
+        html_cache = st.session_state[self.html_cache_key]
+        if message_id not in html_cache:
+            html_cache[message_id] = ChatRenderer.message_html(role, text)
+        return html_cache[message_id]
 
     def render_chat_history(self):
         """
-        Render the entire chat history.
+        Render the most recent messages of the chat history.
+
+        Only the last window of messages is drawn, in a single element, with a
+        button to page in earlier ones.
         """
-        for role, text in self.get_chat_history():
-            ChatRenderer.render_message(role, text,False)
\ No newline at end of file
+        history = self.get_chat_history()
+        window = st.session_state[self.window_key]
+        first_visible = max(0, len(history) - window)
+
+        if first_visible > 0:
+            if st.button(f"Load earlier messages ({first_visible} hidden)", key="load_earlier_messages"):
+                st.session_state[self.window_key] = window + self.PAGE_SIZE
+                rerun_fragment()
+
+        # Only the visible messages stay cached, so the cache never outgrows the window
+        html_cache = st.session_state[self.html_cache_key]
+        st.session_state[self.html_cache_key] = {message_id: html for message_id, html in html_cache.items()
+                                                 if message_id >= first_visible}
+
+        ChatRenderer.inject_stylesheet()
+        if first_visible < len(history):
+            # Each fragment is a single line, so joining them keeps one HTML block
+            st.markdown(
+                "\n".join(self._get_message_html(message_id, role, text)
+                          for message_id, (role, text) in enumerate(history[first_visible:], start=first_visible)),
+                unsafe_allow_html=True
+            )
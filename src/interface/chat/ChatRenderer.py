@@ -1,129 +1,98 @@
-import random
+import html
 
 import streamlit as st
 import time
 
 
 class ChatRenderer:
+    # Shared stylesheet for the chat history, emitted once per run instead of per message
+    STYLESHEET = """
+        <style>
+        .chat-message {
+            border-radius: 10px;
+            padding: 10px;
+            margin: 5px 0;
+            color: black;
+            width: fit-content;
+        }
+        .chat-message p {
+            margin: 0 0 0.5em 0;
+        }
+        .chat-message p:last-child {
+            margin-bottom: 0;
+        }
+        .chat-message.chat-user {
+            display: block;
+            background-color: #e6ffe6;
+            text-align: right;
+            margin-left: auto;
+        }
+        .chat-message.chat-ai {
+            text-align: left;
+            background-color: #e6f2ff;
+            max-width: 80%;
+            word-wrap: break-word;
+        }
+        </style>
+        """
+
     @staticmethod
-    def render_message(role: str, text: str, typing_effect: bool = True):
+    def inject_stylesheet():
+        """Emit the shared chat stylesheet. Call once per script run before rendering history."""
+        st.markdown(ChatRenderer.STYLESHEET, unsafe_allow_html=True)
+
+    @staticmethod
+    def message_html(role: str, text: str) -> str:
         """
-        Render a chat message with optional typing simulation.
+        Build the HTML for one message, relying on the shared stylesheet.
+
+        The text is escaped and its paragraphs become <p> elements, so the fragment
+        has no blank lines: Markdown ends an HTML block at the first blank line.
 
         Args:
             role (str): The sender of the message (e.g., 'User', 'AI')
             text (str): The message text
-            typing_effect (bool): Whether to simulate typing
-        """
-        if typing_effect:
-            ChatRenderer._render_with_typing(role, text)
-        else:
-            ChatRenderer._render_static(role, text)
 
-    @staticmethod
-    def _render_static(role: str, text: str):
-        if role == "User":
-            """Render message without typing effect."""
-            st.markdown(f"""
-                <div style="
-                    display: block;
-                    background-color: #e6ffe6; 
-                    border-radius: 10px; 
-                    padding: 10px; 
-                    margin: 5px 0;
-                    color: black;
-                    text-align: right;
-                    width: fit-content;
-                    margin-left: auto;
-                ">
-                    <strong>{role}:</strong> {text}
-                </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-                <div style="
-                    text-align: left; 
-                    background-color: #e6f2ff; 
-                    border-radius: 10px; 
-                    padding: 10px; 
-                    margin: 5px 0;
-                    max-width: 80%;
-                    color: black;
-                    width: fit-content;
-                    soft-wrap: break-word;
-                ">
-                    <strong>{role}:</strong> {text}
-                """, unsafe_allow_html=True)
+        Returns:
+            str: HTML fragment for the message, on a single line
+        """
+        css_class = "chat-user" if role == "User" else "chat-ai"
+        paragraphs = [html.escape(paragraph.strip()).replace("\n", "<br>")
+                      for paragraph in text.replace("\r\n", "\n").split("\n\n") if paragraph.strip()] or [""]
+        paragraphs[0] = f"<strong>{html.escape(role)}:</strong> {paragraphs[0]}"
+        body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+        return f'<div class="chat-message {css_class}">{body}</div>'
 
     @staticmethod
-    def _render_with_typing(role: str, text: str, typing_speed: float = 0.005):
+    def render_stream(role: str, chunks, flush_interval: float = 0.05) -> str:
         """
-        Render message with typing simulation.
+        Render a message while its text is still being generated.
+
+        Chunks are appended as they arrive, but the placeholder is only redrawn
+        once per flush_interval so long answers don't re-render on every token.
 
         Args:
             role (str): The sender of the message
-            text (str): The message text
-            typing_speed (float): Delay between each character (in seconds)
+            chunks (iterable): Pieces of the message text, in order
+            flush_interval (float): Minimum time between redraws (in seconds)
+
+        Returns:
+            str: The full message text
         """
-        # Create a placeholder for the typing effect
         placeholder = st.empty()
-
-        # Style configuration for the message container
-        message_style = {
-            "text-align": "left",
-            "background-color": "#e6f2ff",
-            "border-radius": "10px",
-            "padding": "10px",
-            "margin": "5px 0",
-            "max-width": "80%",
-            "color": "black",
-            "width": "fit-content",
-            "word-wrap": "break-word"
-        }
-
-        # Combine base styling with dynamic content
-        def generate_styled_message(current_text):
-            return f"""
-            <div style="{'; '.join(f'{k}: {v}' for k, v in message_style.items())}">
-                <strong>{role}:</strong> {current_text}
-            """
-
-        # Simulate typing
-        displayed_text = ""
-        for char in text:
-            displayed_text += char
-            # Update placeholder with current text
-            placeholder.markdown(
-                generate_styled_message(displayed_text),
-                unsafe_allow_html=True
-            )
-            # Optional: Add slight randomness to typing speed
-            time.sleep(typing_speed + random.uniform(-0.005, 0.005))
+        parts = []
+        last_flush = time.monotonic()
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            parts.append(chunk)
+            now = time.monotonic()
+            if now - last_flush >= flush_interval:
+                placeholder.markdown(ChatRenderer.message_html(role, "".join(parts)), unsafe_allow_html=True)
+                last_flush = now
 
         # Ensure final text is fully displayed
-        placeholder.markdown(
-            generate_styled_message(text),
-            unsafe_allow_html=True
-        )
-
-
-# Example usage in a Streamlit app
-def main():
-    st.title("Typing Effect Demo")
-
-    # Simulate AI typing
-    ChatRenderer.render_message(
-        role="AI",
-        text="Hello! I'm simulating a typing effect in Streamlit. Pretty cool, right?"
-    )
-
-    # Optional: Static message rendering
-    ChatRenderer.render_message(
-        role="User",
-        text="This is a static message without typing.",
-        typing_effect=False
-    )
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+        text = "".join(parts)
+        placeholder.markdown(ChatRenderer.message_html(role, text), unsafe_allow_html=True)
+        return text
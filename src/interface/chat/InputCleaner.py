@@ -1,67 +1,77 @@
 import os
 import re
-import nltk
+import threading
+
+# Stop word lists shipped with the app, one file per language
+STOPWORDS_DIR = os.path.join(os.path.dirname(__file__), "resources", "stopwords")
+# English plus Portuguese, the language most of our users write in
+STOPWORD_LANGUAGES = ("english", "portuguese")
+
+# Used only if the shipped lists are missing
+DEFAULT_STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
+    'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the',
+    'to', 'was', 'were', 'will', 'with'
+})
+
+# Compiled once at import instead of on every call
+_SPECIAL_CHARACTERS = re.compile(r'[^\w\s:?.,!]')
+_WHITESPACE = re.compile(r'\s+')
+
+_stop_words = None
+_stop_words_lock = threading.Lock()
+
+
+def load_stop_words(languages=STOPWORD_LANGUAGES):
+    """
+    Read the shipped stop word lists of the given languages.
+
+    Args:
+        languages (tuple): File names (without .txt) under STOPWORDS_DIR
+
+    Returns:
+        frozenset: The stop words of all languages
+    """
+    words = set()
+    for language in languages:
+        with open(os.path.join(STOPWORDS_DIR, f"{language}.txt"), encoding="utf-8") as f:
+            words.update(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return frozenset(words)
+
+
+def get_stop_words():
+    """
+    Return the process-wide stop word set, reading it on first use.
+
+    Returns:
+        frozenset: English and Portuguese stop words
+    """
+    global _stop_words
+    if _stop_words is None:
+        with _stop_words_lock:
+            if _stop_words is None:
+                try:
+                    _stop_words = load_stop_words()
+                except OSError:
+                    print("Falling back to default stop words list.")
+                    _stop_words = DEFAULT_STOP_WORDS
+    return _stop_words
 
 
 class InputCleaner:
     def __init__(self):
         """
-        Initialize the InputCleaner with robust stop words handling.
-        """
-        # SSL Certificate Bypass
-        try:
-            import ssl
-            _create_unverified_https_context = ssl._create_unverified_context
-        except AttributeError:
-            pass
-        else:
-            ssl._create_default_https_context = _create_unverified_https_context
-
-        # Download NLTK resources
-        self._download_nltk_resources()
-
-        # Predefined fallback stop words
-        self.default_stop_words = {
-            'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
-            'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the',
-            'to', 'was', 'were', 'will', 'with'
-        }
-
-        # Try to load NLTK stop words with fallback
-        try:
-            from nltk.corpus import stopwords
-            self.stop_words = set(stopwords.words('english'))
-        except Exception:
-            print("Falling back to default stop words list.")
-            self.stop_words = self.default_stop_words
-
-    def _download_nltk_resources(self):
-        """
-        Attempt to download NLTK resources with multiple fallback strategies.
+        Initialize the InputCleaner.
+
+        Construction is free: stop words are shared process-wide and loaded from the
+        lists shipped with the app the first time text is cleaned, so reruns do no
+        file or network I/O.
         """
-        # Determine potential download directories
-        potential_dirs = [
-            os.path.join(os.path.expanduser('~'), 'nltk_data'),
-            '/usr/local/share/nltk_data',
-            '/usr/share/nltk_data'
-        ]
-
-        # Try to create a download directory if it doesn't exist
-        for download_dir in potential_dirs:
-            try:
-                os.makedirs(download_dir, exist_ok=True)
-                nltk.data.path.append(download_dir)
-            except Exception:
-                continue
-
-        # List of resources to download
-        resources = ['stopwords', 'punkt']
-
-        for resource in resources:
-            try:
-                nltk.download(resource, quiet=True)
-            except Exception as e:
-                print(f"Warning: Could not download {resource}: {e}")
+        self.default_stop_words = DEFAULT_STOP_WORDS
+
+    @property
+    def stop_words(self):
+        return get_stop_words()
 
     def normalize_text(self, text):
         """
@@ -86,10 +96,10 @@ class InputCleaner:
             str: Cleaned text
         """
         # Keep certain punctuation and formatting
-        text = re.sub(r'[^\w\s:?.,!]', '', text)
+        text = _SPECIAL_CHARACTERS.sub('', text)
 
         # Remove extra whitespaces
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE.sub(' ', text).strip()
 
         return text
 
@@ -103,17 +113,11 @@ class InputCleaner:
         Returns:
             str: Text with less important stop words removed
         """
-        # Split into words
-        tokens = text.split()
-
-        # Preserve important words and question structure
-        preserved_tokens = []
-        for word in tokens:
-            # Keep words that might be crucial to the question's meaning
-            if word.lower() not in self.stop_words or len(word) > 3:
-                preserved_tokens.append(word)
+        stop_words = self.stop_words
 
-        return ' '.join(preserved_tokens)
+        # Keep words that might be crucial to the question's meaning
+        return ' '.join(word for word in text.split()
+                        if len(word) > 3 or word.lower() not in stop_words)
 
     def clean_input(self, text):
         """
@@ -140,4 +144,16 @@ class InputCleaner:
         # Carefully remove stop words
         cleaned_text = self.remove_stopwords(cleaned_text)
 
-        return cleaned_text
\ No newline at end of file
+        return cleaned_text
+
+    def clean_many(self, texts):
+        """
+        Clean a batch of texts.
+
+        Args:
+            texts (iterable): Raw input texts
+
+        Returns:
+            list: Cleaned text per input, in order
+        """
+        return [self.clean_input(text) for text in texts]
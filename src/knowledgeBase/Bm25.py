@@ -0,0 +1,56 @@
+import math
+import re
+
+# Standard Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens for lexical indexing.
+
+    Identifiers such as part numbers or clause ids ("A-113", "4.2.1") are kept as
+    their alphanumeric pieces, so they still match exactly.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Lowercase tokens
+    """
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def idf(n_docs, df):
+    """
+    Inverse document frequency of a term (BM25+ style, never negative).
+
+    Args:
+        n_docs (int): Number of documents in the collection
+        df (int): Number of documents containing the term
+
+    Returns:
+        float: IDF weight
+    """
+    return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def term_score(tf, doc_length, avg_doc_length, term_idf, k1=K1, b=B):
+    """
+    BM25 contribution of one term to one document.
+
+    Works on plain numbers as well as numpy arrays of tf/doc_length.
+
+    Args:
+        tf: Term frequency in the document
+        doc_length: Number of tokens in the document
+        avg_doc_length (float): Average number of tokens per document
+        term_idf (float): IDF of the term
+
+    Returns:
+        BM25 score contribution
+    """
+    return term_idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_length / avg_doc_length))
@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+# Recency of cache hits is buffered in memory and written in one batch once this many
+# keys are pending or this many seconds have passed, and always before an eviction
+TOUCH_FLUSH_KEYS = 1000
+TOUCH_FLUSH_SECONDS = 60
+
+
+class EmbeddingCache:
+    def __init__(self, path=".cache/embeddings.sqlite3", max_entries=200_000):
+        """
+        Initialize an on-disk, content-addressed embedding cache.
+
+        Vectors are keyed by a hash of (model name, chunk text) so the same chunk
+        is only ever embedded once per model, no matter which helper asks for it.
+        The least recently used entries are evicted once max_entries is exceeded.
+
+        Args:
+            path (str): Location of the SQLite file holding the cache
+            max_entries (int): Maximum number of vectors kept on disk
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> last hit time, not yet written to last_used
+        self._touched = {}
+        self._last_flush = time.time()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model, text):
+        """
+        Build the cache key for a chunk of text embedded with a given model.
+
+        Args:
+            model (str): Name of the embedding model
+            text (str): Chunk text
+
+        Returns:
+            str: Hex digest identifying the (model, text) pair
+        """
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model, texts):
+        """
+        Look up cached vectors for a batch of texts.
+
+        Args:
+            model (str): Name of the embedding model
+            texts (list): Chunk texts to look up
+
+        Returns:
+            list: One vector (list of floats) per text, or None for a cache miss
+        """
+        keys = [self.make_key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            # Query in slices to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            # Refresh recency of the hits so they survive eviction, without a write per lookup
+            if found:
+                now = time.time()
+                self._touched.update(dict.fromkeys(found, now))
+                if len(self._touched) >= TOUCH_FLUSH_KEYS or now - self._last_flush >= TOUCH_FLUSH_SECONDS:
+                    self._flush_touched()
+
+        return [self._decode(found[key]) if key in found else None for key in keys]
+
+    def put_many(self, model, texts, vectors):
+        """
+        Store vectors for a batch of texts and evict old entries if needed.
+
+        Args:
+            model (str): Name of the embedding model
+            texts (list): Chunk texts
+            vectors (list): Embedding vectors, aligned with texts
+        """
+        now = time.time()
+        rows = [(self.make_key(model, text), self._encode(vector), now)
+                for text, vector in zip(texts, vectors)]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            self._size += self._conn.total_changes - before
+            self._evict()
+
+    def _flush_touched(self):
+        """Write the buffered hit times to last_used. Caller holds the lock."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = MAX(last_used, ?) WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._conn.commit()
+            self._touched.clear()
+        self._last_flush = time.time()
+
+    def _evict(self):
+        """Drop the least recently used entries beyond max_entries. Caller holds the lock."""
+        if self._size <= self.max_entries:
+            return
+        # Eviction must see the recency of every hit so far
+        self._flush_touched()
+        # Recount first: other processes may share the same file
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)", (overflow,)
+            )
+            self._conn.commit()
+            self._size -= overflow
+
+    def __len__(self):
+        return self._size
+
+    @staticmethod
+    def _encode(vector):
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(blob):
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, underlying, cache=None):
+        """
+        Wrap an embeddings client so only cache misses reach the backend.
+
+        Args:
+            underlying (Embeddings): The real embeddings client (e.g. GoogleGenerativeAIEmbeddings)
+            cache (EmbeddingCache, optional): Cache to use. Defaults to the process-wide cache.
+        """
+        self.underlying = underlying
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.model = getattr(underlying, "model", type(underlying).__name__)
+
+    def embed_documents(self, texts):
+        """
+        Embed document chunks, serving repeated chunks from the cache.
+
+        Args:
+            texts (list): Chunk texts to embed
+
+        Returns:
+            list: One embedding vector per text
+        """
+        texts = list(texts)
+        vectors = self.cache.get_many(self.model, texts)
+
+        # Embed each distinct missing text once, even if it repeats in the batch
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            fresh = self.underlying.embed_documents(missing)
+            self.cache.put_many(self.model, missing, fresh)
+            fresh_by_text = dict(zip(missing, fresh))
+            vectors = [fresh_by_text[text] if vector is None else vector
+                       for text, vector in zip(texts, vectors)]
+
+        return vectors
+
+    def prefetch(self, texts, progress_callback=None, cancel_event=None):
+        """
+        Embed the cache misses among texts ahead of indexing, with progress and cancellation.
+
+        Indexing the same texts afterwards is then served entirely from the cache.
+
+        Args:
+            texts (list): Chunk texts that are about to be indexed
+            progress_callback (callable, optional): Called with (texts_done, total_texts)
+            cancel_event (threading.Event, optional): Set it to stop embedding
+
+        Returns:
+            int: Number of texts sent to the backend
+        """
+        texts = list(dict.fromkeys(texts))
+        missing = [text for text, vector in zip(texts, self.cache.get_many(self.model, texts)) if vector is None]
+        cached = len(texts) - len(missing)
+
+        def report(done, _):
+            if progress_callback:
+                progress_callback(cached + done, len(texts))
+
+        report(0, len(missing))
+        if missing:
+            # The scheduler reports per batch and honours cancellation; other clients embed in one call
+            if hasattr(self.underlying, "embed"):
+                fresh = self.underlying.embed(missing, report, cancel_event)
+            else:
+                fresh = self.underlying.embed_documents(missing)
+                report(len(missing), len(missing))
+            self.cache.put_many(self.model, missing, fresh)
+        return len(missing)
+
+    def embed_query(self, text):
+        """
+        Embed a search query. Queries use a separate key space because the
+        backend embeds them with a different task type than documents.
+
+        Args:
+            text (str): Query text
+
+        Returns:
+            list: Embedding vector
+        """
+        model = f"{self.model}:query"
+        cached = self.cache.get_many(model, [text])[0]
+        if cached is not None:
+            return cached
+
+        vector = self.underlying.embed_query(text)
+        self.cache.put_many(model, [text], [vector])
+        return vector
+
+    async def aembed_query(self, text):
+        """
+        Async version of embed_query: the backend call is awaited, and the SQLite
+        lookup and write run in worker threads, so neither blocks the event loop.
+
+        Args:
+            text (str): Query text
+
+        Returns:
+            list: Embedding vector
+        """
+        model = f"{self.model}:query"
+        cached = (await asyncio.to_thread(self.cache.get_many, model, [text]))[0]
+        if cached is not None:
+            return cached
+
+        vector = await self.underlying.aembed_query(text)
+        await asyncio.to_thread(self.cache.put_many, model, [text], [vector])
+        return vector
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """
+    Return the process-wide embedding cache, creating it on first use.
+
+    The location and size can be overridden with the EMBEDDING_CACHE_PATH and
+    EMBEDDING_CACHE_MAX_ENTRIES environment variables.
+
+    Returns:
+        EmbeddingCache: The shared cache instance
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache(
+                path=os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3"),
+                max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+            )
+        return _shared_cache
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from langchain_core.embeddings import Embeddings
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize a thread-safe token bucket rate limiter.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float, optional): Maximum burst size. Defaults to one second of tokens.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Block until the requested number of tokens is available.
+
+        Args:
+            tokens (float): Number of tokens to take
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self):
+        """Halve the refill rate after the backend reported throttling."""
+        with self._lock:
+            self.rate = max(self.max_rate / 64, self.rate / 2)
+
+    def recover(self):
+        """Move the refill rate back toward its configured maximum after a success."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+
+class EmbeddingCancelled(Exception):
+    """Raised when an embedding run is cancelled before it finishes."""
+
+
+class EmbeddingScheduler(Embeddings):
+    # One rate limiter per model, shared by every scheduler in the process
+    _buckets = {}
+    _buckets_lock = threading.Lock()
+
+    def __init__(self, underlying, batch_size=64, max_in_flight=4, requests_per_minute=None,
+                 max_retries=6, base_delay=1.0, checkpoint_dir=".cache/embedding_checkpoints"):
+        """
+        Initialize a batched, rate-limited scheduler in front of an embeddings client.
+
+        Args:
+            underlying (Embeddings): The real embeddings client
+            batch_size (int): Number of texts sent per backend request
+            max_in_flight (int): Maximum number of batches being embedded at the same time
+            requests_per_minute (float, optional): Request budget. Defaults to the
+                EMBEDDING_REQUESTS_PER_MINUTE environment variable, then 150.
+            max_retries (int): Attempts per batch before giving up on throttling errors
+            base_delay (float): First backoff delay in seconds, doubled on every retry
+            checkpoint_dir (str): Where partial runs are recorded so they can resume
+        """
+        self.underlying = underlying
+        self.model = getattr(underlying, "model", type(underlying).__name__)
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.checkpoint_dir = checkpoint_dir
+
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "150"))
+        with self._buckets_lock:
+            if self.model not in self._buckets:
+                self._buckets[self.model] = TokenBucket(requests_per_minute / 60.0)
+            self.bucket = self._buckets[self.model]
+
+    @staticmethod
+    def is_throttling_error(error):
+        """
+        Tell whether an exception means the backend is rate limiting us.
+
+        Args:
+            error (Exception): Exception raised by the embeddings client
+
+        Returns:
+            bool: True for HTTP 429 / quota exhausted errors
+        """
+        if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+            return True
+        message = f"{type(error).__name__} {error}".lower()
+        return any(marker in message for marker in ("429", "resourceexhausted", "resource exhausted",
+                                                    "rate limit", "quota"))
+
+    def _embed_batch(self, texts, cancel_event=None):
+        """Embed one batch, backing off and retrying while the backend throttles."""
+        for attempt in range(self.max_retries + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise EmbeddingCancelled()
+            self.bucket.acquire()
+            try:
+                vectors = self.underlying.embed_documents(texts)
+                self.bucket.recover()
+                return vectors
+            except Exception as e:
+                if not self.is_throttling_error(e) or attempt == self.max_retries:
+                    raise
+                self.bucket.throttle()
+                time.sleep(self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def _checkpoint_path(self, texts):
+        digest = hashlib.sha256(self.model.encode("utf-8"))
+        digest.update(str(self.batch_size).encode("utf-8"))
+        for text in texts:
+            digest.update(b"\0" + text.encode("utf-8"))
+        return os.path.join(self.checkpoint_dir, f"{digest.hexdigest()}.jsonl")
+
+    @staticmethod
+    def _read_checkpoint(path):
+        completed = {}
+        if not os.path.exists(path):
+            return completed
+        with open(path, "r", encoding="utf-8") as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by the interruption; that batch is simply redone
+                    continue
+                completed[record["batch"]] = record["vectors"]
+        return completed
+
+    def embed(self, texts, progress_callback=None, cancel_event=None):
+        """
+        Embed texts in batches with bounded concurrency, resuming from a checkpoint if one exists.
+
+        Args:
+            texts (list): Texts to embed
+            progress_callback (callable, optional): Called with (texts_done, total_texts)
+            cancel_event (threading.Event, optional): Set it to stop scheduling new batches
+
+        Returns:
+            list: One embedding vector per text
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        checkpoint_path = self._checkpoint_path(texts)
+        completed = self._read_checkpoint(checkpoint_path)
+        pending = [batch_no for batch_no in range(len(batches)) if batch_no not in completed]
+
+        done = sum(len(batches[batch_no]) for batch_no in completed)
+        if progress_callback:
+            progress_callback(done, len(texts))
+
+        if pending:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(checkpoint_path, "a", encoding="utf-8") as checkpoint_file, \
+                    ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                futures = {executor.submit(self._embed_batch, batches[batch_no], cancel_event): batch_no
+                           for batch_no in pending}
+                try:
+                    # Checkpoint batches as they finish so a failure keeps every completed one
+                    for future in as_completed(futures):
+                        batch_no = futures[future]
+                        vectors = future.result()
+                        completed[batch_no] = vectors
+                        checkpoint_file.write(json.dumps({"batch": batch_no, "vectors": vectors}) + "\n")
+                        checkpoint_file.flush()
+                        done += len(batches[batch_no])
+                        if progress_callback:
+                            progress_callback(done, len(texts))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        # The run finished, so the checkpoint is no longer needed
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        return [vector for batch_no in range(len(batches)) for vector in completed[batch_no]]
+
+    def embed_documents(self, texts):
+        return self.embed(texts)
+
+    def embed_query(self, text):
+        # Questions are latency-sensitive, so they never queue behind index builds
+        return self.underlying.embed_query(text)
+
+    async def aembed_query(self, text):
+        # Same as embed_query, with the backend's native async call
+        return await self.underlying.aembed_query(text)
@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+
+
+def reciprocal_rank_fusion(ranked_lists, weights=None, k=60):
+    """
+    Merge several rankings with weighted reciprocal-rank fusion.
+
+    Args:
+        ranked_lists (list): One list of ids per ranking, best first
+        weights (list, optional): One weight per ranking. Defaults to 1.0 each.
+        k (int): RRF damping constant; higher values flatten the rank differences
+
+    Returns:
+        list: (id, fused score) pairs, best first
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    scores = {}
+    for ranking, weight in zip(ranked_lists, weights):
+        for rank, item_id in enumerate(ranking):
+            scores[item_id] = scores.get(item_id, 0.0) + weight / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever:
+    def __init__(self, mode=None, vector_weight=1.0, lexical_weight=1.0, embedding_timeout=None, candidates=3):
+        """
+        Initialize retrieval settings shared by the vector-store helpers.
+
+        Args:
+            mode (str, optional): "hybrid", "vector" or "lexical". Defaults to RETRIEVAL_MODE, then "hybrid".
+            vector_weight (float): RRF weight of the FAISS ranking
+            lexical_weight (float): RRF weight of the BM25 ranking
+            embedding_timeout (float, optional): In hybrid mode, answer from the lexical
+                index alone if the query embedding takes longer than this (seconds).
+                Defaults to RETRIEVAL_EMBEDDING_TIMEOUT, then no deadline.
+            candidates (int): Each ranking contributes k * candidates results to the fusion
+        """
+        self.mode = mode or os.getenv("RETRIEVAL_MODE", "hybrid")
+        if self.mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{self.mode}', expected one of {RETRIEVAL_MODES}")
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+        if embedding_timeout is None and os.getenv("RETRIEVAL_EMBEDDING_TIMEOUT"):
+            embedding_timeout = float(os.getenv("RETRIEVAL_EMBEDDING_TIMEOUT"))
+        self.embedding_timeout = embedding_timeout
+        self.candidates = candidates
+
+    @staticmethod
+    def _fetch(vector_store, chunk_ids):
+        """Load chunks from the FAISS docstore, keeping their ids."""
+        docs = []
+        for chunk_id in chunk_ids:
+            doc = vector_store.docstore.search(chunk_id)
+            if hasattr(doc, "page_content"):
+                if getattr(doc, "id", None) is None:
+                    doc.id = chunk_id
+                docs.append(doc)
+        return docs
+
+    @staticmethod
+    async def _avector_ranking(vector_store, question, k, timeout=None):
+        """Embed the question (within the deadline) and rank chunks by vector similarity."""
+        embedding = await asyncio.wait_for(vector_store.embedding_function.aembed_query(question), timeout)
+        results = await vector_store.asimilarity_search_with_score_by_vector(embedding, k=k)
+        return [doc for doc, _ in results]
+
+    async def asearch(self, vector_store, lexical_index, question, k=4):
+        """
+        Retrieve the chunks most relevant to a question.
+
+        The query embedding is awaited, and FAISS, BM25 and the docstore lookups run in
+        worker threads instead of blocking the event loop.
+
+        Args:
+            vector_store (FAISS): The loaded vector store
+            lexical_index (LexicalIndex): BM25 index built alongside the store (may be None)
+            question (str): The query to search for
+            k (int): Number of chunks to return
+
+        Returns:
+            list: Relevant Document objects, best first
+        """
+        has_lexical = lexical_index is not None and lexical_index.doc_lengths
+        if self.mode == "vector" or not has_lexical:
+            return await self._avector_ranking(vector_store, question, k)
+
+        lexical_results = await asyncio.to_thread(lexical_index.search, question, k * self.candidates)
+        lexical_ids = [chunk_id for chunk_id, _ in lexical_results]
+        if self.mode == "lexical":
+            return await asyncio.to_thread(self._fetch, vector_store, lexical_ids[:k])
+
+        try:
+            vector_docs = await self._avector_ranking(vector_store, question, k * self.candidates,
+                                                      self.embedding_timeout)
+        except asyncio.TimeoutError:
+            # Embedding backend too slow: keyword results are better than waiting
+            return await asyncio.to_thread(self._fetch, vector_store, lexical_ids[:k])
+
+        docs_by_id = {doc.id: doc for doc in vector_docs}
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc in vector_docs], lexical_ids],
+            [self.vector_weight, self.lexical_weight]
+        )[:k]
+
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in docs_by_id]
+        docs_by_id.update((doc.id, doc) for doc in await asyncio.to_thread(self._fetch, vector_store, missing))
+        return [docs_by_id[chunk_id] for chunk_id, _ in fused if chunk_id in docs_by_id]
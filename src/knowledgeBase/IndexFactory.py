@@ -0,0 +1,310 @@
+import math
+import os
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+# "flat" is exact search; "hnsw" and "ivf" are approximate but sub-linear;
+# "sq8" and "ivfpq" trade a little recall for memory; "auto" picks by corpus size
+INDEX_TYPES = ("auto", "flat", "hnsw", "ivf", "sq8", "ivfpq")
+
+# Product quantization learns 256 centroids per sub-quantizer, which needs ~39 points each
+MIN_IVFPQ_VECTORS = 10_000
+
+# "auto" corpus-size thresholds: exact search is fast enough below the first, HNSW graphs
+# get expensive to build and hold in memory above the second
+AUTO_FLAT_MAX_VECTORS = 10_000
+AUTO_HNSW_MAX_VECTORS = 1_000_000
+
+# Neighbours per node in HNSW graphs
+HNSW_M = 32
+
+# Trained indexes (PCA, SQ8, IVF) are retrained once the corpus has grown this many times
+# over the vectors they were trained on, so their statistics keep describing it
+RETRAIN_GROWTH_FACTOR = 2
+
+
+def resolve_index_type(index_type, n_vectors):
+    """
+    Resolve "auto" to a concrete index type for a corpus size.
+
+    Args:
+        index_type (str): Requested index type
+        n_vectors (int): Number of vectors in the corpus
+
+    Returns:
+        str: "flat" below AUTO_FLAT_MAX_VECTORS, "hnsw" below AUTO_HNSW_MAX_VECTORS,
+            "ivf" above; other types are returned unchanged
+    """
+    if index_type != "auto":
+        return index_type
+    if n_vectors < AUTO_FLAT_MAX_VECTORS:
+        return "flat"
+    if n_vectors < AUTO_HNSW_MAX_VECTORS:
+        return "hnsw"
+    return "ivf"
+
+
+def _nlist(n_vectors):
+    """Inverted lists for an IVF index: ~4 sqrt(n), with at least 39 training points per list."""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def index_description(dim, n_vectors, index_type="flat", pca_dim=None):
+    """
+    Choose the faiss.index_factory description for an index.
+
+    Args:
+        dim (int): Dimensionality of the embeddings
+        n_vectors (int): Number of vectors the index is trained on
+        index_type (str): "auto", "flat", "hnsw" (graph), "ivf" (inverted lists),
+            "sq8" (int8 scalar quantization) or "ivfpq" (inverted lists + product quantization)
+        pca_dim (int, optional): Reduce embeddings to this many dimensions with PCA first
+
+    Returns:
+        str: Index factory description (e.g. "PCA256,IVF64,PQ32")
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+    index_type = resolve_index_type(index_type, n_vectors)
+
+    prefix = ""
+    # PCA needs at least as many training vectors as output dimensions
+    if pca_dim and pca_dim < dim and n_vectors >= pca_dim:
+        prefix = f"PCA{pca_dim},"
+        dim = pca_dim
+
+    # Too few vectors to train PQ codebooks: int8 quantization still saves 4x
+    if index_type == "ivfpq" and n_vectors < MIN_IVFPQ_VECTORS:
+        index_type = "sq8"
+
+    if index_type == "sq8":
+        return f"{prefix}SQ8"
+    if index_type == "hnsw":
+        return f"{prefix}HNSW{HNSW_M}"
+    if index_type == "ivf":
+        return f"{prefix}IVF{_nlist(n_vectors)},Flat"
+    if index_type == "ivfpq":
+        # Sub-quantizers must divide the dimension; aim for 8 dimensions per byte
+        pq_m = max(m for m in range(1, max(1, dim // 8) + 1) if dim % m == 0)
+        return f"{prefix}IVF{_nlist(n_vectors)},PQ{pq_m}"
+    return f"{prefix}Flat"
+
+
+def needs_training(index):
+    """
+    Tell whether an index learned statistics from its training vectors.
+
+    Args:
+        index (faiss.Index): The index
+
+    Returns:
+        bool: True for PCA transforms and quantized or inverted-list indexes
+    """
+    return isinstance(index, faiss.IndexPreTransform) or index_kind(index) in ("sq8", "ivf", "ivfpq")
+
+
+def _base_index(index):
+    """Return the index behind an optional PCA transform."""
+    if isinstance(index, faiss.IndexPreTransform):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def index_kind(index):
+    """
+    Identify the type of an existing index.
+
+    Args:
+        index (faiss.Index): The index
+
+    Returns:
+        str: One of the concrete INDEX_TYPES
+    """
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(base, faiss.IndexScalarQuantizer):
+        return "sq8"
+    return "flat"
+
+
+def tune_index(index, nprobe=None, ef_search=None):
+    """
+    Set the search-time speed/recall knobs of an index. Exact indexes are left alone.
+
+    Args:
+        index (faiss.Index): The index
+        nprobe (int, optional): Inverted lists visited per query (IVF). Defaults to
+            VECTOR_INDEX_NPROBE, then 16.
+        ef_search (int, optional): Candidate list size per query (HNSW). Defaults to
+            VECTOR_INDEX_EF_SEARCH, then 64.
+    """
+    nprobe = nprobe or int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+    ef_search = ef_search or int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64"))
+
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = ef_search
+    elif isinstance(base, faiss.IndexIVF):
+        base.nprobe = nprobe
+
+
+def build_faiss_index(vectors, index_type="flat", pca_dim=None, nprobe=None, ef_search=None):
+    """
+    Create and train an empty FAISS index suited to a set of vectors.
+
+    Args:
+        vectors (np.ndarray): float32 matrix of shape (n, dim) used for training
+        index_type (str): See index_description
+        pca_dim (int, optional): See index_description
+        nprobe (int, optional): See tune_index
+        ef_search (int, optional): See tune_index
+
+    Returns:
+        faiss.Index: Trained index, ready for add()
+    """
+    n_vectors, dim = vectors.shape
+    index = faiss.index_factory(dim, index_description(dim, n_vectors, index_type, pca_dim), faiss.METRIC_L2)
+    if not index.is_trained:
+        index.train(vectors)
+
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        # A wider build-time search gives a better graph for a modest build cost
+        base.hnsw.efConstruction = 2 * HNSW_M
+    tune_index(index, nprobe, ef_search)
+    return index
+
+
+def _settings(index_type, pca_dim):
+    """Fill in the index type and PCA dimension from the environment."""
+    index_type = index_type or os.getenv("VECTOR_INDEX_TYPE", "auto")
+    if pca_dim is None and os.getenv("VECTOR_INDEX_PCA_DIM"):
+        pca_dim = int(os.getenv("VECTOR_INDEX_PCA_DIM"))
+    return index_type, pca_dim
+
+
+def build_vector_store(texts, embeddings, metadatas=None, ids=None, index_type=None, pca_dim=None):
+    """
+    Embed texts and build a LangChain FAISS store on a (possibly compressed) index.
+
+    The number of training vectors is kept as trained_vectors on the store, so
+    fit_vector_store can tell when the index should be retrained.
+
+    Args:
+        texts (list): Chunk texts
+        embeddings (Embeddings): Embeddings client
+        metadatas (list, optional): One metadata dict per text
+        ids (list, optional): One docstore id per text
+        index_type (str, optional): See index_description. Defaults to VECTOR_INDEX_TYPE, then "auto".
+        pca_dim (int, optional): See index_description. Defaults to VECTOR_INDEX_PCA_DIM.
+
+    Returns:
+        FAISS: The populated vector store
+    """
+    texts = list(texts)
+    if not texts:
+        raise ValueError("Cannot build a vector store without any text")
+    index_type, pca_dim = _settings(index_type, pca_dim)
+
+    vectors = embeddings.embed_documents(texts)
+    index = build_faiss_index(np.asarray(vectors, dtype=np.float32), index_type, pca_dim)
+
+    vector_store = FAISS(embeddings, index, InMemoryDocstore(), {})
+    vector_store.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=ids)
+    vector_store.trained_vectors = len(texts)
+    return vector_store
+
+
+def rebuild_vector_store(vector_store, drop_ids=(), index_type=None, pca_dim=None):
+    """
+    Rebuild a store on a fresh index from the chunks in its docstore.
+
+    The texts are embedded again, which is served from the embedding cache.
+
+    Args:
+        vector_store (FAISS): The store to rebuild
+        drop_ids (iterable): Docstore ids to leave out
+        index_type (str, optional): See build_vector_store
+        pca_dim (int, optional): See build_vector_store
+
+    Returns:
+        FAISS: The new store, or None if no chunks are left
+    """
+    drop_ids = set(drop_ids)
+    kept_ids = [chunk_id for chunk_id in vector_store.index_to_docstore_id.values() if chunk_id not in drop_ids]
+    if not kept_ids:
+        return None
+    docs = [vector_store.docstore.search(chunk_id) for chunk_id in kept_ids]
+    return build_vector_store(
+        [doc.page_content for doc in docs], vector_store.embedding_function,
+        [doc.metadata for doc in docs], kept_ids, index_type, pca_dim
+    )
+
+
+def delete_from_store(vector_store, ids, index_type=None, pca_dim=None):
+    """
+    Delete chunks from a store, rebuilding it if its index cannot remove vectors (HNSW).
+
+    Args:
+        vector_store (FAISS): The store
+        ids (list): Docstore ids to delete
+        index_type (str, optional): See build_vector_store
+        pca_dim (int, optional): See build_vector_store
+
+    Returns:
+        FAISS: The updated store, or None if no chunks are left
+    """
+    if index_kind(vector_store.index) != "hnsw":
+        vector_store.delete(ids)
+        return vector_store
+    return rebuild_vector_store(vector_store, ids, index_type, pca_dim)
+
+
+def fit_vector_store(vector_store, index_type=None, pca_dim=None):
+    """
+    Rebuild a store whose index no longer fits its corpus.
+
+    That is the case when the corpus has outgrown (or shrunk below) its "auto" index
+    type, or has grown RETRAIN_GROWTH_FACTOR times over the vectors a trained index
+    (PCA, SQ8, IVF) learned its statistics from.
+
+    Args:
+        vector_store (FAISS): The store
+        index_type (str, optional): See build_vector_store
+        pca_dim (int, optional): See build_vector_store
+
+    Returns:
+        FAISS: The same store if its index still fits, otherwise a rebuilt one
+    """
+    index_type, pca_dim = _settings(index_type, pca_dim)
+    n_vectors = vector_store.index.ntotal
+
+    outgrown = index_type == "auto" and resolve_index_type(index_type, n_vectors) != index_kind(vector_store.index)
+    trained_vectors = getattr(vector_store, "trained_vectors", None)
+    stale = needs_training(vector_store.index) and trained_vectors is not None and \
+        n_vectors >= RETRAIN_GROWTH_FACTOR * trained_vectors
+
+    if not outgrown and not stale:
+        return vector_store
+    return rebuild_vector_store(vector_store, index_type=index_type, pca_dim=pca_dim)
+
+
+def index_memory_bytes(index):
+    """
+    Measure the serialized size of an index, a close proxy for its memory footprint.
+
+    Args:
+        index (faiss.Index): The index
+
+    Returns:
+        int: Size in bytes
+    """
+    return int(faiss.serialize_index(index).nbytes)
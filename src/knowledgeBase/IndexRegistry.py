@@ -0,0 +1,166 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class IndexRegistry:
+    def __init__(self, max_stores=None):
+        """
+        Initialize a process-wide registry of loaded vector indexes.
+
+        Each store is loaded once and kept in memory. An entry is reloaded only when
+        the files on disk change (mtime) or the store is explicitly invalidated after
+        being rebuilt or cleared (version). Stores stay on disk, so the least recently
+        used ones are dropped from memory once more than max_stores are loaded.
+
+        Args:
+            max_stores (int, optional): Stores kept in memory. Defaults to
+                INDEX_REGISTRY_MAX_STORES, then 16.
+        """
+        self._lock = threading.RLock()
+        self._entries = {}
+        # One lock per (path, kind), so a slow load only blocks lookups of the same object
+        self._load_locks = {}
+        self._versions = {}
+        # Store directories, least recently used first
+        self._recent = OrderedDict()
+        self.max_stores = max_stores or int(os.getenv("INDEX_REGISTRY_MAX_STORES", "16"))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _disk_stamp(path):
+        """
+        Compute a cheap fingerprint of a store directory.
+
+        Args:
+            path (str): Directory holding the index files
+
+        Returns:
+            tuple: Latest mtime and total size of the files, or None if missing
+        """
+        try:
+            entries = [entry.stat() for entry in os.scandir(path) if entry.is_file()]
+        except FileNotFoundError:
+            return None
+        return (max((stat.st_mtime_ns for stat in entries), default=0),
+                sum(stat.st_size for stat in entries))
+
+    def get(self, path, loader, kind="faiss"):
+        """
+        Return the in-memory object for a store, loading it only when needed.
+
+        Args:
+            path (str): Directory holding the index files
+            loader (callable): Called with the path to load the object on a miss
+            kind (str): Distinguishes several objects loaded from the same directory
+
+        Returns:
+            object: The loaded object, or None if the store does not exist
+        """
+        key = (os.path.abspath(path), kind)
+        stamp = (self._disk_stamp(path), self.version(path))
+        if stamp[0] is None:
+            self.discard(path)
+            return None
+
+        with self._lock:
+            self._recent[key[0]] = None
+            self._recent.move_to_end(key[0])
+
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded it while this one waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == stamp:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            loaded = loader(path)
+            with self._lock:
+                # If the store was invalidated during the load, the next lookup reloads it
+                self._entries[key] = (stamp, loaded)
+                # It may have been evicted while loading
+                self._recent[key[0]] = None
+                self._recent.move_to_end(key[0])
+                self._evict()
+            return loaded
+
+    def _evict(self):
+        """Drop the least recently used stores beyond max_stores."""
+        while len(self._recent) > self.max_stores:
+            abs_path = next(iter(self._recent))
+            self._drop(abs_path)
+            self.evictions += 1
+
+    def version(self, path):
+        """
+        Return the current version number of a store.
+
+        Args:
+            path (str): Directory holding the index files
+
+        Returns:
+            int: Incremented every time the store is invalidated
+        """
+        return self._versions.get(os.path.abspath(path), 0)
+
+    def invalidate(self, path):
+        """
+        Mark a store as rebuilt or cleared so the next lookup reloads it.
+
+        Args:
+            path (str): Directory holding the index files
+        """
+        with self._lock:
+            abs_path = os.path.abspath(path)
+            self._versions[abs_path] = self._versions.get(abs_path, 0) + 1
+            self._drop(abs_path)
+
+    def discard(self, path):
+        """
+        Drop every cached object for a store without bumping its version.
+
+        Args:
+            path (str): Directory holding the index files
+        """
+        with self._lock:
+            self._drop(os.path.abspath(path))
+
+    def _drop(self, abs_path):
+        self._recent.pop(abs_path, None)
+        for key in [key for key in self._entries if key[0] == abs_path]:
+            del self._entries[key]
+        # A load in progress keeps its own reference to the lock
+        for key in [key for key in self._load_locks if key[0] == abs_path]:
+            del self._load_locks[key]
+
+    def stats(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: Hit, miss and eviction counters, hit rate, number of loaded objects
+                and of stores they belong to
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "loaded": len(self._entries),
+            "stores": len(self._recent)
+        }
+
+
+# Shared by every helper in the process
+index_registry = IndexRegistry()
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.knowledgeBase.EmbeddingScheduler import EmbeddingCancelled
+
+# Ingestion stages, in the order a job goes through them
+STAGES = ("extract", "split", "embed", "index")
+
+
+class IngestionCancelled(Exception):
+    """Raised inside a job when its cancellation has been requested."""
+
+
+class IngestionJob:
+    def __init__(self, kind, key):
+        """
+        Initialize the shared state of one ingestion job.
+
+        The worker thread updates it and the UI reads it through snapshot(), so it
+        never touches Streamlit itself.
+
+        Args:
+            kind (str): What the job does (e.g. "pdf", "web")
+            key (str): Store the job writes to; jobs with the same key run one at a time
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.stage = None
+        self.progress = {stage: (0, 0) for stage in STAGES}
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def report(self, stage, done, total):
+        """
+        Record progress of a stage. Also the place where cancellation takes effect.
+
+        Args:
+            stage (str): One of STAGES
+            done (int): Units of work finished
+            total (int): Units of work in the stage
+        """
+        with self._lock:
+            self.stage = stage
+            self.progress[stage] = (done, total)
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """Raise IngestionCancelled if cancellation was requested."""
+        if self.cancel_event.is_set():
+            raise IngestionCancelled()
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def snapshot(self):
+        """
+        Return a consistent copy of the job state.
+
+        Returns:
+            dict: id, kind, status, stage, progress per stage, result and error
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error
+            }
+
+
+class IngestionQueue:
+    def __init__(self, max_workers=None, keep_finished_seconds=3600):
+        """
+        Initialize a process-wide queue of background ingestion jobs.
+
+        Jobs run on a thread pool, so the Streamlit script returns immediately and
+        polls job status instead of blocking. Jobs writing to the same store run one
+        after the other; jobs for different stores (sessions) run in parallel.
+
+        Args:
+            max_workers (int, optional): Jobs running at the same time. Defaults to
+                INGESTION_WORKERS, then 2.
+            keep_finished_seconds (float): How long finished jobs stay queryable
+        """
+        max_workers = max_workers or int(os.getenv("INGESTION_WORKERS", "2"))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion")
+        self.keep_finished_seconds = keep_finished_seconds
+        self._jobs = {}
+        self._store_locks = {}
+        self._lock = threading.Lock()
+
+    def store_lock(self, key):
+        """
+        Return the lock serializing writes to a store.
+
+        Args:
+            key (str): Store the lock protects
+
+        Returns:
+            threading.Lock: The lock
+        """
+        with self._lock:
+            return self._store_locks.setdefault(os.path.abspath(key), threading.Lock())
+
+    def active_job(self, kind, key):
+        """
+        Return the id of the queued or running job of a kind on a store.
+
+        Lets callers skip preparing the arguments of a job submit() would deduplicate.
+
+        Args:
+            kind (str): What the job does
+            key (str): Store the job writes to
+
+        Returns:
+            str: Job id, or None if there is no such job
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.key == key and job.active:
+                    return job.id
+        return None
+
+    def submit(self, kind, key, func, *args):
+        """
+        Queue a job, or return the active job of the same kind on the same store.
+
+        Args:
+            kind (str): What the job does
+            key (str): Store the job writes to
+            func (callable): Called as func(job, *args) on a worker thread; its return
+                value becomes the job result
+            *args: Extra arguments for func
+
+        Returns:
+            str: Job id
+        """
+        with self._lock:
+            self._forget_finished()
+            for job in self._jobs.values():
+                if job.kind == kind and job.key == key and job.active:
+                    return job.id
+            job = IngestionJob(kind, key)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func, args)
+        return job.id
+
+    def _run(self, job, func, args):
+        with self.store_lock(job.key):
+            try:
+                job.check_cancelled()
+                job.status = "running"
+                job.result = func(job, *args)
+                job.status = "done"
+            except (IngestionCancelled, EmbeddingCancelled):
+                job.status = "cancelled"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished = time.time()
+
+    def get(self, job_id):
+        """
+        Return the state of a job.
+
+        Args:
+            job_id (str): Job id returned by submit
+
+        Returns:
+            dict: See IngestionJob.snapshot, or None if the job is unknown
+        """
+        job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id):
+        """
+        Request cancellation. A queued job never starts; a running job stops at its
+        next progress report, leaving the store as it was.
+
+        Args:
+            job_id (str): Job id returned by submit
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+
+    def cancel_store(self, key):
+        """
+        Request cancellation of every active job writing to a store.
+
+        Args:
+            key (str): Store the jobs write to
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.key == key and job.active]
+        for job in jobs:
+            job.cancel_event.set()
+
+    def _forget_finished(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and now - job.finished > self.keep_finished_seconds]:
+            del self._jobs[job_id]
+
+
+# Shared by every session in the process
+ingestion_queue = IngestionQueue()
@@ -0,0 +1,114 @@
+import json
+import os
+from collections import Counter
+
+from src.knowledgeBase.Bm25 import idf, term_score, tokenize
+from src.knowledgeBase.VectorStoreIO import sidecar_path
+
+
+class LexicalIndex:
+    # File written with the FAISS files of each vector store generation
+    FILE_NAME = "lexical.json"
+
+    def __init__(self):
+        """
+        Initialize an empty in-memory BM25 index over vector-store chunks.
+
+        Chunks are identified by their docstore ids, so lexical hits can be fetched
+        from the FAISS docstore and fused with vector hits.
+        """
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    def add(self, ids, texts):
+        """
+        Index chunks.
+
+        Args:
+            ids (list): Docstore ids of the chunks
+            texts (list): Chunk texts, aligned with ids
+        """
+        for chunk_id, text in zip(ids, texts):
+            counts = Counter(tokenize(text))
+            length = sum(counts.values())
+            self.doc_lengths[chunk_id] = length
+            self.total_length += length
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+
+    def remove(self, ids):
+        """
+        Remove chunks from the index.
+
+        Args:
+            ids (list): Docstore ids of the chunks to remove
+        """
+        ids = set(ids) & self.doc_lengths.keys()
+        if not ids:
+            return
+        for chunk_id in ids:
+            self.total_length -= self.doc_lengths.pop(chunk_id)
+        for term in list(self.postings):
+            term_postings = self.postings[term]
+            for chunk_id in ids & term_postings.keys():
+                del term_postings[chunk_id]
+            if not term_postings:
+                del self.postings[term]
+
+    def search(self, query, k=4):
+        """
+        Rank chunks for a query with BM25.
+
+        Args:
+            query (str): Search query
+            k (int): Number of results
+
+        Returns:
+            list: (chunk_id, score) pairs, best first
+        """
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        avg_doc_length = (self.total_length / n_docs) or 1.0
+
+        scores = Counter()
+        for term in set(tokenize(query)):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+            term_idf = idf(n_docs, len(term_postings))
+            for chunk_id, tf in term_postings.items():
+                scores[chunk_id] += term_score(tf, self.doc_lengths[chunk_id], avg_doc_length, term_idf)
+        return scores.most_common(k)
+
+    def save(self, path):
+        """
+        Write the index into a directory (save_store passes the new generation).
+
+        Args:
+            path (str): Directory to write to
+        """
+        with open(os.path.join(path, self.FILE_NAME), "w", encoding="utf-8") as index_file:
+            json.dump({"postings": self.postings, "doc_lengths": self.doc_lengths}, index_file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read the index of a vector store directory.
+
+        Args:
+            path (str): Vector store directory
+
+        Returns:
+            LexicalIndex: The loaded index (empty if the store has none)
+        """
+        index = cls()
+        index_path = sidecar_path(path, cls.FILE_NAME)
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as index_file:
+                data = json.load(index_file)
+            index.postings = data["postings"]
+            index.doc_lengths = data["doc_lengths"]
+            index.total_length = sum(index.doc_lengths.values())
+        return index
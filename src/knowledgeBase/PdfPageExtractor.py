@@ -0,0 +1,98 @@
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PyPDF2 import PdfReader
+
+# Below this many pages the process pool start-up costs more than it saves
+PARALLEL_PAGE_THRESHOLD = 16
+
+
+def extract_page_range(task):
+    """
+    Extract the text of a range of pages. Runs inside a worker process.
+
+    Args:
+        task (tuple): (file_no, pdf_path or stream, first_page, stop_page)
+
+    Returns:
+        tuple: file_no and the list of (page_no, text) for the range
+    """
+    file_no, path, start, stop = task
+    reader = PdfReader(path)
+    return file_no, [(page_no, reader.pages[page_no].extract_text() or "") for page_no in range(start, stop)]
+
+
+def _read_bytes(pdf):
+    pdf.seek(0)
+    data = pdf.read()
+    pdf.seek(0)
+    return data
+
+
+def iter_pdf_pages(pdf_docs, max_workers=None, progress_callback=None):
+    """
+    Stream the text of every page of every PDF, spreading pages across a process pool.
+
+    Records are yielded in document and page order as soon as they are ready, so
+    callers never have to hold the text of the whole batch in a single string.
+
+    Args:
+        pdf_docs (list): PDF file objects
+        max_workers (int, optional): Size of the process pool. Defaults to the
+            PDF_EXTRACT_WORKERS environment variable, then the number of CPUs.
+        progress_callback (callable, optional): Called with (pages_done, total_pages)
+
+    Yields:
+        tuple: (pdf, page_no, text) where pdf is the object passed in
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or os.cpu_count() or 1
+
+    documents = [_read_bytes(pdf) for pdf in pdf_docs]
+    page_counts = [len(PdfReader(io.BytesIO(data)).pages) for data in documents]
+    total_pages = sum(page_counts)
+
+    parallel = max_workers > 1 and total_pages >= PARALLEL_PAGE_THRESHOLD
+    paths = []
+    executor = None
+    try:
+        if parallel:
+            # Workers get a file path and a page range instead of a pickled copy of the whole PDF
+            for data in documents:
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+                    pdf_file.write(data)
+                paths.append(pdf_file.name)
+            del documents
+        else:
+            paths = [io.BytesIO(data) for data in documents]
+
+        # Split each document into a few page ranges per worker to balance the load
+        tasks = []
+        for file_no, (path, page_count) in enumerate(zip(paths, page_counts)):
+            step = max(1, -(-page_count // (max_workers * 2)))
+            for start in range(0, page_count, step):
+                tasks.append((file_no, path, start, min(start + step, page_count)))
+
+        if parallel:
+            # Spawn, not fork: this runs on an ingestion thread inside a multi-threaded server
+            executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            results = executor.map(extract_page_range, tasks)
+        else:
+            results = map(extract_page_range, tasks)
+
+        pages_done = 0
+        for file_no, pages in results:
+            for page_no, text in pages:
+                pages_done += 1
+                if progress_callback:
+                    progress_callback(pages_done, total_pages)
+                yield pdf_docs[file_no], page_no, text
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        for path in paths:
+            if isinstance(path, str):
+                os.remove(path)
@@ -1,31 +1,61 @@
 import streamlit as st
-from PyPDF2 import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
-import google.generativeai as genai
+import asyncio
+import hashlib
+import io
+import json
 import os
 import shutil
 
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains.question_answering import load_qa_chain
-from langchain.prompts import PromptTemplate
+from src.knowledgeBase.EmbeddingCache import CachedEmbeddings
+from src.knowledgeBase.EmbeddingScheduler import EmbeddingScheduler
+from src.knowledgeBase.HybridRetriever import HybridRetriever
+from src.knowledgeBase.IndexFactory import build_vector_store, delete_from_store, fit_vector_store, tune_index
+from src.knowledgeBase.IndexRegistry import index_registry
+from src.knowledgeBase.IngestionQueue import ingestion_queue
+from src.knowledgeBase.LexicalIndex import LexicalIndex
+from src.knowledgeBase.PdfPageExtractor import iter_pdf_pages
+from src.knowledgeBase.SessionStores import session_stores
+from src.knowledgeBase.VectorStoreIO import load_store, save_store, sidecar_path
+
+
+# Split the text of a document whenever this much of it is buffered
+SPLIT_BUFFER_CHARS = 20_000
+# Saved in each vector store generation: document_id -> {"name", "chunk_ids"}
+MANIFEST_FILE = "manifest.json"
 
 
 class PdfVectorHelper:
-    def __init__(self):
-        # Try using the latest available embedding model
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-        self.vector_store_path = "pdf_faiss_index"
+    def __init__(self, extract_workers=None, retriever=None, index_type=None, pca_dim=None, session_id=None,
+                 embeddings=None):
+        # Try using the latest available embedding model, behind the shared on-disk cache.
+        # Cache misses go through the batched, rate-limited scheduler.
+        self.embeddings = embeddings if embeddings is not None else CachedEmbeddings(
+            EmbeddingScheduler(GoogleGenerativeAIEmbeddings(model="models/embedding-001"))
+        )
+        # Each session has its own store, so sessions cannot overwrite or clear each other's
+        self.vector_store_path = session_stores.store_path("pdf_faiss_index", session_id)
+        # Size of the page extraction process pool (None = one worker per CPU)
+        self.extract_workers = extract_workers
+        # Vector + BM25 retrieval with rank fusion
+        self.retriever = retriever or HybridRetriever()
+        # FAISS index type (see IndexFactory.INDEX_TYPES) and optional PCA dimension
+        self.index_type = index_type
+        self.pca_dim = pca_dim
 
-    @staticmethod
-    def get_pdf_text(pdf_docs):
-        pdf_text = ""
-        for pdf in pdf_docs:
-            pdf_reader = PdfReader(pdf)
-            for page in pdf_reader.pages:
-                pdf_text += page.extract_text()
-        return pdf_text
+    def get_pdf_pages(self, pdf_docs, progress_callback=None):
+        """
+        Stream (file, page_no, text) records for the PDFs, extracted in parallel.
+
+        Args:
+            pdf_docs (list): List of PDF files
+            progress_callback (callable, optional): Called with (pages_done, total_pages)
+
+        Returns:
+            iterator: (pdf, page_no, text) records in document and page order
+        """
+        return iter_pdf_pages(pdf_docs, self.extract_workers, progress_callback)
 
     @staticmethod
     def get_text_chunks(pdf_text):
@@ -37,52 +67,285 @@ class PdfVectorHelper:
         chunks = text_splitter.split_text(pdf_text)
         return chunks
 
-    def get_vector_store(self, chunks, pdf_Id=None):
+    @staticmethod
+    def get_document_id(pdf):
+        """
+        Identify an uploaded PDF by the hash of its content.
+
+        Args:
+            pdf: Uploaded file object
+
+        Returns:
+            str: SHA-256 hex digest of the file bytes
+        """
+        pdf.seek(0)
+        digest = hashlib.sha256(pdf.read()).hexdigest()
+        pdf.seek(0)
+        return digest
+
+    def get_vector_store(self, chunks, pdf_Id=None, vector_store=None):
+        """
+        Embed chunks and add them to the vector store, tagged with their source document.
+
+        Args:
+            chunks (list): Text chunks to embed
+            pdf_Id (str, optional): Id of the document the chunks come from
+            vector_store (FAISS, optional): Existing store to append to. A new one is created if None.
+
+        Returns:
+            tuple: The vector store and the list of docstore ids of the added chunks
+        """
+        metadatas = None
+        ids = None
         if pdf_Id:
-            vector_store = FAISS.from_texts(chunks, self.embeddings, document_id=pdf_Id)
+            metadatas = [{"document_id": pdf_Id} for _ in chunks]
+            ids = [f"{pdf_Id}-{i}" for i in range(len(chunks))]
+
+        if vector_store is None:
+            vector_store = build_vector_store(chunks, self.embeddings, metadatas, ids, self.index_type, self.pca_dim)
+            ids = list(vector_store.index_to_docstore_id.values())
         else:
-            vector_store = FAISS.from_texts(chunks, self.embeddings)
-        vector_store.save_local(self.vector_store_path)
+            ids = vector_store.add_texts(chunks, metadatas=metadatas, ids=ids)
+        return vector_store, ids
+
+    @staticmethod
+    def _load_manifest(path):
+        """Read the document manifest. Only called by the index registry on a miss."""
+        manifest_path = sidecar_path(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def get_manifest(self):
+        """
+        Return the documents currently indexed, keyed by document id.
+
+        Returns:
+            dict: document_id -> {"name": file name, "chunk_ids": docstore ids}
+        """
+        return index_registry.get(self.vector_store_path, self._load_manifest, kind="manifest") or {}
+
+    @staticmethod
+    def _write_manifest(directory, manifest):
+        with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file)
+
+    def _save(self, vector_store, manifest, lexical_index):
+        # The manifest and lexical index go into the same generation as the vectors they describe
+        save_store(vector_store, self.vector_store_path, sidecars={
+            LexicalIndex.FILE_NAME: lexical_index.save,
+            MANIFEST_FILE: lambda directory: self._write_manifest(directory, manifest),
+        })
+        index_registry.invalidate(self.vector_store_path)
+
+    def _load_vector_store(self, path, mmap=True):
+        """
+        Load the FAISS index from disk.
+
+        The registry opens it memory-mapped and read-only; ingestion passes mmap=False
+        to get a private copy it can modify.
+        """
+        vector_store = load_store(path, self.embeddings, mmap=mmap)
+        # Search parameters are not fixed at build time, so they can be tuned without re-indexing
+        tune_index(vector_store.index)
         return vector_store
 
-    def get_relevant_documents(self, question):
-        try:
-            # Check if the FAISS index exists
-            if not os.path.exists(self.vector_store_path):
-                # If no index exists, return an empty list or raise a custom exception
-                st.toast("No PDF documents have been uploaded and processed yet.",icon="🚨")
-                return []
-
-            # If index exists, proceed with similarity search
-            new_db = FAISS.load_local(self.vector_store_path, self.embeddings, allow_dangerous_deserialization=True)
-            docs = new_db.similarity_search(question)
-            return docs
-        except Exception as e:
-            st.error(f"Error retrieving documents: {e}")
+    def get_store_version(self):
+        """
+        Return the version of the PDF vector store, bumped every time it is rebuilt or cleared.
+
+        Returns:
+            int: Current store version
+        """
+        return index_registry.version(self.vector_store_path)
+
+    async def aget_relevant_documents(self, question):
+        """
+        Retrieve the chunks most relevant to a question, for the async chat pipeline.
+        Does not use Streamlit.
+
+        The query embedding is awaited; loading the store (usually already in memory)
+        and the FAISS search run off the event loop.
+
+        Args:
+            question (str): The query to search for
+
+        Returns:
+            list: Relevant Document objects, best first (empty if nothing is indexed)
+        """
+        if not os.path.exists(self.vector_store_path):
             return []
 
-    def process_pdf(self, pdf_docs):
+        new_db = await asyncio.to_thread(index_registry.get, self.vector_store_path, self._load_vector_store)
+        lexical_index = await asyncio.to_thread(index_registry.get, self.vector_store_path, LexicalIndex.load,
+                                                kind="lexical")
+        return await self.retriever.asearch(new_db, lexical_index, question)
+
+    def sync_documents(self, pdf_docs, progress_callback=None, cancel_event=None):
         """
-        Process uploaded PDF documents.
+        Bring the vector store in line with the uploaded PDFs.
+
+        Only PDFs that are not indexed yet are extracted and embedded, and only the
+        vectors of PDFs no longer uploaded are deleted. Nothing is written until the
+        end, so an exception (including cancellation) leaves the store unchanged.
+        Does not use Streamlit, so it can run on a background ingestion worker.
 
         Args:
-            pdf_docs (list): List of PDF files to process
+            pdf_docs (list): List of PDF files currently uploaded
+            progress_callback (callable, optional): Called with (stage, done, total) for the
+                "extract" (pages), "split" (documents), "embed" (chunks) and "index"
+                (documents) stages. It may raise to abort the sync.
+            cancel_event (threading.Event, optional): Set it to stop embedding early
+
+        Returns:
+            tuple: Number of documents added and number of documents removed
         """
-        try:
-            # Extract text from PDFs
-            raw_text = self.get_pdf_text(pdf_docs)
+        def report(stage, done, total):
+            if progress_callback:
+                progress_callback(stage, done, total)
 
-            # Split text into chunks
-            text_chunks = self.get_text_chunks(raw_text)
+        uploads = {self.get_document_id(pdf): pdf for pdf in pdf_docs}
+        manifest = dict(self.get_manifest())
 
-            # Create and save vector store
-            self.get_vector_store(text_chunks)
+        removed = [doc_id for doc_id in manifest if doc_id not in uploads]
+        added = [doc_id for doc_id in uploads if doc_id not in manifest]
+        if not removed and not added:
+            return 0, 0
 
-            # Optional: Add more detailed logging or feedback
-            st.success(f"Processed {len(pdf_docs)} PDF(s) successfully")
+        if len(removed) == len(manifest) and not added:
+            self.remove_store()
+            return 0, len(removed)
 
-        except Exception as e:
-            st.error(f"Error processing PDFs: {e}")
+        # Work on a private copy so concurrent questions keep using the registry copy
+        vector_store = self._load_vector_store(self.vector_store_path, mmap=False) if manifest else None
+        lexical_index = LexicalIndex.load(self.vector_store_path) if manifest else LexicalIndex()
+
+        if removed:
+            stale_ids = [chunk_id for doc_id in removed for chunk_id in manifest.pop(doc_id)["chunk_ids"]]
+            vector_store = delete_from_store(vector_store, stale_ids, self.index_type, self.pca_dim)
+            lexical_index.remove(stale_ids)
+
+        # Extract the pages of all new PDFs in one pool, splitting them as they arrive
+        doc_ids = {id(uploads[doc_id]): doc_id for doc_id in added}
+        chunks_by_doc = {doc_id: [] for doc_id in added}
+        pages = self.get_pdf_pages([uploads[doc_id] for doc_id in added],
+                                   lambda done, total: report("extract", done, total))
+
+        # Pages come in document order; only the unsplit tail of the current document is buffered
+        current_id, buffer = None, ""
+        for pdf, _, text in pages:
+            doc_id = doc_ids[id(pdf)]
+            if doc_id != current_id:
+                if current_id is not None:
+                    chunks_by_doc[current_id].extend(self.get_text_chunks(buffer))
+                    report("split", list(chunks_by_doc).index(current_id) + 1, len(chunks_by_doc))
+                current_id, buffer = doc_id, ""
+            buffer += text
+            if len(buffer) >= SPLIT_BUFFER_CHARS:
+                # Keep the last chunk as the start of the buffer: it may continue on the next page
+                chunks = self.get_text_chunks(buffer)
+                chunks_by_doc[doc_id].extend(chunks[:-1])
+                buffer = chunks[-1] if chunks else ""
+        if current_id is not None:
+            chunks_by_doc[current_id].extend(self.get_text_chunks(buffer))
+        report("split", len(chunks_by_doc), len(chunks_by_doc))
+
+        # Embed every new chunk up front, so indexing below is served from the embedding cache
+        all_chunks = [chunk for chunks in chunks_by_doc.values() for chunk in chunks]
+        self.embeddings.prefetch(all_chunks, lambda done, total: report("embed", done, total), cancel_event)
+
+        for doc_no, (doc_id, text_chunks) in enumerate(chunks_by_doc.items(), start=1):
+            if text_chunks:
+                vector_store, chunk_ids = self.get_vector_store(text_chunks, doc_id, vector_store)
+                lexical_index.add(chunk_ids, text_chunks)
+                manifest[doc_id] = {"name": getattr(uploads[doc_id], "name", doc_id), "chunk_ids": chunk_ids}
+            report("index", doc_no, len(chunks_by_doc))
+
+        if vector_store is None:
+            return 0, len(removed)
+
+        # Switch index type if the corpus crossed an "auto" size threshold, or retrain it once
+        # the corpus has outgrown the vectors it was trained on
+        vector_store = fit_vector_store(vector_store, self.index_type, self.pca_dim)
+        self._save(vector_store, manifest, lexical_index)
+        return len(added), len(removed)
+
+    def remove_missing_documents(self, pdf_docs):
+        """
+        Delete the vectors of PDFs that were removed from the uploader.
+
+        Nothing is embedded here, so this is cheap enough to call on every render.
+        The deletion itself runs as a background ingestion job.
+
+        Args:
+            pdf_docs (list): List of PDF files currently uploaded
+
+        Returns:
+            str: Id of the ingestion job, or None if nothing had to be removed
+        """
+        manifest = self.get_manifest()
+        if not manifest:
+            return None
+        uploaded_names = {getattr(pdf, "name", None) for pdf in pdf_docs}
+        if all(entry["name"] in uploaded_names for entry in manifest.values()):
+            return None
+
+        # The manifest only changes when the job finishes; don't hash and copy the uploads again meanwhile
+        job_id = ingestion_queue.active_job("pdf-remove", self.vector_store_path)
+        if job_id is not None:
+            return job_id
+
+        uploads = {self.get_document_id(pdf): pdf for pdf in pdf_docs}
+        kept = [self.snapshot_upload(uploads[doc_id]) for doc_id in manifest if doc_id in uploads]
+        return ingestion_queue.submit("pdf-remove", self.vector_store_path, self._sync_job, kept)
+
+    @staticmethod
+    def snapshot_upload(pdf):
+        """
+        Copy an uploaded file, so a background job can read it after the script rerun ends.
+
+        Args:
+            pdf: Uploaded file object
+
+        Returns:
+            io.BytesIO: In-memory copy with the same name
+        """
+        pdf.seek(0)
+        snapshot = io.BytesIO(pdf.read())
+        pdf.seek(0)
+        snapshot.name = getattr(pdf, "name", None)
+        return snapshot
+
+    def _sync_job(self, job, pdf_docs):
+        """Run sync_documents on an ingestion worker, reporting to the job."""
+        return self.sync_documents(pdf_docs, job.report, job.cancel_event)
+
+    def submit_pdfs(self, pdf_docs):
+        """
+        Queue the indexing of uploaded PDFs as a background ingestion job.
+
+        Args:
+            pdf_docs (list): List of PDF files currently uploaded
+
+        Returns:
+            str: Id of the ingestion job; its result is (added, removed)
+        """
+        snapshots = [self.snapshot_upload(pdf) for pdf in pdf_docs]
+        return ingestion_queue.submit("pdf", self.vector_store_path, self._sync_job, snapshots)
+
+    def remove_store(self):
+        """
+        Delete the store from disk and drop it from memory. Does not use Streamlit.
+
+        Returns:
+            bool: Whether there was a store to delete
+        """
+        if not os.path.exists(self.vector_store_path):
+            return False
+        shutil.rmtree(self.vector_store_path)
+        index_registry.invalidate(self.vector_store_path)
+        return True
 
     def clear_vector_store(self,message=False):
         """
@@ -93,9 +356,15 @@ class PdfVectorHelper:
             if 'pdf_uploads' in st.session_state:
                 st.session_state.pdf_uploads = []
 
-            if os.path.exists(self.vector_store_path):
-                shutil.rmtree(self.vector_store_path)
-                if message:
-                    st.success("PDF documents and vector store have been cleared.")
+            # Nothing on disk: skip the job queue and the store lock (called on every sidebar render)
+            if not os.path.exists(self.vector_store_path):
+                return
+
+            # Stop ingestion jobs on this store and wait for them rather than deleting under them
+            ingestion_queue.cancel_store(self.vector_store_path)
+            with ingestion_queue.store_lock(self.vector_store_path):
+                cleared = self.remove_store()
+            if cleared and message:
+                st.success("PDF documents and vector store have been cleared.")
         except Exception as e:
-            st.error(f"Error clearing vector store: {e}")
\ No newline at end of file
+            st.error(f"Error clearing vector store: {e}")
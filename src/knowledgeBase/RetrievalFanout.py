@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+import time
+
+from src.knowledgeBase.HybridRetriever import reciprocal_rank_fusion
+
+
+class RetrievalFanout:
+    def __init__(self, timeout=None, k=None, rrf_k=60):
+        """
+        Initialize retrieval across several sources at once.
+
+        Every source is queried concurrently under one shared deadline, so a question
+        takes about as long as the slowest source (or the deadline), not the sum.
+
+        Args:
+            timeout (float, optional): Seconds to wait for all sources together.
+                Defaults to RETRIEVAL_FANOUT_TIMEOUT, then 10.
+            k (int, optional): Passages kept after merging. Defaults to RETRIEVAL_FANOUT_K, then 6.
+            rrf_k (int): RRF damping constant used to merge the source rankings
+        """
+        self.timeout = timeout or float(os.getenv("RETRIEVAL_FANOUT_TIMEOUT", "10"))
+        self.k = k or int(os.getenv("RETRIEVAL_FANOUT_K", "6"))
+        self.rrf_k = rrf_k
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.passages = 0
+        self.total_seconds = 0.0
+        self.source_statuses = {}
+
+    @staticmethod
+    def _passage_id(name, rank, doc):
+        """Id of a passage in the merged ranking; sources may not set document ids."""
+        return f"{name}:{getattr(doc, 'id', None) or rank}"
+
+    def _merge(self, rankings):
+        """Fuse the per-source rankings (name -> {passage id: doc}) into the best k passages."""
+        fused = reciprocal_rank_fusion([list(ranking) for ranking in rankings.values()], k=self.rrf_k)[:self.k]
+        docs_by_id = {passage_id: (name, doc)
+                      for name, ranking in rankings.items() for passage_id, doc in ranking.items()}
+
+        docs = []
+        for passage_id, score in fused:
+            name, doc = docs_by_id[passage_id]
+            # Copy, so the metadata of cached docstore entries is not modified
+            doc = doc.model_copy(update={"metadata": {**doc.metadata, "retrieval_source": name, "score": score}})
+            docs.append(doc)
+        return docs
+
+    @staticmethod
+    async def _atimed(search, question):
+        started = time.perf_counter()
+        docs = await search(question)
+        return docs, time.perf_counter() - started
+
+    async def aretrieve(self, sources, question):
+        """
+        Query every source, then merge their rankings with reciprocal-rank fusion.
+
+        Sources run as coroutines on the event loop. A source that fails or misses the
+        deadline is reported (and cancelled) and left out; the others still answer.
+
+        Args:
+            sources (dict): Source name -> async callable(question) returning Documents, best first
+            question (str): The query to search for
+
+        Returns:
+            dict: Merged "docs" (best first, each with "retrieval_source" and "score" in
+                its metadata), per-source "sources" reports (status "ok", "failed" or
+                "timeout", passage count, seconds, error) and total "seconds"
+        """
+        started = time.perf_counter()
+        tasks = {name: asyncio.create_task(self._atimed(search, question)) for name, search in sources.items()}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=self.timeout)
+
+        rankings = {}
+        reports = {}
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                reports[name] = {"status": "timeout", "count": 0, "seconds": None, "error": None}
+                continue
+            try:
+                docs, seconds = task.result()
+            except Exception as e:
+                reports[name] = {"status": "failed", "count": 0, "seconds": None, "error": str(e)}
+                continue
+            rankings[name] = {self._passage_id(name, rank, doc): doc for rank, doc in enumerate(docs)}
+            reports[name] = {"status": "ok", "count": len(docs), "seconds": seconds, "error": None}
+
+        docs = self._merge(rankings)
+        seconds = time.perf_counter() - started
+        self._record(reports, len(docs), seconds)
+        return {"docs": docs, "sources": reports, "seconds": seconds}
+
+    def _record(self, reports, passages, seconds):
+        with self._lock:
+            self.calls += 1
+            self.passages += passages
+            self.total_seconds += seconds
+            for name, report in reports.items():
+                statuses = self.source_statuses.setdefault(name, {"ok": 0, "failed": 0, "timeout": 0})
+                statuses[report["status"]] += 1
+
+    def stats(self):
+        """
+        Report fan-out retrieval so far.
+
+        Returns:
+            dict: Number of retrievals, merged passages, mean seconds per retrieval and
+                how often each source answered, failed or timed out
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "passages": self.passages,
+                "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+                "sources": {name: dict(statuses) for name, statuses in self.source_statuses.items()}
+            }
@@ -0,0 +1,117 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from src.knowledgeBase.IndexRegistry import index_registry
+
+# Touched on every rerun of a session; its mtime tells when the session was last active
+_LAST_SEEN_FILE = ".last_seen"
+
+
+class SessionStores:
+    def __init__(self, root=None, idle_seconds=None, collect_interval=300):
+        """
+        Initialize the per-session layout of vector store directories.
+
+        Every browser session gets its own directory under root, so sessions never
+        read, overwrite or clear each other's indexes. Directories of sessions that
+        have been idle for idle_seconds are deleted.
+
+        Args:
+            root (str, optional): Parent directory of the session directories.
+                Defaults to VECTOR_STORE_ROOT, then .cache/vector_stores.
+            idle_seconds (float, optional): Idle time after which a session's stores are
+                deleted. Defaults to VECTOR_STORE_SESSION_TTL, then 6 hours.
+            collect_interval (float): Minimum seconds between two scans for idle sessions
+        """
+        self.root = root or os.getenv("VECTOR_STORE_ROOT", ".cache/vector_stores")
+        self.idle_seconds = idle_seconds or float(os.getenv("VECTOR_STORE_SESSION_TTL", str(6 * 3600)))
+        self.collect_interval = collect_interval
+        self._lock = threading.Lock()
+        self._last_collect = 0.0
+
+    @staticmethod
+    def current_session_id():
+        """
+        Return the id of the current Streamlit session, creating it on first use.
+
+        Returns:
+            str: Session id
+        """
+        if "vector_store_session" not in st.session_state:
+            st.session_state.vector_store_session = uuid.uuid4().hex
+        return st.session_state.vector_store_session
+
+    def store_path(self, name, session_id=None):
+        """
+        Return the directory of a session's vector store.
+
+        Args:
+            name (str): Store name (e.g. "pdf_faiss_index")
+            session_id (str, optional): Defaults to the current session
+
+        Returns:
+            str: Store directory
+        """
+        return os.path.join(self.root, session_id or self.current_session_id(), name)
+
+    def touch(self, session_id=None):
+        """
+        Mark a session as active.
+
+        Args:
+            session_id (str, optional): Defaults to the current session
+        """
+        session_dir = os.path.join(self.root, session_id or self.current_session_id())
+        os.makedirs(session_dir, exist_ok=True)
+        with open(os.path.join(session_dir, _LAST_SEEN_FILE), "a"):
+            pass
+        os.utime(os.path.join(session_dir, _LAST_SEEN_FILE))
+
+    def collect_idle(self, force=False):
+        """
+        Delete the stores of sessions idle for longer than idle_seconds.
+
+        Scans at most once per collect_interval unless forced, so it is cheap to call
+        on every rerun.
+
+        Args:
+            force (bool): Scan even if the last scan was recent
+
+        Returns:
+            int: Number of sessions removed
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_collect < self.collect_interval:
+                return 0
+            self._last_collect = now
+
+        try:
+            session_dirs = [entry for entry in os.scandir(self.root) if entry.is_dir()]
+        except FileNotFoundError:
+            return 0
+
+        removed = 0
+        for session_dir in session_dirs:
+            try:
+                last_seen = os.path.getmtime(os.path.join(session_dir.path, _LAST_SEEN_FILE))
+            except FileNotFoundError:
+                last_seen = session_dir.stat().st_mtime
+            if now - last_seen < self.idle_seconds:
+                continue
+
+            for store in os.scandir(session_dir.path):
+                if store.is_dir():
+                    index_registry.discard(store.path)
+            shutil.rmtree(session_dir.path, ignore_errors=True)
+            removed += 1
+        return removed
+
+
+# Shared by every helper in the process
+session_stores = SessionStores()
@@ -0,0 +1,263 @@
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+from collections.abc import Mapping
+
+import faiss
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+# Files of a vector store generation; save_store writes each pair into a new generation directory
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite3"
+# Names the generation directory readers should open, replaced atomically on every save
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+# Written by FAISS.save_local; only read by the explicit migrate_legacy_store step
+LEGACY_DOCSTORE_FILE = "index.pkl"
+
+
+class SqliteDocstore(Docstore):
+    def __init__(self, path):
+        """
+        Open a read-only docstore written by save_store.
+
+        Chunks are fetched one query at a time, so only the top-k hits of a search
+        are ever read from disk.
+
+        Args:
+            path (str): Location of the SQLite file
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def search(self, search):
+        """
+        Look up a chunk by docstore id.
+
+        Args:
+            search (str): Docstore id
+
+        Returns:
+            Document: The chunk, or a "not found" string like InMemoryDocstore
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT text, metadata FROM chunks WHERE id = ?", (search,)).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+    def position_to_id(self):
+        """Return a lazy mapping of FAISS positions to docstore ids."""
+        return _PositionMap(self)
+
+
+class _PositionMap(Mapping):
+    """index_to_docstore_id backed by the docstore table instead of an in-memory dict."""
+
+    def __init__(self, docstore):
+        self._docstore = docstore
+
+    def _query(self, sql, params=()):
+        with self._docstore._lock:
+            return self._docstore._conn.execute(sql, params).fetchall()
+
+    def __getitem__(self, position):
+        rows = self._query("SELECT id FROM chunks WHERE position = ?", (int(position),))
+        if not rows:
+            raise KeyError(position)
+        return rows[0][0]
+
+    def __iter__(self):
+        return iter([row[0] for row in self._query("SELECT position FROM chunks ORDER BY position")])
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM chunks")[0][0]
+
+
+def _generations(path):
+    """Return the generation numbers found in a vector store directory, oldest first."""
+    numbers = []
+    for name in os.listdir(path):
+        if name.startswith(GENERATION_PREFIX) and name[len(GENERATION_PREFIX):].isdigit():
+            numbers.append(int(name[len(GENERATION_PREFIX):]))
+    return sorted(numbers)
+
+
+def _live_directory(path):
+    """
+    Return the directory holding the index and docstore readers should open.
+
+    Raises:
+        FileNotFoundError: If there is no store, or only a legacy pickled one
+    """
+    current_path = os.path.join(path, CURRENT_FILE)
+    if os.path.exists(current_path):
+        with open(current_path, "r", encoding="utf-8") as current_file:
+            return os.path.join(path, current_file.read().strip())
+    if os.path.exists(os.path.join(path, DOCSTORE_FILE)):
+        # Written before generations, with the pair directly in the store directory
+        return path
+    if os.path.exists(os.path.join(path, LEGACY_DOCSTORE_FILE)):
+        raise FileNotFoundError(
+            f"{path} holds a pickled store; convert it once with "
+            f"python -m src.knowledgeBase.VectorStoreIO {path}"
+        )
+    raise FileNotFoundError(f"No vector store in {path}")
+
+
+def sidecar_path(path, name):
+    """
+    Return the path readers should open for a file saved alongside a store.
+
+    Args:
+        path (str): Vector store directory
+        name (str): File name passed to save_store in sidecars
+
+    Returns:
+        str: The file in the live generation, or in the store directory for stores
+            written before sidecars moved into the generation
+    """
+    try:
+        candidate = os.path.join(_live_directory(path), name)
+    except FileNotFoundError:
+        return os.path.join(path, name)
+    return candidate if os.path.exists(candidate) else os.path.join(path, name)
+
+
+def save_store(vector_store, path, sidecars=None):
+    """
+    Write a vector store as a raw FAISS index plus a SQLite docstore.
+
+    Both files, and any sidecars, are written into a new generation directory, then
+    CURRENT is replaced to point at it, so a reader always opens files written
+    together. The previous generation is kept for readers that read CURRENT just
+    before the switch; older ones are deleted.
+
+    Args:
+        vector_store (FAISS): The store to write
+        path (str): Vector store directory
+        sidecars (dict, optional): File name -> callable writing that file into the
+            directory it is given (e.g. the lexical index or a manifest)
+    """
+    sidecars = sidecars or {}
+    os.makedirs(path, exist_ok=True)
+    generations = _generations(path)
+    generation = f"{GENERATION_PREFIX}{(generations[-1] + 1) if generations else 1}"
+    generation_path = os.path.join(path, generation)
+    os.makedirs(generation_path)
+
+    faiss.write_index(vector_store.index, os.path.join(generation_path, INDEX_FILE))
+
+    conn = sqlite3.connect(os.path.join(generation_path, DOCSTORE_FILE))
+    try:
+        conn.execute(
+            "CREATE TABLE chunks (position INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, "
+            "text TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        rows = []
+        for position, chunk_id in vector_store.index_to_docstore_id.items():
+            doc = vector_store.docstore.search(chunk_id)
+            rows.append((int(position), chunk_id, doc.page_content, json.dumps(doc.metadata)))
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", rows)
+        # Lets fit_vector_store know when the index was trained on too small a corpus
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("INSERT INTO meta VALUES ('trained_vectors', ?)",
+                     (str(getattr(vector_store, "trained_vectors", None) or vector_store.index.ntotal),))
+        conn.commit()
+    finally:
+        conn.close()
+
+    for write_sidecar in sidecars.values():
+        write_sidecar(generation_path)
+
+    current_path = os.path.join(path, CURRENT_FILE)
+    with open(current_path + ".tmp", "w", encoding="utf-8") as current_file:
+        current_file.write(generation)
+    os.replace(current_path + ".tmp", current_path)
+
+    # Open (or memory-mapped) files stay readable after deletion on POSIX
+    for number in generations[:-1]:
+        shutil.rmtree(os.path.join(path, f"{GENERATION_PREFIX}{number}"), ignore_errors=True)
+    for name in (INDEX_FILE, DOCSTORE_FILE, LEGACY_DOCSTORE_FILE, *sidecars):
+        if os.path.exists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+
+
+def migrate_legacy_store(path):
+    """
+    Convert a store written by FAISS.save_local (index.faiss + pickled index.pkl).
+
+    Unpickling can run arbitrary code, so this is never done when loading: run it
+    once, by hand, on stores this app wrote.
+
+    Args:
+        path (str): Vector store directory
+
+    Returns:
+        bool: Whether there was a legacy store to convert
+    """
+    if not os.path.exists(os.path.join(path, LEGACY_DOCSTORE_FILE)):
+        return False
+    # The embeddings client is only needed for queries, not to rewrite the files
+    save_store(FAISS.load_local(path, None, allow_dangerous_deserialization=True), path)
+    return True
+
+
+def load_store(path, embeddings, mmap=True):
+    """
+    Open a vector store written by save_store.
+
+    Args:
+        path (str): Vector store directory
+        embeddings (Embeddings): Embeddings client used for queries
+        mmap (bool): Memory-map the index and read chunks lazily from SQLite, so opening
+            is near-instant and processes share pages through the OS cache. The store is
+            read-only; pass False to get an in-memory copy that can be modified.
+
+    Returns:
+        FAISS: The loaded vector store
+
+    Raises:
+        FileNotFoundError: If there is no store, or only a legacy one (see migrate_legacy_store)
+    """
+    # Both files come from the same generation, even if a writer switches CURRENT meanwhile
+    live_path = _live_directory(path)
+    docstore_path = os.path.join(live_path, DOCSTORE_FILE)
+
+    index_path = os.path.join(live_path, INDEX_FILE)
+    if mmap:
+        index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        docstore = SqliteDocstore(docstore_path)
+        return FAISS(embeddings, index, docstore, docstore.position_to_id())
+
+    index = faiss.read_index(index_path)
+    conn = sqlite3.connect(docstore_path)
+    try:
+        rows = conn.execute("SELECT position, id, text, metadata FROM chunks ORDER BY position").fetchall()
+        has_meta = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'").fetchone()
+        trained = conn.execute("SELECT value FROM meta WHERE key = 'trained_vectors'").fetchone() if has_meta else None
+    finally:
+        conn.close()
+    docstore = InMemoryDocstore({
+        chunk_id: Document(id=chunk_id, page_content=text, metadata=json.loads(metadata))
+        for _, chunk_id, text, metadata in rows
+    })
+    vector_store = FAISS(embeddings, index, docstore, {position: chunk_id for position, chunk_id, _, _ in rows})
+    # Stores written before the meta table count from their current size
+    vector_store.trained_vectors = int(trained[0]) if trained else index.ntotal
+    return vector_store
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.knowledgeBase.VectorStoreIO <store_dir> [<store_dir> ...]
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.knowledgeBase.VectorStoreIO <store_dir> [<store_dir> ...]")
+        sys.exit(1)
+    for store_path in sys.argv[1:]:
+        print(f"{store_path}: {'converted' if migrate_legacy_store(store_path) else 'no legacy store'}")
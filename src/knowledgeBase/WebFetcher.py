@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from langchain_community.document_loaders import WebBaseLoader
+from langchain_community.document_loaders.web_base import default_header_template
+
+
+class WebFetcher:
+    def __init__(self, max_workers=16, per_host_limit=4, timeout=15, verify_ssl=True):
+        """
+        Initialize a concurrent page fetcher backed by one pooled HTTP session.
+
+        Args:
+            max_workers (int): Maximum number of pages fetched at the same time
+            per_host_limit (int): Maximum concurrent requests to any single host
+            timeout (float): Connect/read timeout in seconds for each request
+            verify_ssl (bool): Whether to verify TLS certificates
+        """
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+        # One session for every fetch so TCP/TLS connections are reused per host
+        self.session = requests.Session()
+        # WebBaseLoader only applies its browser-like headers to sessions it creates itself
+        self.session.headers.update(default_header_template)
+        self.session.verify = verify_ssl
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def fetch_one(self, url):
+        """
+        Fetch and parse a single page.
+
+        Args:
+            url (str): URL to fetch
+
+        Returns:
+            list: Document objects for the page
+        """
+        loader = WebBaseLoader(
+            url,
+            session=self.session,
+            requests_kwargs={"timeout": self.timeout},
+            raise_for_status=True
+        )
+        with self._host_limit(url):
+            return loader.load()
+
+    def fetch(self, urls):
+        """
+        Fetch many pages concurrently. A failing URL does not affect the others.
+
+        Args:
+            urls (list): URLs to fetch
+
+        Returns:
+            tuple: List of Document objects (in URL order) and a dict of url -> error message
+        """
+        documents = []
+        failures = {}
+        if not urls:
+            return documents, failures
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            futures = [(url, executor.submit(self.fetch_one, url)) for url in urls]
+            for url, future in futures:
+                try:
+                    documents.extend(future.result())
+                except Exception as e:
+                    failures[url] = str(e)
+
+        return documents, failures
+
+
+# Shared by every helper in the process so the connection pool is reused
+web_fetcher = WebFetcher()
@@ -1,43 +1,45 @@
 import streamlit as st
-from langchain_community.document_loaders import WebBaseLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import asyncio
 import os
 import shutil
 
-from langchain_community.vectorstores import FAISS
+from src.knowledgeBase.EmbeddingCache import CachedEmbeddings
+from src.knowledgeBase.EmbeddingScheduler import EmbeddingScheduler
+from src.knowledgeBase.HybridRetriever import HybridRetriever
+from src.knowledgeBase.IndexFactory import build_vector_store, tune_index
+from src.knowledgeBase.IndexRegistry import index_registry
+from src.knowledgeBase.IngestionQueue import ingestion_queue
+from src.knowledgeBase.LexicalIndex import LexicalIndex
+from src.knowledgeBase.SessionStores import session_stores
+from src.knowledgeBase.VectorStoreIO import load_store, save_store
+from src.knowledgeBase.WebFetcher import web_fetcher
 
 
 class WebVectorHelper:
-    def __init__(self):
-        """Initialize the WebVectorHelper with embedding model."""
-        # Use the latest available embedding model
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-        self.vector_store_path = "web_faiss_index"
-
-    def get_web_text(self, urls):
+    def __init__(self, retriever=None, index_type=None, pca_dim=None, session_id=None, embeddings=None):
         """
-        Extract text content from a list of URLs.
+        Initialize the WebVectorHelper with embedding model.
 
         Args:
-            urls (list): List of URL strings to extract text from
-
-        Returns:
-            list: List of Document objects containing the extracted text
+            retriever (HybridRetriever, optional): Retrieval settings. Defaults to hybrid vector + BM25 search.
+            index_type (str, optional): FAISS index type (see IndexFactory.INDEX_TYPES). Defaults to VECTOR_INDEX_TYPE.
+            pca_dim (int, optional): Reduce embeddings to this many dimensions before indexing
+            session_id (str, optional): Session owning the store. Defaults to the current Streamlit session.
+            embeddings (Embeddings, optional): Embeddings client to use. Defaults to a new cached,
+                rate-limited Gemini client.
         """
-        try:
-            documents = []
-            for url in urls:
-                # Create a WebBaseLoader for the URL
-                loader = WebBaseLoader(url)
-                # Load the documents (web pages)
-                url_docs = loader.load()
-                documents.extend(url_docs)
-
-            return documents
-        except Exception as e:
-            st.error(f"Error extracting text from URLs: {e}")
-            return []
+        # Use the latest available embedding model, behind the shared on-disk cache.
+        # Cache misses go through the batched, rate-limited scheduler.
+        self.embeddings = embeddings if embeddings is not None else CachedEmbeddings(
+            EmbeddingScheduler(GoogleGenerativeAIEmbeddings(model="models/embedding-001"))
+        )
+        self.vector_store_path = session_stores.store_path("web_faiss_index", session_id)
+        self.fetcher = web_fetcher
+        self.retriever = retriever or HybridRetriever()
+        self.index_type = index_type
+        self.pca_dim = pca_dim
 
     @staticmethod
     def get_text_chunks(documents):
@@ -60,7 +62,7 @@ class WebVectorHelper:
 
     def get_vector_store(self, chunks):
         """
-        Create a FAISS vector store from document chunks.
+        Create a FAISS vector store, and a BM25 index next to it, from document chunks.
 
         Args:
             chunks (list): List of document chunks
@@ -68,60 +70,121 @@ class WebVectorHelper:
         Returns:
             FAISS: The FAISS vector store object
         """
-        vector_store = FAISS.from_documents(chunks, self.embeddings)
-        vector_store.save_local(self.vector_store_path)
+        vector_store = build_vector_store(
+            [chunk.page_content for chunk in chunks], self.embeddings,
+            metadatas=[chunk.metadata for chunk in chunks],
+            index_type=self.index_type, pca_dim=self.pca_dim
+        )
+        lexical_index = LexicalIndex()
+        lexical_index.add(list(vector_store.index_to_docstore_id.values()), [chunk.page_content for chunk in chunks])
+        save_store(vector_store, self.vector_store_path, sidecars={LexicalIndex.FILE_NAME: lexical_index.save})
+        index_registry.invalidate(self.vector_store_path)
+        return vector_store
+
+    def _load_vector_store(self, path):
+        """Load the FAISS index from disk. Only called by the index registry on a miss."""
+        vector_store = load_store(path, self.embeddings)
+        tune_index(vector_store.index)
         return vector_store
 
-    def get_relevant_documents(self, question):
+    def get_store_version(self):
         """
-        Retrieve documents relevant to a query from the vector store.
+        Return the version of the web vector store, bumped every time it is rebuilt or cleared.
+
+        Returns:
+            int: Current store version
+        """
+        return index_registry.version(self.vector_store_path)
+
+    async def aget_relevant_documents(self, question):
+        """
+        Retrieve the chunks most relevant to a query, for the async chat pipeline.
+        Does not use Streamlit.
+
+        The query embedding is awaited; loading the store (usually already in memory)
+        and the FAISS search run off the event loop.
 
         Args:
             question (str): The query to search for
 
         Returns:
-            list: List of relevant document chunks
+            list: Relevant Document objects, best first (empty if nothing is indexed)
         """
-        try:
-            # Check if the FAISS index exists
-            if not os.path.exists(self.vector_store_path):
-                st.toast("No web documents have been processed yet.", icon="🚨")
-                return []
-
-            # If index exists, proceed with similarity search
-            web_db = FAISS.load_local(self.vector_store_path, self.embeddings, allow_dangerous_deserialization=True)
-            docs = web_db.similarity_search(question)
-            return docs
-        except Exception as e:
-            st.error(f"Error retrieving web documents: {e}")
+        if not os.path.exists(self.vector_store_path):
             return []
 
-    def process_urls(self, urls):
+        web_db = await asyncio.to_thread(index_registry.get, self.vector_store_path, self._load_vector_store)
+        lexical_index = await asyncio.to_thread(index_registry.get, self.vector_store_path, LexicalIndex.load,
+                                                kind="lexical")
+        return await self.retriever.asearch(web_db, lexical_index, question)
+
+    def ingest_urls(self, urls, progress_callback=None, cancel_event=None):
         """
-        Process a list of URLs and create a vector store from their content.
+        Fetch, split, embed and index URLs, replacing the store. Does not use Streamlit,
+        so it can run on a background ingestion worker.
 
         Args:
             urls (list): List of URL strings to process
-        """
-        try:
-            # Extract text from URLs
-            web_documents = self.get_web_text(urls)
+            progress_callback (callable, optional): Called with (stage, done, total) for the
+                "extract" (URLs), "split" (documents), "embed" (chunks) and "index" stages.
+                It may raise to abort before the store is written.
+            cancel_event (threading.Event, optional): Set it to stop embedding early
 
-            if not web_documents:
-                st.error("Failed to extract content from the provided URLs.")
-                return
+        Returns:
+            dict: Number of pages loaded and {url: error} for the URLs that failed
+        """
+        def report(stage, done, total):
+            if progress_callback:
+                progress_callback(stage, done, total)
+
+        report("extract", 0, len(urls))
+        web_documents, failures = self.fetcher.fetch(urls)
+        report("extract", len(urls), len(urls))
+        if not web_documents:
+            return {"pages": 0, "failures": failures}
+
+        text_chunks = self.get_text_chunks(web_documents)
+        report("split", len(web_documents), len(web_documents))
+        if not text_chunks:
+            # The pages loaded but had no text to index
+            return {"pages": 0, "failures": failures}
+
+        # Embed up front with progress, so building the store is served from the embedding cache
+        self.embeddings.prefetch([chunk.page_content for chunk in text_chunks],
+                                 lambda done, total: report("embed", done, total), cancel_event)
+
+        self.get_vector_store(text_chunks)
+        report("index", 1, 1)
+        return {"pages": len(web_documents), "failures": failures}
+
+    def _ingest_job(self, job, urls):
+        """Run ingest_urls on an ingestion worker, reporting to the job."""
+        return self.ingest_urls(urls, job.report, job.cancel_event)
+
+    def submit_urls(self, urls):
+        """
+        Queue the indexing of URLs as a background ingestion job.
 
-            # Split documents into chunks
-            text_chunks = self.get_text_chunks(web_documents)
+        Args:
+            urls (list): List of URL strings to process
 
-            # Create and save vector store
-            self.get_vector_store(text_chunks)
+        Returns:
+            str: Id of the ingestion job; its result is the ingest_urls summary
+        """
+        return ingestion_queue.submit("web", self.vector_store_path, self._ingest_job, list(urls))
 
-            # Provide feedback
-            st.success(f"Processed {len(urls)} URL(s) successfully")
+    def remove_store(self):
+        """
+        Delete the store from disk and drop it from memory. Does not use Streamlit.
 
-        except Exception as e:
-            st.error(f"Error processing URLs: {e}")
+        Returns:
+            bool: Whether there was a store to delete
+        """
+        if not os.path.exists(self.vector_store_path):
+            return False
+        shutil.rmtree(self.vector_store_path)
+        index_registry.invalidate(self.vector_store_path)
+        return True
 
     def clear_vector_store(self, message=False):
         """
@@ -135,9 +198,15 @@ class WebVectorHelper:
             if 'web_urls' in st.session_state:
                 st.session_state.web_urls = []
 
-            if os.path.exists(self.vector_store_path):
-                shutil.rmtree(self.vector_store_path)
-                if message:
-                    st.success("Web documents and vector store have been cleared.")
+            # Nothing on disk: skip the job queue and the store lock (called on every sidebar render)
+            if not os.path.exists(self.vector_store_path):
+                return
+
+            # Stop ingestion jobs on this store and wait for them rather than deleting under them
+            ingestion_queue.cancel_store(self.vector_store_path)
+            with ingestion_queue.store_lock(self.vector_store_path):
+                cleared = self.remove_store()
+            if cleared and message:
+                st.success("Web documents and vector store have been cleared.")
         except Exception as e:
-            st.error(f"Error clearing web vector store: {e}")
\ No newline at end of file
+            st.error(f"Error clearing web vector store: {e}")
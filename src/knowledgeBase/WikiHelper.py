@@ -1,15 +1,205 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import wikipedia
+from langchain_core.documents import Document
+
+from src.knowledgeBase.WikiOfflineIndex import WikiOfflineIndex
+
+
+class WikiCache:
+    def __init__(self, path=".cache/wikipedia.sqlite3", ttl_seconds=86400, max_entries=10000):
+        """
+        Initialize a persistent cache of Wikipedia searches and summaries.
+
+        Args:
+            path (str): Location of the SQLite file holding the cache
+            ttl_seconds (float): How long a cached response stays valid
+            max_entries (int): Entries kept at most; the oldest are dropped first
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS wiki_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS wiki_cache_created ON wiki_cache (created)")
+        with self._lock:
+            self._purge()
+            self._conn.commit()
+
+    def _purge(self):
+        """Delete expired entries, then the oldest ones beyond max_entries. Caller holds the lock."""
+        self._conn.execute("DELETE FROM wiki_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM wiki_cache WHERE key IN "
+            "(SELECT key FROM wiki_cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM wiki_cache").fetchone()[0]
+
+    def get(self, key):
+        """
+        Return a cached value if it has not expired.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            object: The cached JSON value, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM wiki_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key (str): Cache key
+            value (object): Value to store
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO wiki_cache (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._purge()
+            self._conn.commit()
 
 
 class WikiHelper:
-    def __init__(self):
-        pass
+    def __init__(self, cache=None, max_workers=4, offline_index_path=None):
+        """
+        Initialize the WikiHelper.
+
+        Args:
+            cache (WikiCache, optional): Cache for searches and summaries. Defaults to a
+                cache at WIKI_CACHE_PATH (or .cache/wikipedia.sqlite3) holding at most
+                WIKI_CACHE_MAX_ENTRIES (or 10000) entries.
+            max_workers (int): Number of summaries fetched at the same time
+            offline_index_path (str, optional): Answer from a local index built with
+                WikiOfflineIndex instead of the live API. Defaults to WIKI_OFFLINE_INDEX.
+        """
+        self.cache = cache if cache is not None else WikiCache(
+            os.getenv("WIKI_CACHE_PATH", ".cache/wikipedia.sqlite3"),
+            max_entries=int(os.getenv("WIKI_CACHE_MAX_ENTRIES", "10000"))
+        )
+        self.max_workers = max_workers
+
+        offline_index_path = offline_index_path or os.getenv("WIKI_OFFLINE_INDEX")
+        self.offline_index = WikiOfflineIndex(offline_index_path) if offline_index_path else None
+
+    def _search(self, query):
+        """Search titles, served from the cache when possible."""
+        key = f"search:{query}"
+        results = self.cache.get(key)
+        if results is None:
+            results = wikipedia.search(query, results=3, suggestion=False)
+            self.cache.set(key, results)
+        return results
+
+    def _summary(self, title):
+        """
+        Fetch a page summary, served from the cache when possible.
+
+        Failures that depend on the page itself (disambiguation, missing page, redirect)
+        are cached too, so they are not retried on every question.
+
+        Returns:
+            dict: {"summary": text} on success, or {"error": kind, ...} on failure
+        """
+        key = f"summary:{title}"
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        try:
+            result = {"summary": wikipedia.summary(title, sentences=3, auto_suggest=False)}
+        except wikipedia.exceptions.DisambiguationError as e:
+            result = {"error": "disambiguation", "options": e.options[:3]}
+        except wikipedia.exceptions.RedirectError:
+            result = {"error": "redirect"}
+        except wikipedia.exceptions.PageError:
+            result = {"error": "page"}
+        except wikipedia.exceptions.HTTPTimeoutError:
+            # Transient, so not cached
+            return {"error": "timeout"}
+        except Exception as e:
+            return {"error": "other", "message": str(e)}
+
+        self.cache.set(key, result)
+        return result
 
     @staticmethod
-    def search_wikipedia(query):
+    def _format_error(title, result):
+        """Turn a failed summary lookup into the message shown to the user."""
+        if result["error"] == "disambiguation":
+            return f"Multiple possible matches found. Please be more specific.\nOptions: {', '.join(result['options'])}"
+        if result["error"] == "redirect":
+            return f"The page for '{title}' has been redirected. Please check the page title."
+        if result["error"] == "timeout":
+            return "Request timed out. Please try again later."
+        if result["error"] == "page":
+            return f"No detailed information found for '{title}'."
+        return f"Error fetching summary for '{title}': {result.get('message', '')}"
+
+    def _format_answer(self, query, search_results, summaries):
+        """Answer with the most relevant result that has a summary, or explain why there is none."""
+        for title in search_results:
+            if "summary" in summaries[title]:
+                others = [result for result in search_results if result != title]
+                return f"Closest Wikipedia match for '{query}':\n{summaries[title]['summary']}\n\n" + \
+                    f"Other related search results:\n" + \
+                    "\n".join(f"- {result}" for result in others[:2])
+
+        first_result = search_results[0]
+        return self._format_error(first_result, summaries[first_result])
+
+    def _offline_articles(self, query, k):
+        """Return the top k articles of the local index, best first."""
+        return [self.offline_index.document(doc_id) for doc_id, _ in self.offline_index.search(query, k=k)]
+
+    def _search_offline(self, query):
+        """Answer from the local index, with the same output format as the live API path."""
+        search_results = self._offline_articles(query, 3)
+        if not search_results:
+            return f"No Wikipedia entries found for '{query}'. Please try a different search term."
+
+        # Use the most relevant result that has a summary
+        for article in search_results:
+            if article["summary"]:
+                others = [result["title"] for result in search_results if result is not article]
+                return f"Closest Wikipedia match for '{query}':\n{article['summary']}\n\n" + \
+                    f"Other related search results:\n" + \
+                    "\n".join(f"- {result}" for result in others[:2])
+
+        return f"No detailed information found for '{search_results[0]['title']}'."
+
+    def search_wikipedia(self, query):
         """
         Enhanced Wikipedia search with multiple fallback strategies.
 
+        The summaries of all top results are fetched concurrently, so a failing first
+        result falls back to the next one without another round-trip.
+
         Args:
             query (str): Search query
 
@@ -19,31 +209,75 @@ class WikiHelper:
         try:
             # Perform the search
             print(f"Searching Wikipedia for: {query}")
-            search_results = wikipedia.search(query, results=3, suggestion=False)
-
-            if search_results:
-                # Attempt to fetch the summary of the most relevant page
-                first_result = search_results[0]
-
-                try:
-                    # Get the summary for the first search result
-                    summary = wikipedia.summary(first_result, sentences=3, auto_suggest=False)
-                    return f"Closest Wikipedia match for '{query}':\n{summary}\n\n" + \
-                        f"Other related search results:\n" + \
-                        "\n".join(f"- {result}" for result in search_results[1:3])
-                except wikipedia.exceptions.DisambiguationError as e:
-                    # Handle disambiguation (multiple options for the query)
-                    return f"Multiple possible matches found. Please be more specific.\nOptions: {', '.join(e.options[:3])}"
-                except wikipedia.exceptions.RedirectError:
-                    return f"The page for '{first_result}' has been redirected. Please check the page title."
-                except wikipedia.exceptions.HTTPTimeoutError:
-                    return "Request timed out. Please try again later."
-                except wikipedia.exceptions.PageError:
-                    return f"No detailed information found for '{first_result}'."
-                except Exception as e:
-                    return f"Error fetching summary for '{first_result}': {str(e)}"
-            else:
+            if self.offline_index is not None:
+                return self._search_offline(query)
+
+            search_results = self._search(query)
+            if not search_results:
                 return f"No Wikipedia entries found for '{query}'. Please try a different search term."
 
+            # Resolve every candidate at once
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                summaries = dict(zip(search_results, executor.map(self._summary, search_results)))
+
+            return self._format_answer(query, search_results, summaries)
+
         except Exception as e:
-            return f"An unexpected error occurred: {str(e)}"
\ No newline at end of file
+            return f"An unexpected error occurred: {str(e)}"
+
+    async def asearch_wikipedia(self, query):
+        """
+        Async version of search_wikipedia.
+
+        The wikipedia client and the offline index are blocking, so each request runs in
+        a worker thread, and the candidate summaries are awaited together.
+
+        Args:
+            query (str): Search query
+
+        Returns:
+            str: Wikipedia summary or explanation
+        """
+        try:
+            print(f"Searching Wikipedia for: {query}")
+            if self.offline_index is not None:
+                return await asyncio.to_thread(self._search_offline, query)
+
+            search_results = await asyncio.to_thread(self._search, query)
+            if not search_results:
+                return f"No Wikipedia entries found for '{query}'. Please try a different search term."
+
+            # Resolve every candidate at once
+            summaries = dict(zip(search_results, await asyncio.gather(
+                *(asyncio.to_thread(self._summary, title) for title in search_results))))
+            return self._format_answer(query, search_results, summaries)
+
+        except Exception as e:
+            return f"An unexpected error occurred: {str(e)}"
+
+    async def asearch_documents(self, query, k=3):
+        """
+        Return the summaries of the top Wikipedia results as passages for the RAG chain.
+
+        Summaries are fetched concurrently and served from the cache when possible; the
+        offline index is read in a worker thread.
+        Results without a summary (disambiguation, missing page, ...) are left out.
+
+        Args:
+            query (str): Search query
+            k (int): Number of search results to consider
+
+        Returns:
+            list: Document objects (summary text, title as source), best first
+        """
+        if self.offline_index is not None:
+            articles = await asyncio.to_thread(self._offline_articles, query, k)
+        else:
+            titles = (await asyncio.to_thread(self._search, query))[:k]
+            summaries = await asyncio.gather(*(asyncio.to_thread(self._summary, title) for title in titles))
+            articles = [{"title": title, "summary": summary.get("summary")}
+                        for title, summary in zip(titles, summaries)]
+
+        return [Document(page_content=article["summary"], id=f"wikipedia:{article['title']}",
+                         metadata={"source": f"wikipedia:{article['title']}", "title": article["title"]})
+                for article in articles if article["summary"]]
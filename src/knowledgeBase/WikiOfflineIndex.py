@@ -0,0 +1,370 @@
+import bz2
+import gzip
+import heapq
+import json
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import tempfile
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from src.knowledgeBase.Bm25 import idf, term_score, tokenize
+
+# Crude wikitext clean-up: enough to get readable summaries and index the prose
+_MARKUP_PATTERNS = [
+    (re.compile(r"<!--.*?-->", re.DOTALL), ""),
+    (re.compile(r"<ref[^>]*/>"), ""),
+    (re.compile(r"<ref[^>]*>.*?</ref>", re.DOTALL), ""),
+    (re.compile(r"\{\|.*?\|\}", re.DOTALL), ""),
+    (re.compile(r"\[\[(?:File|Image|Arquivo|Imagem|Category|Categoria):[^\]]*\]\]", re.IGNORECASE), ""),
+    (re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]"), r"\1"),
+    (re.compile(r"\[https?://\S+ ([^\]]+)\]"), r"\1"),
+    (re.compile(r"'{2,}"), ""),
+    (re.compile(r"<[^>]+>"), ""),
+    (re.compile(r"^=+.*?=+\s*$", re.MULTILINE), ""),
+]
+_TEMPLATE_PATTERN = re.compile(r"\{\{[^{}]*\}\}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def clean_markup(text):
+    """
+    Strip the most common wikitext markup, keeping the readable prose.
+
+    Args:
+        text (str): Raw wikitext (plain text passes through unchanged)
+
+    Returns:
+        str: Cleaned text
+    """
+    # Templates nest, so remove innermost ones until none are left
+    previous = None
+    while previous != text:
+        previous, text = text, _TEMPLATE_PATTERN.sub("", text)
+    for pattern, replacement in _MARKUP_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def extract_summary(text, sentences=3):
+    """
+    Build a short summary from the first paragraph of an article.
+
+    Args:
+        text (str): Article text (wikitext or plain text)
+        sentences (int): Maximum number of sentences to keep
+
+    Returns:
+        str: Summary text
+    """
+    for paragraph in clean_markup(text).split("\n"):
+        paragraph = paragraph.strip()
+        if len(paragraph) > 40:
+            return " ".join(_SENTENCE_END.split(paragraph)[:sentences])
+    return ""
+
+
+def _open_dump(path):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_articles(dump_path):
+    """
+    Stream (title, text) pairs from a Wikipedia dump or subset.
+
+    Supports MediaWiki XML exports (pages-articles*.xml[.bz2]) and JSON Lines files
+    with "title" and "text" fields (optionally .gz/.bz2 compressed). Redirects and
+    non-article namespaces are skipped.
+
+    Args:
+        dump_path (str): Path to the dump
+
+    Yields:
+        tuple: (title, text)
+    """
+    with _open_dump(dump_path) as dump:
+        if ".json" in os.path.basename(dump_path):
+            for line in dump:
+                if line.strip():
+                    article = json.loads(line)
+                    yield article["title"], article.get("text", "")
+            return
+
+        root = None
+        title, namespace, text, redirect = None, "0", "", False
+        for event, element in ET.iterparse(dump, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                title = element.text
+            elif tag == "ns":
+                namespace = element.text
+            elif tag == "redirect":
+                redirect = True
+            elif tag == "text":
+                text = element.text or ""
+            elif tag == "page":
+                if title and namespace == "0" and not redirect:
+                    yield title, text
+                title, namespace, text, redirect = None, "0", "", False
+                # Clearing the page alone would leave every (empty) page attached to the root
+                root.clear()
+
+
+def _write_run(block, directory, run_no):
+    """Write one in-memory block of postings as a sorted run file."""
+    path = os.path.join(directory, f"run_{run_no:05d}.jsonl")
+    with open(path, "w", encoding="utf-8") as run_file:
+        for term in sorted(block):
+            run_file.write(f"{term}\t{json.dumps(block[term])}\n")
+    return path
+
+
+def _read_run(path, run_no):
+    with open(path, "r", encoding="utf-8") as run_file:
+        for line in run_file:
+            term, postings = line.rstrip("\n").split("\t", 1)
+            yield term, run_no, postings
+
+
+def _merge_postings(merged, postings_file):
+    """
+    Write the postings of each term to postings_file, yielding its (term, first pair, document frequency).
+
+    Each run's share of a term is written as soon as it is merged, so memory holds one
+    run's postings at a time rather than a term's full list.
+    """
+    position = 0
+    current_term, current_df = None, 0
+    for term, _, postings in merged:
+        if term != current_term:
+            if current_term is not None:
+                yield current_term, position, current_df
+                position += current_df
+            current_term, current_df = term, 0
+        pairs = np.asarray(json.loads(postings), dtype=np.uint32)
+        pairs.tofile(postings_file)
+        current_df += len(pairs) // 2
+    if current_term is not None:
+        yield current_term, position, current_df
+
+
+def _flush_arrays(offsets, lengths, offsets_file, lengths_file):
+    """Append buffered document offsets and lengths to their array files and clear the buffers."""
+    total = sum(lengths)
+    np.asarray(offsets, dtype=np.uint64).tofile(offsets_file)
+    np.asarray(lengths, dtype=np.uint32).tofile(lengths_file)
+    offsets.clear()
+    lengths.clear()
+    return total
+
+
+def _write_vocab(path, entries):
+    """Write (term, first pair, document frequency) rows to a new SQLite vocabulary."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE vocab (term TEXT PRIMARY KEY, start INTEGER NOT NULL, df INTEGER NOT NULL)")
+        conn.executemany("INSERT INTO vocab (term, start, df) VALUES (?, ?, ?)", entries)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def build_index(dump_path, output_dir, block_size=50_000, max_articles=None, progress_callback=None):
+    """
+    Build an on-disk BM25 index over a Wikipedia dump.
+
+    Postings are accumulated in blocks of block_size articles, spilled to sorted run
+    files and merged at the end, so memory use stays bounded for full dumps.
+
+    Files written to output_dir:
+        postings.bin     uint32 (doc_id, tf) pairs, grouped by term
+        vocab.sqlite3    term -> first pair, document frequency
+        doc_lengths.bin  uint32 token count per article
+        doc_offsets.bin  uint64 byte offset of each article in docs.jsonl
+        docs.jsonl       {"title", "summary"} per article
+        meta.json        collection statistics
+
+    Args:
+        dump_path (str): Path to the dump (see iter_articles)
+        output_dir (str): Directory for the index files
+        block_size (int): Articles per in-memory block
+        max_articles (int, optional): Stop after this many articles (useful for subsets)
+        progress_callback (callable, optional): Called with the number of articles processed
+
+    Returns:
+        int: Number of articles indexed
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    run_dir = tempfile.mkdtemp(prefix="wiki_runs_", dir=output_dir)
+
+    # Offsets and lengths are flushed to their array files with each block, not kept for the whole dump
+    offsets = []
+    lengths = []
+    total_length = 0
+    run_paths = []
+    block = defaultdict(list)
+    n_docs = 0
+
+    try:
+        with open(os.path.join(output_dir, "docs.jsonl"), "wb") as docs_file, \
+                open(os.path.join(output_dir, "doc_lengths.bin"), "wb") as lengths_file, \
+                open(os.path.join(output_dir, "doc_offsets.bin"), "wb") as offsets_file:
+            for title, text in iter_articles(dump_path):
+                if max_articles is not None and n_docs >= max_articles:
+                    break
+
+                offsets.append(docs_file.tell())
+                record = {"title": title, "summary": extract_summary(text)}
+                docs_file.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+                counts = Counter(tokenize(f"{title} {clean_markup(text)}"))
+                lengths.append(sum(counts.values()))
+                for term, tf in counts.items():
+                    block[term].extend((n_docs, tf))
+
+                n_docs += 1
+                if n_docs % block_size == 0:
+                    run_paths.append(_write_run(block, run_dir, len(run_paths)))
+                    block = defaultdict(list)
+                    total_length += _flush_arrays(offsets, lengths, offsets_file, lengths_file)
+                    if progress_callback:
+                        progress_callback(n_docs)
+
+            if block:
+                run_paths.append(_write_run(block, run_dir, len(run_paths)))
+            total_length += _flush_arrays(offsets, lengths, offsets_file, lengths_file)
+
+        # Merge the sorted runs; runs hold increasing doc ids, so run order keeps postings sorted.
+        # The vocabulary goes straight to SQLite instead of being held in memory.
+        merged = heapq.merge(*(_read_run(path, run_no) for run_no, path in enumerate(run_paths)))
+        with open(os.path.join(output_dir, "postings.bin"), "wb") as postings_file:
+            _write_vocab(os.path.join(output_dir, "vocab.sqlite3"), _merge_postings(merged, postings_file))
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    with open(os.path.join(output_dir, "meta.json"), "w", encoding="utf-8") as meta_file:
+        json.dump({"n_docs": n_docs, "avg_doc_length": (total_length / n_docs) if n_docs else 0.0}, meta_file)
+
+    if progress_callback:
+        progress_callback(n_docs)
+    return n_docs
+
+
+class WikiOfflineIndex:
+    def __init__(self, path):
+        """
+        Open an index built by build_index.
+
+        Postings, document lengths and offsets are memory-mapped and the vocabulary is
+        an SQLite table, so opening is cheap and only the pages and terms touched by a
+        query are read from disk.
+
+        Args:
+            path (str): Directory holding the index files
+        """
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        vocab_path = os.path.join(path, "vocab.sqlite3")
+        if not os.path.exists(vocab_path):
+            raise FileNotFoundError(f"No vocab.sqlite3 in {path}; rebuild the index with build_index")
+        self._vocab = sqlite3.connect(f"file:{vocab_path}?mode=ro", uri=True, check_same_thread=False)
+        self._vocab_lock = threading.Lock()
+
+        self.n_docs = meta["n_docs"]
+        self.avg_doc_length = meta["avg_doc_length"] or 1.0
+        self.postings = self._memmap("postings.bin", np.uint32).reshape(-1, 2)
+        self.doc_lengths = self._memmap("doc_lengths.bin", np.uint32)
+        self.doc_offsets = self._memmap("doc_offsets.bin", np.uint64)
+
+        self._docs_file = open(os.path.join(path, "docs.jsonl"), "rb")
+        self._docs = mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ) if self.n_docs else None
+
+    def _memmap(self, name, dtype):
+        file_path = os.path.join(self.path, name)
+        if os.path.getsize(file_path) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r")
+
+    def _lookup_terms(self, terms):
+        """Return term -> (first pair, document frequency) for the terms in the vocabulary."""
+        if not terms:
+            return {}
+        placeholders = ",".join("?" * len(terms))
+        with self._vocab_lock:
+            rows = self._vocab.execute(
+                f"SELECT term, start, df FROM vocab WHERE term IN ({placeholders})", terms
+            ).fetchall()
+        return {term: (start, df) for term, start, df in rows}
+
+    def search(self, query, k=3):
+        """
+        Rank articles for a query with BM25.
+
+        Args:
+            query (str): Search query
+            k (int): Number of results
+
+        Returns:
+            list: (doc_id, score) pairs, best first
+        """
+        doc_ids, scores = [], []
+        for start, df in self._lookup_terms(sorted(set(tokenize(query)))).values():
+            pairs = self.postings[start:start + df]
+            docs = pairs[:, 0].astype(np.int64)
+            tfs = pairs[:, 1].astype(np.float32)
+            doc_ids.append(docs)
+            scores.append(term_score(tfs, self.doc_lengths[docs], self.avg_doc_length, idf(self.n_docs, df)))
+
+        if not doc_ids:
+            return []
+
+        unique_docs, inverse = np.unique(np.concatenate(doc_ids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(scores))
+        top = np.argsort(-totals)[:k] if len(totals) <= k else np.argpartition(-totals, k)[:k]
+        top = top[np.argsort(-totals[top])]
+        return [(int(unique_docs[i]), float(totals[i])) for i in top]
+
+    def document(self, doc_id):
+        """
+        Return the stored title and summary of an article.
+
+        Args:
+            doc_id (int): Article id returned by search
+
+        Returns:
+            dict: {"title": ..., "summary": ...}
+        """
+        start = int(self.doc_offsets[doc_id])
+        end = self._docs.find(b"\n", start)
+        return json.loads(self._docs[start:end if end != -1 else len(self._docs)])
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.knowledgeBase.WikiOfflineIndex <dump> <output_dir> [max_articles]
+    if len(sys.argv) < 3:
+        print("Usage: python -m src.knowledgeBase.WikiOfflineIndex <dump> <output_dir> [max_articles]")
+        sys.exit(1)
+    total = build_index(
+        sys.argv[1], sys.argv[2],
+        max_articles=int(sys.argv[3]) if len(sys.argv) > 3 else None,
+        progress_callback=lambda count: print(f"Indexed {count} articles")
+    )
+    print(f"Done: {total} articles in {sys.argv[2]}")
@@ -0,0 +1,215 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def chunk_ids(docs):
+    """
+    Identify the retrieved chunks an answer was generated from.
+
+    Args:
+        docs (list): Retrieved Document objects
+
+    Returns:
+        tuple: Sorted chunk ids (docstore id, or a hash of the text when there is none)
+    """
+    return tuple(sorted(
+        getattr(doc, "id", None) or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+        for doc in docs
+    ))
+
+
+def history_digest(chat_history):
+    """
+    Identify the conversation a question was asked in.
+
+    Args:
+        chat_history (str): Previous conversation, as built by HistoryWindow
+
+    Returns:
+        str: Hash of the history text ("" when there is no history)
+    """
+    if not chat_history:
+        return ""
+    return hashlib.sha1(chat_history.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    def __init__(self, embeddings=None, similarity_threshold=0.95, ttl_seconds=3600, max_entries=512):
+        """
+        Initialize an in-memory answer cache placed in front of Gemini.
+
+        Answers are keyed by the question as typed, the source they were generated from,
+        the ids of the retrieved chunks and the conversation so far, so a follow-up
+        question only hits in the same conversation state. A question that is not an
+        exact match can still hit when its embedding is close enough to a cached
+        question with the same source, chunks and conversation.
+
+        Args:
+            embeddings (Embeddings, optional): Used for near-duplicate matching. Exact matching only if None.
+            similarity_threshold (float): Minimum cosine similarity for a near-duplicate hit
+            ttl_seconds (float): How long an answer stays valid
+            max_entries (int): Maximum number of answers kept (least recently used are evicted)
+        """
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "semantic_hits": 0, "misses": 0, "expired": 0, "invalidated": 0}
+
+    def _embed(self, question):
+        if self.embeddings is None:
+            return None
+        try:
+            return self.embeddings.embed_query(question)
+        except Exception as e:
+            # Semantic matching is best effort; fall back to exact matching
+            print(f"Answer cache could not embed the question: {e}")
+            return None
+
+    @staticmethod
+    def _cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def _is_stale(self, key, entry, version, now):
+        """Drop an entry that expired or whose vector store was rebuilt. Caller holds the lock."""
+        if now - entry["created"] > self.ttl_seconds:
+            self.metrics["expired"] += 1
+        elif entry["version"] != version:
+            self.metrics["invalidated"] += 1
+        else:
+            return False
+        del self._entries[key]
+        return True
+
+    @staticmethod
+    def _key(question, source, docs, chat_history):
+        return question.strip(), source, chunk_ids(docs), history_digest(chat_history)
+
+    def lookup(self, question, source, docs, version=0, chat_history=""):
+        """
+        Return a cached answer for the question, if there is a valid one.
+
+        Args:
+            question (str): The question as typed (cleaning can drop words such as "not")
+            source (str): The active source (e.g. vector store path, or "internet:<session id>")
+            docs (list): Retrieved Document objects the answer would be based on
+            version (int): Current version of the source's vector store
+            chat_history (str): Previous conversation, as built by HistoryWindow
+
+        Returns:
+            str: The cached answer, or None on a miss
+        """
+        key = self._key(question, source, docs, chat_history)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_stale(key, entry, version, now):
+                self._entries.move_to_end(key)
+                self.metrics["hits"] += 1
+                return entry["answer"]
+            # Only embed the question when there is a cached one to compare it with
+            has_candidates = any(other_key[1:] == key[1:] for other_key in self._entries)
+
+        vector = self._embed(question) if has_candidates else None
+        with self._lock:
+            if vector is not None:
+                best_key, best_score = None, self.similarity_threshold
+                for other_key, other in list(self._entries.items()):
+                    if other_key[1:] != key[1:] or other["vector"] is None:
+                        continue
+                    if self._is_stale(other_key, other, version, now):
+                        continue
+                    score = self._cosine(vector, other["vector"])
+                    if score >= best_score:
+                        best_key, best_score = other_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.metrics["semantic_hits"] += 1
+                    return self._entries[best_key]["answer"]
+
+            self.metrics["misses"] += 1
+            return None
+
+    def store(self, question, source, docs, version, answer, chat_history=""):
+        """
+        Cache an answer.
+
+        Args:
+            question (str): The question as typed
+            source (str): The active source
+            docs (list): Retrieved Document objects the answer was based on
+            version (int): Version of the source's vector store when the answer was generated
+            answer (str): The generated answer
+            chat_history (str): Previous conversation the answer was generated with
+        """
+        key = self._key(question, source, docs, chat_history)
+        # Served from the embedding cache when lookup() already embedded the same question
+        vector = self._embed(question)
+        with self._lock:
+            self._entries[key] = {"answer": answer, "vector": vector, "version": version, "created": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, source):
+        """
+        Drop every answer generated from a source.
+
+        Args:
+            source (str): The source whose answers are no longer valid
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == source]:
+                del self._entries[key]
+                self.metrics["invalidated"] += 1
+
+    def stats(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: Counters, number of entries and overall hit rate
+        """
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["semantic_hits"] + self.metrics["misses"]
+            hits = self.metrics["hits"] + self.metrics["semantic_hits"]
+            return dict(self.metrics, entries=len(self._entries), hit_rate=hits / lookups if lookups else 0.0)
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache(embeddings=None):
+    """
+    Return the process-wide answer cache, creating it on first use.
+
+    The threshold and TTL can be overridden with the ANSWER_CACHE_SIMILARITY and
+    ANSWER_CACHE_TTL_SECONDS environment variables.
+
+    Args:
+        embeddings (Embeddings, optional): Client for near-duplicate matching, used when
+            the cache is created; pass the shared one so its calls go through the same
+            scheduler. Exact matching only if None.
+
+    Returns:
+        AnswerCache: The shared cache instance
+    """
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache(
+                embeddings=embeddings,
+                similarity_threshold=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95")),
+                ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+            )
+        return _answer_cache
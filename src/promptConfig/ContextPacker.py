@@ -0,0 +1,189 @@
+import math
+import os
+import re
+import threading
+
+# Chunks are split with a 300-character overlap; look a bit further to be safe
+MAX_OVERLAP_CHARS = 400
+# Shorter matches are treated as coincidence rather than chunk overlap
+MIN_OVERLAP_CHARS = 40
+# Do not bother sending a truncated passage shorter than this
+MIN_PASSAGE_TOKENS = 40
+
+_CHUNK_POSITION = re.compile(r"-(\d+)$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens of a text without calling the API.
+
+    Gemini averages roughly four characters per token for English and Portuguese prose.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / 4)
+
+
+def merge_overlap(first, second):
+    """
+    Join two consecutive chunks, dropping the text the splitter repeated in both.
+
+    Args:
+        first (str): Earlier chunk
+        second (str): Later chunk
+
+    Returns:
+        str: The merged text, or None if the chunks do not overlap
+    """
+    if second in first:
+        return first
+    tail = first[-MAX_OVERLAP_CHARS:]
+    start = tail.find(second[:MIN_OVERLAP_CHARS])
+    # The first match is the longest overlap
+    while start != -1:
+        if second.startswith(tail[start:]):
+            return first + second[len(tail) - start:]
+        start = tail.find(second[:MIN_OVERLAP_CHARS], start + 1)
+    return None
+
+
+def _truncate(text, max_tokens):
+    """Cut a passage to a token budget, preferring a sentence boundary."""
+    cut = text[:max_tokens * 4]
+    sentence_ends = [match.end() for match in _SENTENCE_END.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] > len(cut) // 2:
+        return cut[:sentence_ends[-1]].rstrip()
+    return cut.rsplit(" ", 1)[0] + " ..."
+
+
+class ContextPacker:
+    def __init__(self, token_budget=None):
+        """
+        Initialize the stage that turns retrieved chunks into the RAG prompt context.
+
+        Args:
+            token_budget (int, optional): Maximum estimated tokens of context per prompt.
+                Defaults to RAG_CONTEXT_TOKEN_BUDGET, then 3000.
+        """
+        self.token_budget = token_budget or int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "3000"))
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def _source(doc):
+        """Document a chunk belongs to, from its metadata."""
+        return doc.metadata.get("document_id") or doc.metadata.get("source")
+
+    @staticmethod
+    def _position(doc):
+        """Chunk number within its document, from ids like "<document_id>-<n>"."""
+        match = _CHUNK_POSITION.search(getattr(doc, "id", None) or "")
+        return int(match.group(1)) if match else None
+
+    def _group(self, docs):
+        """
+        Merge chunks of the same document that overlap or are adjacent.
+
+        Returns:
+            list: (best rank, text) per merged passage
+        """
+        passages = []
+        by_source = {}
+        for rank, doc in enumerate(docs):
+            by_source.setdefault(self._source(doc), []).append((rank, doc))
+
+        for source, members in by_source.items():
+            if source is None:
+                passages.extend((rank, doc.page_content) for rank, doc in members)
+                continue
+
+            # Document order when chunk positions are known, retrieval order otherwise
+            members.sort(key=lambda member: (self._position(member[1]) is None, self._position(member[1]) or 0))
+            current_rank, current_text = members[0][0], members[0][1].page_content
+            for rank, doc in members[1:]:
+                merged = merge_overlap(current_text, doc.page_content)
+                if merged is None:
+                    passages.append((current_rank, current_text))
+                    current_rank, current_text = rank, doc.page_content
+                else:
+                    current_rank, current_text = min(current_rank, rank), merged
+            passages.append((current_rank, current_text))
+
+        return sorted(passages)
+
+    def pack(self, docs):
+        """
+        Build the context text for a prompt from retrieved chunks.
+
+        Overlapping and adjacent chunks of the same document are merged, metadata is
+        left out, passages are ordered by their best retrieval rank, and the result is
+        cut to the token budget.
+
+        Args:
+            docs (list): Retrieved Document objects, best first
+
+        Returns:
+            dict: "context" text, estimated "tokens" sent, "raw_tokens" of the
+                unpacked documents, "tokens_saved" and number of "passages"
+        """
+        # What the prompt used to receive: the stringified list of Documents
+        raw_tokens = estimate_tokens(str(docs))
+
+        parts = []
+        used = 0
+        for _, text in self._group(docs):
+            text = text.strip()
+            tokens = estimate_tokens(text)
+            remaining = self.token_budget - used
+            if tokens > remaining:
+                if remaining < MIN_PASSAGE_TOKENS:
+                    break
+                text = _truncate(text, remaining)
+                tokens = estimate_tokens(text)
+            parts.append(f"[{len(parts) + 1}] {text}")
+            used += tokens
+
+        context = "\n\n".join(parts)
+        tokens = estimate_tokens(context)
+        with self._lock:
+            self.calls += 1
+            self.tokens_sent += tokens
+            self.tokens_saved += max(0, raw_tokens - tokens)
+
+        return {
+            "context": context,
+            "tokens": tokens,
+            "raw_tokens": raw_tokens,
+            "tokens_saved": max(0, raw_tokens - tokens),
+            "passages": len(parts)
+        }
+
+    def stats(self):
+        """
+        Report the effect of packing so far.
+
+        Returns:
+            dict: Number of packed prompts, estimated context tokens sent and saved
+        """
+        with self._lock:
+            return {"calls": self.calls, "tokens_sent": self.tokens_sent, "tokens_saved": self.tokens_saved}
+
+
+def format_chat_history(chat_history):
+    """
+    Render chat history as plain "role: text" lines instead of a list repr.
+
+    Args:
+        chat_history (list): (role, text) pairs
+
+    Returns:
+        str: One line per message
+    """
+    return "\n".join(f"{role}: {text}" for role, text in chat_history)
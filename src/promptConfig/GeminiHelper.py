@@ -1,12 +1,14 @@
 import os
 from dotenv import load_dotenv
 
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 import google.generativeai as genai
 
+from src.promptConfig.ContextPacker import ContextPacker, format_chat_history
+from src.promptConfig.GeminiRegistry import gemini_registry
+
 # Load environment variables
 load_dotenv()
 
@@ -14,7 +16,27 @@ load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 
+class ErrorText(str):
+    """Text returned or yielded in place of an answer when generation fails."""
+
+
 class GeminiHelper:
+    # Prefix of the text returned instead of an answer when generation fails
+    ERROR_PREFIX = "I'm sorry, but I couldn't generate a response."
+
+    @staticmethod
+    def error_text(error):
+        """
+        Build the message shown instead of an answer.
+
+        Args:
+            error (Exception): Why generation failed
+
+        Returns:
+            ErrorText: The message, marked so callers can tell it from an answer
+        """
+        return ErrorText(f"{GeminiHelper.ERROR_PREFIX} Error: {error}")
+
     def __init__(self, model_name='gemini-2.0-flash', temperature=0.5):
         """
         Initialize the GeminiHelper with a specific model.
@@ -23,15 +45,33 @@ class GeminiHelper:
             model_name (str, optional): Name of the Gemini model to use.
             Defaults to 'gemini-2.0-flash'.
         """
-        # Use ChatGoogleGenerativeAI wrapper instead of direct GenerativeModel
-        self.model = ChatGoogleGenerativeAI(
-            model=model_name,
-            convert_system_message_to_human=True
-        )
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        self.model_name = model_name
         self.temperature = temperature
+        # Use ChatGoogleGenerativeAI wrapper instead of direct GenerativeModel, shared process-wide.
+        # The RAG chain keeps the library default temperature, as it always has.
+        self.model = gemini_registry.get_chat_model(model_name)
+        # Turns retrieved chunks into a compact, token-budgeted prompt context
+        self.context_packer = ContextPacker()
+
+    def warm_up(self, ping=False):
+        """
+        Build the shared clients and RAG chain before the first question.
+
+        Args:
+            ping (bool): Also open the connection with a cheap request
+        """
+        gemini_registry.warm_up(self.model_name, self.temperature, self._build_rag_chain, ping)
 
     def create_rag_chain(self):
+        """
+        Return the modern Retrieval-Augmented Generation (RAG) chain, compiled once per process.
+
+        Returns:
+            A LangChain RAG chain for question-answering
+        """
+        return gemini_registry.get_rag_chain(self.model_name, self.temperature, self._build_rag_chain)
+
+    def _build_rag_chain(self):
         """
         Create a modern Retrieval-Augmented Generation (RAG) chain.
 
@@ -78,87 +118,139 @@ class GeminiHelper:
 
         return rag_chain
 
-    def get_gemini_response(self, question, context=None, chat_history=None):
+    def _build_full_query(self, question, context=None, chat_history=None):
         """
-        Generate a response using Gemini's full knowledge base.
+        Build the single prompt sent to Gemini by the direct (non-RAG) path.
 
         Args:
             question (str): The input question
             context (str, optional): Additional context to supplement the answer
-            chat_history (list, optional): Previous conversation history
+            chat_history (str, optional): Previous conversation, as built by HistoryWindow
 
         Returns:
-            str: The generated response text
+            str: The full prompt text
+        """
+        # Construct a comprehensive prompt that includes context, chat history, and question
+        full_query_parts = []
+
+        template = (
+            """You are an AI assistant that provides precise and accurate answers.
+            Always answer in the same language as the question.
+            If asked in Portuguese, answer in Portuguese.
+            Follow these guidelines carefully:
+            1. If the context provides relevant information, use it to form your answer.
+            2. Always be clear about the source of your information:
+              - If using context, mention "Based on the provided documents:"
+              - If using general knowledge, mention "Based on my general knowledge:"
+            3. If the context does not contain sufficient information to answer the question, 
+              clearly state this and offer to help find more information.
+            4. Answer in the same language as the question.
+            5. Be concise but comprehensive.
+            6. If the question is not clear, ask for clarification.
+            7. Do not correct any grammar or spelling mistakes, even if they are minor.
+            8. Keep your answers short and precise.
+            """
+        )
+
+        full_query_parts.append(template)
+        # Add context if provided
+        if context:
+            full_query_parts.append(f"Context: {context}")
+
+        # Add chat history if provided; HistoryWindow has already bounded it
+        if chat_history:
+            if isinstance(chat_history, list):
+                chat_history = format_chat_history(chat_history)
+            full_query_parts.append(f"Previous Conversation:\n{chat_history}")
+
+        # Add the main question
+        full_query_parts.append(f"Question: {question}")
+        full_query_parts.append("Please provide a comprehensive answer.")
+
+        # Join all parts
+        return "\n\n".join(full_query_parts)
+
+    def _get_generative_model(self):
+        # Shared model: the API key is configured once at import time
+        return gemini_registry.get_generative_model(self.model_name, self.temperature)
+
+    def summarize_history(self, summary, messages):
+        """
+        Fold older chat messages into the running conversation summary.
+
+        Called by HistoryWindow off the request path; errors propagate so a failed
+        call never replaces the summary.
+
+        Args:
+            summary (str): Current summary, empty for the first fold
+            messages (list): (role, text) pairs to add to the summary
+
+        Returns:
+            str: The updated summary
+        """
+        prompt = (
+            "Update the summary of a conversation between a user and an AI assistant.\n"
+            "Keep facts, names, decisions and open questions; drop greetings and filler.\n"
+            "Write at most 150 words, in the language of the conversation.\n\n"
+            f"Current summary:\n{summary or '(empty)'}\n\n"
+            f"New messages:\n{format_chat_history(messages)}\n\n"
+            "Updated summary:"
+        )
+        with gemini_registry.timed_call("summarize_history"):
+            response = self._get_generative_model().generate_content(prompt)
+        return response.text.strip()
+
+    def _pack_rag_inputs(self, inputs):
+        """Replace the retrieved Documents and chat history in the chain inputs with prompt text."""
+        # Tokens sent and saved accumulate in self.context_packer.stats()
+        packed = self.context_packer.pack(inputs.get("context", []))
+        chat_history = inputs.get("chat_history", "")
+        if isinstance(chat_history, list):
+            chat_history = format_chat_history(chat_history)
+        return {**inputs, "context": packed["context"], "chat_history": chat_history}
+
+    async def astream_gemini_response(self, question, context=None, chat_history=None):
+        """
+        Stream a response from Gemini's full knowledge base as it is generated.
+
+        Args:
+            question (str): The input question
+            context (str, optional): Additional context to supplement the answer
+            chat_history (str, optional): Previous conversation, as built by HistoryWindow
+
+        Yields:
+            str: Pieces of the response text, in order
         """
         try:
-            # Import genai directly to ensure we have the correct module
-            import google.generativeai as genai
-
-            # Configure the API key again to ensure it's set
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
-            # Create a generative model
-            model = genai.GenerativeModel('gemini-2.0-flash',generation_config={"temperature": self.temperature})
-
-            # Construct a comprehensive prompt that includes context, chat history, and question
-            full_query_parts = []
-
-            template = (
-                """You are an AI assistant that provides precise and accurate answers.
-                Always answer in the same language as the question.
-                If asked in Portuguese, answer in Portuguese.
-                Follow these guidelines carefully:
-                1. If the context provides relevant information, use it to form your answer.
-                2. Always be clear about the source of your information:
-                  - If using context, mention "Based on the provided documents:"
-                  - If using general knowledge, mention "Based on my general knowledge:"
-                3. If the context does not contain sufficient information to answer the question, 
-                  clearly state this and offer to help find more information.
-                4. Answer in the same language as the question.
-                5. Be concise but comprehensive.
-                6. If the question is not clear, ask for clarification.
-                7. Do not correct any grammar or spelling mistakes, even if they are minor.
-                8. Keep your answers short and precise.
-                """
-            )
-
-            full_query_parts.append(template)
-            # Add context if provided
-            if context:
-                full_query_parts.append(f"Context: {context}")
-
-            # Add chat history if provided and it's a list of dictionaries
-            if chat_history:
-                # Safely handle different chat history formats
-                if isinstance(chat_history, list):
-                    print("chat_history is list")
-                    try:
-                        # Try to extract text from dictionary-style chat history
-                        history_str = "\n".join([
-                            f"{msg.get('role', 'Unknown')}: {msg.get('parts', [msg.get('content', 'No message')])}"
-                            for msg in chat_history[-3:]
-                        ])
-                    except Exception:
-                        # Fallback to string representation if dictionary access fails
-                        history_str = "\n".join(str(msg) for msg in chat_history[-3:])
-
-                    full_query_parts.append(f"Previous Conversation:\n{history_str}")
-                elif isinstance(chat_history, str):
-                    print("chat_history is string")
-                    # If chat_history is already a string
-                    full_query_parts.append(f"Previous Conversation:\n{chat_history}")
-
-            # Add the main question
-            full_query_parts.append(f"Question: {question}")
-            full_query_parts.append("Please provide a comprehensive answer.")
-
-            # Join all parts
-            full_query = "\n\n".join(full_query_parts)
-
-            # Generate the response
-            response = model.generate_content(full_query)
-
-            return response.text
+            model = self._get_generative_model()
+            full_query = self._build_full_query(question, context, chat_history)
+
+            with gemini_registry.timed_call("generate_stream"):
+                response = await model.generate_content_async(full_query, stream=True)
+                async for chunk in response:
+                    if chunk.parts:
+                        yield chunk.text
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            yield GeminiHelper.error_text(e)
+
+    async def astream_rag_response(self, inputs):
+        """
+        Stream the answer of the RAG chain as it is generated.
+
+        Args:
+            inputs (dict): Chain inputs with "context" (retrieved Documents), "question"
+                and "chat_history" (text built by HistoryWindow)
+
+        Yields:
+            str: Pieces of the response text, in order
+        """
+        try:
+            inputs = self._pack_rag_inputs(inputs)
+
+            with gemini_registry.timed_call("rag_stream"):
+                async for chunk in self.create_rag_chain().astream(inputs):
+                    yield chunk
         except Exception as e:
             print(f"An error occurred: {e}")
-            return f"I'm sorry, but I couldn't generate a response. Error: {e}"
\ No newline at end of file
+            yield GeminiHelper.error_text(e)
@@ -0,0 +1,138 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import google.generativeai as genai
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+
+class GeminiRegistry:
+    def __init__(self):
+        """
+        Initialize a process-wide registry of Gemini clients and compiled RAG chains.
+
+        Each (model, temperature) pair is built once and shared by every session, so
+        the underlying HTTP/gRPC connections are reused across questions and users.
+        """
+        self._lock = threading.RLock()
+        self._chat_models = {}
+        self._generative_models = {}
+        self._rag_chains = {}
+        self._construction_seconds = {}
+        self._calls = {}
+        self._pinged = set()
+
+    def _get_or_build(self, cache, kind, key, build):
+        with self._lock:
+            if key not in cache:
+                started = time.perf_counter()
+                cache[key] = build()
+                self._construction_seconds[(kind,) + key] = time.perf_counter() - started
+            return cache[key]
+
+    def get_chat_model(self, model_name, temperature=None):
+        """
+        Return the shared LangChain chat model for a (model, temperature) pair.
+
+        Args:
+            model_name (str): Gemini model name
+            temperature (float, optional): Sampling temperature. None keeps the library default.
+
+        Returns:
+            ChatGoogleGenerativeAI: The shared chat model
+        """
+        options = {} if temperature is None else {"temperature": temperature}
+        return self._get_or_build(
+            self._chat_models, "chat_model", (model_name, temperature),
+            lambda: ChatGoogleGenerativeAI(
+                model=model_name,
+                convert_system_message_to_human=True,
+                **options
+            )
+        )
+
+    def get_generative_model(self, model_name, temperature):
+        """
+        Return the shared google.generativeai model for a (model, temperature) pair.
+
+        Args:
+            model_name (str): Gemini model name
+            temperature (float): Sampling temperature
+
+        Returns:
+            genai.GenerativeModel: The shared model
+        """
+        return self._get_or_build(
+            self._generative_models, "generative_model", (model_name, temperature),
+            lambda: genai.GenerativeModel(model_name, generation_config={"temperature": temperature})
+        )
+
+    def get_rag_chain(self, model_name, temperature, build_chain):
+        """
+        Return the compiled RAG chain for a (model, temperature) pair.
+
+        Args:
+            model_name (str): Gemini model name
+            temperature (float): Sampling temperature
+            build_chain (callable): Builds the chain on first use
+
+        Returns:
+            Runnable: The shared RAG chain
+        """
+        return self._get_or_build(self._rag_chains, "rag_chain", (model_name, temperature), build_chain)
+
+    @contextmanager
+    def timed_call(self, kind):
+        """
+        Measure the latency of a model call and add it to the call statistics.
+
+        Args:
+            kind (str): Label of the call (e.g. "generate", "rag_stream")
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                count, total = self._calls.get(kind, (0, 0.0))
+                self._calls[kind] = (count + 1, total + elapsed)
+
+    def warm_up(self, model_name, temperature, build_chain=None, ping=False):
+        """
+        Build the clients (and chain) for a model ahead of the first question.
+
+        Args:
+            model_name (str): Gemini model name
+            temperature (float): Sampling temperature
+            build_chain (callable, optional): Also compile the RAG chain with this builder
+            ping (bool): Also make a cheap count_tokens request to open the connection.
+                Only done once per model, so calling this on every rerun is cheap.
+        """
+        self.get_chat_model(model_name)
+        model = self.get_generative_model(model_name, temperature)
+        if build_chain is not None:
+            self.get_rag_chain(model_name, temperature, build_chain)
+        if ping and (model_name, temperature) not in self._pinged:
+            self._pinged.add((model_name, temperature))
+            with self.timed_call("warm_up_ping"):
+                model.count_tokens("ping")
+
+    def stats(self):
+        """
+        Report construction overhead versus steady-state call latency.
+
+        Returns:
+            dict: Seconds spent building each object, and count/mean latency per call kind
+        """
+        with self._lock:
+            return {
+                "construction_seconds": {"/".join(map(str, key)): seconds
+                                         for key, seconds in self._construction_seconds.items()},
+                "calls": {kind: {"count": count, "mean_seconds": total / count}
+                          for kind, (count, total) in self._calls.items()}
+            }
+
+
+# Shared by every GeminiHelper in the process
+gemini_registry = GeminiRegistry()
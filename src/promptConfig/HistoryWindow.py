@@ -0,0 +1,151 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.promptConfig.ContextPacker import estimate_tokens, format_chat_history
+
+# Summaries are folded here, off the path that answers the question
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+
+class ConversationMemory:
+    def __init__(self):
+        """
+        Initialize the summary state of one conversation.
+
+        Kept in st.session_state by reference; the background summarizer updates this
+        object, never the session state itself.
+        """
+        self._lock = threading.Lock()
+        self.summary = ""
+        # Messages (from the start of the conversation) already folded into the summary
+        self.summarized_count = 0
+        self.pending = None
+        # Running totals rather than a per-turn list, so long conversations stay small
+        self.turns = 0
+        self.history_tokens = 0
+
+    def snapshot(self):
+        with self._lock:
+            return self.summary, self.summarized_count
+
+    def stats(self):
+        """
+        Report the history sent so far in this conversation.
+
+        Returns:
+            dict: Number of turns, total and mean estimated history tokens per turn
+        """
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "history_tokens": self.history_tokens,
+                "mean_tokens": self.history_tokens / self.turns if self.turns else 0.0
+            }
+
+
+class HistoryWindow:
+    def __init__(self, summarize, keep_turns=None):
+        """
+        Initialize the history policy shared by the RAG and direct Gemini paths.
+
+        The last keep_turns turns are sent verbatim. Older messages are folded into a
+        running summary in the background; until a fold finishes, the messages it
+        covers are still sent verbatim, so nothing drops out of the prompt.
+
+        Args:
+            summarize (callable): Called as summarize(summary, messages) with the current
+                summary and (role, text) pairs to fold in; returns the new summary
+            keep_turns (int, optional): Recent question/answer turns kept verbatim.
+                Defaults to CHAT_HISTORY_TURNS, then 3.
+        """
+        self.summarize = summarize
+        self.keep_turns = keep_turns or int(os.getenv("CHAT_HISTORY_TURNS", "3"))
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.verbatim_messages = 0
+        self.summarized_messages = 0
+        self.tokens_sent = 0
+        self.summary_failures = 0
+
+    def _fold(self, memory, messages, end):
+        """Fold messages into the summary. Runs on the summary executor."""
+        try:
+            summary, _ = memory.snapshot()
+            new_summary = self.summarize(summary, messages)
+            with memory._lock:
+                memory.summary = new_summary
+                memory.summarized_count = end
+        except Exception as e:
+            # Keep the previous summary; the next turn retries
+            with self._lock:
+                self.summary_failures += 1
+            print(f"History summarization failed: {e}")
+        finally:
+            with memory._lock:
+                memory.pending = None
+
+    def _schedule(self, memory, older):
+        """Start folding the older messages that are not in the summary yet."""
+        with memory._lock:
+            if memory.pending is not None or len(older) <= memory.summarized_count:
+                return
+            start = memory.summarized_count
+            memory.pending = _summary_executor.submit(self._fold, memory, older[start:], len(older))
+
+    def build(self, memory, messages):
+        """
+        Build the chat history text for the next prompt.
+
+        Args:
+            memory (ConversationMemory): Summary state of the conversation
+            messages (list): Previous (role, text) pairs, oldest first, without the
+                question being answered
+
+        Returns:
+            dict: History "text", its estimated "tokens", and how many messages were
+                sent "verbatim" and "summarized"
+        """
+        keep = self.keep_turns * 2
+        older = messages[:-keep] if keep < len(messages) else []
+        recent = messages[-keep:]
+        self._schedule(memory, older)
+
+        summary, summarized_count = memory.snapshot()
+        # Older messages the summary does not cover yet are sent verbatim
+        verbatim = list(older[summarized_count:]) + list(recent)
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation: {summary}")
+        if verbatim:
+            parts.append(format_chat_history(verbatim))
+        text = "\n".join(parts)
+
+        tokens = estimate_tokens(text)
+        with memory._lock:
+            memory.turns += 1
+            memory.history_tokens += tokens
+        with self._lock:
+            self.builds += 1
+            self.verbatim_messages += len(verbatim)
+            self.summarized_messages += summarized_count
+            self.tokens_sent += tokens
+        return {"text": text, "tokens": tokens, "verbatim": len(verbatim), "summarized": summarized_count}
+
+    def stats(self):
+        """
+        Report the history sent with the prompts built so far.
+
+        Returns:
+            dict: Number of histories built, messages sent verbatim and covered by the
+                summary, estimated tokens sent and failed summary folds
+        """
+        with self._lock:
+            return {
+                "builds": self.builds,
+                "verbatim_messages": self.verbatim_messages,
+                "summarized_messages": self.summarized_messages,
+                "tokens_sent": self.tokens_sent,
+                "summary_failures": self.summary_failures
+            }
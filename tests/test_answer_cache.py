@@ -0,0 +1,60 @@
+from langchain_core.documents import Document
+
+from src.promptConfig.AnswerCache import AnswerCache
+
+DOCS = [Document(page_content="Brasília is the capital of Brazil.", id="chunk-1")]
+
+
+def test_exact_hit_requires_same_question_source_and_history():
+    cache = AnswerCache()
+    cache.store("What is the capital?", "store", DOCS, 1, "Brasília", chat_history="User: Brazil")
+
+    assert cache.lookup("What is the capital?", "store", DOCS, 1, chat_history="User: Brazil") == "Brasília"
+    assert cache.lookup("What is the capital?", "store", DOCS, 1, chat_history="User: France") is None
+    assert cache.lookup("What is the capital?", "store", DOCS, 1) is None
+    assert cache.lookup("What is the capital?", "other store", DOCS, 1, chat_history="User: Brazil") is None
+
+
+def test_questions_differing_by_a_stop_word_do_not_share_an_answer():
+    cache = AnswerCache()
+    cache.store("is it safe", "internet:a", [], 0, "Yes")
+
+    assert cache.lookup("is it not safe", "internet:a", [], 0) is None
+
+
+def test_internet_answers_are_not_shared_across_sessions():
+    cache = AnswerCache()
+    cache.store("tell me more", "internet:session-a", [], 0, "More about A")
+
+    assert cache.lookup("tell me more", "internet:session-b", [], 0) is None
+
+
+def test_rebuilt_store_invalidates_answer():
+    cache = AnswerCache()
+    cache.store("What is the capital?", "store", DOCS, 1, "Brasília")
+
+    assert cache.lookup("What is the capital?", "store", DOCS, 2) is None
+    assert cache.stats()["invalidated"] == 1
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        # Orthogonal vectors for different texts, so there are no near-duplicate hits
+        return [1.0, 0.0] if len(self.calls) == 1 else [0.0, 1.0]
+
+
+def test_lookup_only_embeds_when_the_scope_has_entries():
+    embeddings = CountingEmbeddings()
+    cache = AnswerCache(embeddings=embeddings)
+
+    assert cache.lookup("What is the capital?", "store", DOCS, 1) is None
+    assert embeddings.calls == []
+
+    cache.store("What is the capital?", "store", DOCS, 1, "Brasília")
+    assert cache.lookup("What's the capital?", "store", DOCS, 1) is None
+    assert cache.lookup("What's the capital?", "other store", DOCS, 1) is None
+    assert embeddings.calls == ["What is the capital?", "What's the capital?"]
@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from src.interface.AsyncRunner import AsyncRunner
+
+
+def test_run_returns_the_result():
+    async def answer():
+        await asyncio.sleep(0.01)
+        return 42
+
+    assert AsyncRunner().run(answer()) == 42
+
+
+def test_timeout_cancels_the_coroutine():
+    runner = AsyncRunner()
+    state = {}
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    with pytest.raises(TimeoutError):
+        runner.run(slow(), timeout=0.1)
+    time.sleep(0.1)
+    assert state == {"cancelled": True}
+
+
+def test_iterate_times_out_on_a_stalled_stream():
+    runner = AsyncRunner()
+
+    async def stream():
+        yield "first"
+        await asyncio.sleep(5)
+        yield "never"
+
+    chunks = []
+    with pytest.raises(TimeoutError):
+        for chunk in runner.iterate(stream(), timeout=0.1):
+            chunks.append(chunk)
+    assert chunks == ["first"]
@@ -0,0 +1,13 @@
+from src.interface.chat.ChatRenderer import ChatRenderer
+
+
+def test_message_html_is_one_escaped_line_per_message():
+    fragment = ChatRenderer.message_html("AI", "First <b>paragraph</b>\n\nSecond\nline\n\n")
+
+    assert "\n" not in fragment
+    assert fragment == ('<div class="chat-message chat-ai"><p><strong>AI:</strong> '
+                        'First &lt;b&gt;paragraph&lt;/b&gt;</p><p>Second<br>line</p></div>')
+
+
+def test_user_messages_use_their_own_style():
+    assert ChatRenderer.message_html("User", "").startswith('<div class="chat-message chat-user">')
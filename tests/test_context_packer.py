@@ -0,0 +1,65 @@
+from langchain_core.documents import Document
+
+from src.promptConfig.ContextPacker import ContextPacker, estimate_tokens, format_chat_history, merge_overlap
+
+SHARED = "the splitter repeats this sentence at the end of one chunk and the start of the next."
+
+
+def chunk(doc_id, position, text):
+    return Document(page_content=text, metadata={"document_id": doc_id}, id=f"{doc_id}-{position}")
+
+
+def test_merge_overlap_drops_the_repeated_text():
+    assert merge_overlap(f"First part, {SHARED}", f"{SHARED} Second part.") == \
+        f"First part, {SHARED} Second part."
+    assert merge_overlap("Unrelated first chunk.", "Unrelated second chunk.") is None
+
+
+def test_adjacent_chunks_of_a_document_become_one_passage():
+    docs = [
+        chunk("doc", 1, f"{SHARED} Second part."),
+        chunk("other", 0, "A passage from another document."),
+        chunk("doc", 0, f"First part, {SHARED}"),
+    ]
+    packed = ContextPacker(token_budget=1000).pack(docs)
+
+    assert packed["passages"] == 2
+    # The merged passage keeps the best rank of its chunks, and the overlap appears once
+    assert packed["context"] == f"[1] First part, {SHARED} Second part.\n\n[2] A passage from another document."
+
+
+def test_metadata_is_left_out_and_tokens_are_saved():
+    docs = [chunk("doc", 0, "Short text.")]
+    packed = ContextPacker(token_budget=1000).pack(docs)
+
+    assert "document_id" not in packed["context"]
+    assert packed["tokens_saved"] == packed["raw_tokens"] - packed["tokens"] > 0
+
+
+def test_context_is_cut_to_the_token_budget():
+    sentences = " ".join(f"Sentence number {n} of a long passage." for n in range(200))
+    docs = [chunk("long", 0, sentences), chunk("later", 0, "Never reached. " * 40)]
+    packed = ContextPacker(token_budget=100).pack(docs)
+
+    assert packed["tokens"] <= 100 + 1
+    assert packed["passages"] == 1
+    # Truncation stops at a sentence boundary
+    assert packed["context"].endswith(".")
+    assert "Never reached." not in packed["context"]
+
+
+def test_stats_accumulate_over_calls():
+    packer = ContextPacker(token_budget=1000)
+    first = packer.pack([chunk("doc", 0, "Some text.")])
+    second = packer.pack([chunk("doc", 0, "Some other text.")])
+
+    assert packer.stats() == {
+        "calls": 2,
+        "tokens_sent": first["tokens"] + second["tokens"],
+        "tokens_saved": first["tokens_saved"] + second["tokens_saved"],
+    }
+
+
+def test_chat_history_is_rendered_as_lines():
+    assert format_chat_history([("user", "hi"), ("assistant", "hello")]) == "user: hi\nassistant: hello"
+    assert estimate_tokens("abcdefgh") == 2
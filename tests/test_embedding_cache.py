@@ -0,0 +1,81 @@
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from src.knowledgeBase import EmbeddingCache as embedding_cache
+from src.knowledgeBase.EmbeddingCache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    """Fake backend recording which texts reach it."""
+
+    model = "fake-model"
+
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(text)), -1.0]
+
+
+def test_only_misses_reach_the_backend(tmp_path):
+    backend = CountingEmbeddings()
+    embeddings = CachedEmbeddings(backend, EmbeddingCache(str(tmp_path / "cache.sqlite3")))
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma"])
+
+    assert backend.documents == ["alpha", "beta", "gamma"]
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    assert second == [[4.0, 1.0], [5.0, 1.0]]
+
+
+def test_models_and_queries_use_separate_key_spaces(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many("model-a", ["text"], [[1.0, 2.0]])
+
+    assert cache.get_many("model-a", ["text"]) == [[1.0, 2.0]]
+    assert cache.get_many("model-b", ["text"]) == [None]
+
+    backend = CountingEmbeddings()
+    embeddings = CachedEmbeddings(backend, cache)
+    embeddings.embed_documents(["same text"])
+    embeddings.embed_query("same text")
+    assert backend.queries == ["same text"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put_many("model", ["old"], [[1.0]])
+    time.sleep(0.01)
+    cache.put_many("model", ["recent"], [[2.0]])
+    time.sleep(0.01)
+    # The hit makes "old" the most recently used entry
+    assert cache.get_many("model", ["old"]) == [[1.0]]
+    time.sleep(0.01)
+
+    cache.put_many("model", ["new"], [[3.0]])
+
+    assert len(cache) == 2
+    assert cache.get_many("model", ["old", "recent", "new"]) == [[1.0], None, [3.0]]
+
+
+def test_hits_are_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "TOUCH_FLUSH_KEYS", 3)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many("model", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    writes = cache._conn.total_changes
+
+    for _ in range(10):
+        cache.get_many("model", ["a", "b"])
+    assert cache._conn.total_changes == writes
+
+    # The third pending key triggers one batched update of all three
+    cache.get_many("model", ["c"])
+    assert cache._conn.total_changes == writes + 3
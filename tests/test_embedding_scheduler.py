@@ -0,0 +1,83 @@
+import itertools
+import os
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.knowledgeBase.EmbeddingScheduler import EmbeddingScheduler
+
+_models = itertools.count()
+
+
+class FakeEmbeddings(Embeddings):
+    """Backend recording each request; fails on the texts in fail_on, or with 429 for the first throttled calls."""
+
+    def __init__(self, throttled=0, fail_on=()):
+        # Rate limiters are shared per model, so every fake gets its own
+        self.model = f"fake-{next(_models)}"
+        self.throttled = throttled
+        self.fail_on = set(fail_on)
+        self.requests = []
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        if self.throttled:
+            self.throttled -= 1
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+        if self.fail_on & set(texts):
+            raise ValueError("backend unavailable")
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text))]
+
+
+def scheduler(backend, tmp_path, **kwargs):
+    kwargs.setdefault("requests_per_minute", 60_000)
+    return EmbeddingScheduler(backend, base_delay=0.01, checkpoint_dir=str(tmp_path / "checkpoints"), **kwargs)
+
+
+def test_texts_are_sent_in_batches_and_returned_in_order(tmp_path):
+    backend = FakeEmbeddings()
+    texts = [f"text {n}" * (n + 1) for n in range(10)]
+    progress = []
+
+    vectors = scheduler(backend, tmp_path, batch_size=3).embed(texts, lambda done, total: progress.append(done))
+
+    assert sorted(len(request) for request in backend.requests) == [1, 3, 3, 3]
+    assert vectors == [[float(len(text))] for text in texts]
+    assert progress[0] == 0 and progress[-1] == 10
+
+
+def test_throttled_batches_back_off_and_retry(tmp_path):
+    backend = FakeEmbeddings(throttled=2)
+    embedder = scheduler(backend, tmp_path, batch_size=4, max_in_flight=1)
+
+    assert embedder.embed(["a", "bb"]) == [[1.0], [2.0]]
+    assert len(backend.requests) == 3
+    assert embedder.bucket.rate < embedder.bucket.max_rate
+
+
+def test_other_errors_are_not_retried(tmp_path):
+    backend = FakeEmbeddings(fail_on={"bad"})
+
+    with pytest.raises(ValueError):
+        scheduler(backend, tmp_path, batch_size=4).embed(["bad"])
+    assert len(backend.requests) == 1
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(tmp_path):
+    texts = [f"text {n}" for n in range(6)]
+    failing = FakeEmbeddings(fail_on={"text 4"})
+    with pytest.raises(ValueError):
+        scheduler(failing, tmp_path, batch_size=2, max_in_flight=1).embed(texts)
+    assert len(os.listdir(tmp_path / "checkpoints")) == 1
+
+    backend = FakeEmbeddings()
+    backend.model = failing.model
+    vectors = scheduler(backend, tmp_path, batch_size=2, max_in_flight=1).embed(texts)
+
+    # Only the batch that failed is embedded again
+    assert backend.requests == [["text 4", "text 5"]]
+    assert vectors == [[6.0]] * 6
+    assert os.listdir(tmp_path / "checkpoints") == []
@@ -0,0 +1,95 @@
+from src.promptConfig.HistoryWindow import ConversationMemory, HistoryWindow
+
+
+def conversation(turns):
+    messages = []
+    for n in range(turns):
+        messages += [("User", f"question {n}"), ("Assistant", f"answer {n}")]
+    return messages
+
+
+def summarize(summary, messages):
+    return " | ".join(filter(None, [summary] + [text for _, text in messages]))
+
+
+def wait_for_fold(memory):
+    pending = memory.pending
+    if pending is not None:
+        pending.result(timeout=5)
+
+
+def test_short_conversation_is_sent_verbatim():
+    window = HistoryWindow(summarize, keep_turns=2)
+    history = window.build(ConversationMemory(), conversation(2))
+
+    assert history["verbatim"] == 4
+    assert history["summarized"] == 0
+    assert history["text"] == "User: question 0\nAssistant: answer 0\nUser: question 1\nAssistant: answer 1"
+
+
+def test_older_turns_are_sent_verbatim_until_the_summary_is_ready():
+    window = HistoryWindow(lambda summary, messages: "never used", keep_turns=1)
+    memory = ConversationMemory()
+    memory.pending = object()  # A fold is already running, so none is started
+
+    history = window.build(memory, conversation(3))
+
+    assert history["verbatim"] == 6
+    assert "Summary" not in history["text"]
+
+
+def test_older_turns_are_replaced_by_the_summary():
+    window = HistoryWindow(summarize, keep_turns=1)
+    memory = ConversationMemory()
+    window.build(memory, conversation(3))
+    wait_for_fold(memory)
+
+    history = window.build(memory, conversation(3))
+
+    assert history["summarized"] == 4
+    assert history["verbatim"] == 2
+    assert history["text"] == ("Summary of the earlier conversation: question 0 | answer 0 | question 1 | answer 1\n"
+                               "User: question 2\nAssistant: answer 2")
+
+
+def test_summary_is_extended_with_newly_old_messages_only():
+    folded = []
+
+    def recording_summarize(summary, messages):
+        folded.append(messages)
+        return summarize(summary, messages)
+
+    window = HistoryWindow(recording_summarize, keep_turns=1)
+    memory = ConversationMemory()
+    window.build(memory, conversation(2))
+    wait_for_fold(memory)
+    window.build(memory, conversation(3))
+    wait_for_fold(memory)
+
+    assert folded == [conversation(1), conversation(2)[2:]]
+    assert memory.summarized_count == 4
+
+
+def test_failed_fold_keeps_messages_verbatim():
+    def failing_summarize(summary, messages):
+        raise RuntimeError("quota")
+
+    window = HistoryWindow(failing_summarize, keep_turns=1)
+    memory = ConversationMemory()
+    window.build(memory, conversation(2))
+    wait_for_fold(memory)
+
+    assert window.build(memory, conversation(2))["verbatim"] == 4
+    assert window.stats()["summary_failures"] >= 1
+
+
+def test_stats_are_running_totals():
+    window = HistoryWindow(summarize, keep_turns=5)
+    memory = ConversationMemory()
+    first = window.build(memory, conversation(1))
+    second = window.build(memory, conversation(2))
+
+    assert memory.stats()["turns"] == 2
+    assert memory.stats()["history_tokens"] == first["tokens"] + second["tokens"]
+    assert window.stats()["builds"] == 2
+    assert window.stats()["verbatim_messages"] == 6
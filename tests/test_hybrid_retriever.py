@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.documents import Document
+
+from src.knowledgeBase.HybridRetriever import HybridRetriever, reciprocal_rank_fusion
+from src.knowledgeBase.LexicalIndex import LexicalIndex
+
+CHUNKS = {
+    "lisbon": "Lisbon is the capital and largest city of Portugal.",
+    "brasilia": "Brasília is the federal capital of Brazil.",
+    "mercury": "Mercury is the smallest planet in the Solar System.",
+}
+
+
+class FakeDocstore:
+    def search(self, chunk_id):
+        if chunk_id not in CHUNKS:
+            return f"ID {chunk_id} not found."
+        return Document(page_content=CHUNKS[chunk_id], id=chunk_id)
+
+
+class FakeEmbeddings:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.delay)
+        return [0.0]
+
+
+class FakeVectorStore:
+    """Vector store whose similarity ranking is fixed, whatever the question."""
+
+    def __init__(self, ranking, delay=0.0):
+        self.ranking = ranking
+        self.docstore = FakeDocstore()
+        self.embedding_function = FakeEmbeddings(delay)
+
+    async def asimilarity_search_with_score_by_vector(self, embedding, k=4):
+        return [(self.docstore.search(chunk_id), 0.0) for chunk_id in self.ranking[:k]]
+
+
+@pytest.fixture
+def lexical_index():
+    index = LexicalIndex()
+    index.add(list(CHUNKS), list(CHUNKS.values()))
+    return index
+
+
+def search(retriever, store, lexical_index, question, k):
+    return asyncio.run(retriever.asearch(store, lexical_index, question, k=k))
+
+
+def test_fusion_rewards_items_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]])
+
+    assert [item_id for item_id, _ in fused] == ["b", "a", "d", "c"]
+
+
+def test_fusion_weights_scale_each_ranking():
+    fused = reciprocal_rank_fusion([["a"], ["b"]], weights=[1.0, 2.0], k=0)
+
+    assert fused == [("b", 2.0), ("a", 1.0)]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        HybridRetriever(mode="fuzzy")
+
+
+def test_vector_mode_ignores_the_lexical_index(lexical_index):
+    store = FakeVectorStore(["mercury", "brasilia", "lisbon"])
+    docs = search(HybridRetriever(mode="vector"), store, lexical_index, "capital of Portugal", k=1)
+
+    assert [doc.id for doc in docs] == ["mercury"]
+
+
+def test_lexical_mode_ranks_by_bm25(lexical_index):
+    store = FakeVectorStore(["mercury", "brasilia", "lisbon"])
+    docs = search(HybridRetriever(mode="lexical"), store, lexical_index, "capital of Portugal", k=1)
+
+    assert [doc.id for doc in docs] == ["lisbon"]
+
+
+def test_hybrid_mode_fuses_both_rankings(lexical_index):
+    store = FakeVectorStore(["brasilia", "mercury", "lisbon"])
+    docs = search(HybridRetriever(mode="hybrid"), store, lexical_index, "capital of Portugal", k=3)
+
+    # Brasília is first in one ranking and second in the other
+    assert [doc.id for doc in docs] == ["brasilia", "lisbon", "mercury"]
+
+
+def test_hybrid_mode_without_lexical_index_uses_vectors(lexical_index):
+    store = FakeVectorStore(["mercury", "brasilia"])
+    docs = search(HybridRetriever(mode="hybrid"), store, None, "capital of Portugal", k=1)
+
+    assert [doc.id for doc in docs] == ["mercury"]
+
+
+def test_slow_embedding_falls_back_to_lexical_results(lexical_index):
+    store = FakeVectorStore(["mercury", "brasilia", "lisbon"], delay=0.5)
+    retriever = HybridRetriever(mode="hybrid", embedding_timeout=0.05)
+
+    started = time.perf_counter()
+    docs = search(retriever, store, lexical_index, "capital of Portugal", k=1)
+
+    assert [doc.id for doc in docs] == ["lisbon"]
+    assert time.perf_counter() - started < 0.4
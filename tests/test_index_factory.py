@@ -0,0 +1,47 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.knowledgeBase.IndexFactory import build_vector_store, fit_vector_store, index_kind
+from src.knowledgeBase.VectorStoreIO import load_store, save_store
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=32)
+
+
+def texts(start, stop):
+    return [f"chunk number {n}" for n in range(start, stop)]
+
+
+def test_empty_corpus_is_rejected():
+    with pytest.raises(ValueError):
+        build_vector_store([], EMBEDDINGS, index_type="sq8")
+
+
+def test_trained_index_is_retrained_after_the_corpus_doubles():
+    vector_store = build_vector_store(texts(0, 10), EMBEDDINGS, index_type="sq8")
+    assert vector_store.trained_vectors == 10
+
+    vector_store.add_texts(texts(10, 15))
+    assert fit_vector_store(vector_store, index_type="sq8") is vector_store
+
+    vector_store.add_texts(texts(15, 20))
+    refitted = fit_vector_store(vector_store, index_type="sq8")
+    assert refitted is not vector_store
+    assert index_kind(refitted.index) == "sq8"
+    assert refitted.trained_vectors == refitted.index.ntotal == 20
+
+
+def test_untrained_index_is_kept():
+    vector_store = build_vector_store(texts(0, 10), EMBEDDINGS, index_type="flat")
+    vector_store.add_texts(texts(10, 40))
+
+    assert fit_vector_store(vector_store, index_type="flat") is vector_store
+
+
+def test_training_size_survives_save_and_load(tmp_path):
+    vector_store = build_vector_store(texts(0, 10), EMBEDDINGS, index_type="sq8")
+    vector_store.add_texts(texts(10, 15))
+    save_store(vector_store, str(tmp_path / "store"))
+
+    loaded = load_store(str(tmp_path / "store"), EMBEDDINGS, mmap=False)
+    assert loaded.trained_vectors == 10
+    assert loaded.index.ntotal == 15
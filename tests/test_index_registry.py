@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+from src.knowledgeBase.IndexRegistry import IndexRegistry
+
+
+def write_store(path, text):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "index.faiss"), "w") as index_file:
+        index_file.write(text)
+
+
+def read_store(path):
+    with open(os.path.join(path, "index.faiss")) as index_file:
+        return index_file.read()
+
+
+def test_store_is_loaded_once_until_it_changes_on_disk(tmp_path):
+    registry = IndexRegistry()
+    path = str(tmp_path / "store")
+    write_store(path, "first")
+
+    assert registry.get(path, read_store) == "first"
+    assert registry.get(path, read_store) == "first"
+    assert registry.stats()["misses"] == 1
+
+    write_store(path, "second version")
+    assert registry.get(path, read_store) == "second version"
+    assert registry.stats()["misses"] == 2
+
+
+def test_invalidate_forces_a_reload_and_bumps_the_version(tmp_path):
+    registry = IndexRegistry()
+    path = str(tmp_path / "store")
+    write_store(path, "store")
+    loads = []
+
+    def loader(store_path):
+        loads.append(store_path)
+        return len(loads)
+
+    assert registry.get(path, loader) == 1
+    registry.invalidate(path)
+
+    assert registry.version(path) == 1
+    assert registry.get(path, loader) == 2
+
+
+def test_missing_store_returns_none(tmp_path):
+    assert IndexRegistry().get(str(tmp_path / "missing"), read_store) is None
+
+
+def test_slow_load_does_not_block_other_stores(tmp_path):
+    registry = IndexRegistry()
+    slow_path, fast_path = str(tmp_path / "slow"), str(tmp_path / "fast")
+    write_store(slow_path, "slow")
+    write_store(fast_path, "fast")
+    release = threading.Event()
+
+    def slow_loader(path):
+        release.wait(5)
+        return read_store(path)
+
+    slow = threading.Thread(target=registry.get, args=(slow_path, slow_loader))
+    slow.start()
+    time.sleep(0.1)
+
+    started = time.perf_counter()
+    assert registry.get(fast_path, read_store) == "fast"
+    assert time.perf_counter() - started < 1
+
+    release.set()
+    slow.join()
+
+
+def test_concurrent_misses_load_once(tmp_path):
+    registry = IndexRegistry()
+    path = str(tmp_path / "store")
+    write_store(path, "store")
+    loads = []
+
+    def loader(store_path):
+        loads.append(store_path)
+        time.sleep(0.2)
+        return read_store(store_path)
+
+    threads = [threading.Thread(target=registry.get, args=(path, loader)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+
+
+def test_least_recently_used_stores_are_evicted(tmp_path):
+    registry = IndexRegistry(max_stores=2)
+    paths = [str(tmp_path / name) for name in ("a", "b", "c")]
+    for path in paths:
+        write_store(path, os.path.basename(path))
+
+    registry.get(paths[0], read_store)
+    registry.get(paths[1], read_store)
+    registry.get(paths[0], read_store)
+    registry.get(paths[2], read_store)
+
+    assert registry.stats()["evictions"] == 1
+    assert registry.stats()["stores"] == 2
+    # "b" was the least recently used, so only it is loaded again
+    misses = registry.stats()["misses"]
+    registry.get(paths[0], read_store)
+    assert registry.stats()["misses"] == misses
+    registry.get(paths[1], read_store)
+    assert registry.stats()["misses"] == misses + 1
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from src.knowledgeBase.IngestionQueue import IngestionQueue
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while queue.get(job_id)["status"] in ("queued", "running"):
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return queue.get(job_id)
+
+
+@pytest.fixture
+def queue():
+    return IngestionQueue(max_workers=4)
+
+
+def test_job_result_and_progress_are_reported(queue):
+    def job_func(job, texts):
+        for done in range(1, len(texts) + 1):
+            job.report("embed", done, len(texts))
+        return len(texts)
+
+    state = wait_for(queue, queue.submit("pdf", "store", job_func, ["a", "b"]))
+
+    assert state["status"] == "done"
+    assert state["result"] == 2
+    assert state["progress"]["embed"] == (2, 2)
+
+
+def test_running_job_stops_at_its_next_report(queue):
+    started, reports = threading.Event(), []
+
+    def job_func(job):
+        started.set()
+        for done in range(100):
+            reports.append(done)
+            job.report("embed", done, 100)
+            time.sleep(0.01)
+
+    job_id = queue.submit("pdf", "store", job_func)
+    started.wait(5)
+    queue.cancel(job_id)
+
+    assert wait_for(queue, job_id)["status"] == "cancelled"
+    assert len(reports) < 100
+
+
+def test_cancelled_queued_job_never_starts(queue):
+    release, calls = threading.Event(), []
+    first = queue.submit("pdf", "store", lambda job: release.wait(5))
+    second = queue.submit("web", "store", lambda job: calls.append("second"))
+
+    queue.cancel(second)
+    release.set()
+
+    assert wait_for(queue, first)["status"] == "done"
+    assert wait_for(queue, second)["status"] == "cancelled"
+    assert calls == []
+
+
+def test_failures_are_recorded(queue):
+    def job_func(job):
+        raise ValueError("bad pdf")
+
+    state = wait_for(queue, queue.submit("pdf", "store", job_func))
+
+    assert state["status"] == "failed"
+    assert state["error"] == "bad pdf"
+
+
+def test_jobs_on_one_store_run_one_at_a_time(queue):
+    running, overlaps = [], []
+    lock = threading.Lock()
+
+    def job_func(job):
+        with lock:
+            running.append(job.id)
+            overlaps.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(job.id)
+
+    job_ids = [queue.submit(f"kind-{n}", "store", job_func) for n in range(3)]
+    for job_id in job_ids:
+        wait_for(queue, job_id)
+
+    assert max(overlaps) == 1
+
+
+def test_jobs_on_different_stores_run_in_parallel(queue):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def job_func(job):
+        # Only passes if both jobs are running at the same time
+        barrier.wait()
+
+    job_ids = [queue.submit("pdf", f"store-{n}", job_func) for n in range(2)]
+
+    assert [wait_for(queue, job_id)["status"] for job_id in job_ids] == ["done", "done"]
+
+
+def test_active_job_of_the_same_kind_is_reused(queue):
+    release = threading.Event()
+    first = queue.submit("pdf", "store", lambda job: release.wait(5))
+
+    assert queue.submit("pdf", "store", lambda job: None) == first
+    assert queue.active_job("pdf", "store") == first
+    release.set()
+    wait_for(queue, first)
+    assert queue.active_job("pdf", "store") is None
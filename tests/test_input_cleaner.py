@@ -0,0 +1,46 @@
+from src.interface.chat import InputCleaner as cleaner_module
+from src.interface.chat.InputCleaner import DEFAULT_STOP_WORDS, InputCleaner, get_stop_words, load_stop_words
+
+
+def test_shipped_lists_cover_both_languages():
+    words = load_stop_words()
+
+    assert {"the", "and", "de", "que", "não"} <= words
+    assert load_stop_words(("english",)) < words
+
+
+def test_stop_words_are_read_once_per_process(monkeypatch):
+    monkeypatch.setattr(cleaner_module, "_stop_words", None)
+    reads = []
+
+    def counting_load():
+        reads.append(1)
+        return frozenset({"the"})
+
+    monkeypatch.setattr(cleaner_module, "load_stop_words", counting_load)
+    InputCleaner().clean_input("the first question")
+    InputCleaner().clean_input("the second question")
+
+    assert reads == [1]
+    assert get_stop_words() == frozenset({"the"})
+
+
+def test_missing_lists_fall_back_to_defaults(monkeypatch, tmp_path):
+    monkeypatch.setattr(cleaner_module, "_stop_words", None)
+    monkeypatch.setattr(cleaner_module, "STOPWORDS_DIR", str(tmp_path / "missing"))
+
+    assert get_stop_words() == DEFAULT_STOP_WORDS
+
+
+def test_clean_input_keeps_question_structure():
+    cleaned = InputCleaner().clean_input("What is the capital of Portugal?! <b>Quick</b>")
+
+    assert cleaned == "what capital portugal?! bquickb"
+
+
+def test_clean_many_matches_clean_input():
+    cleaner = InputCleaner()
+    texts = ["Qual é a capital do Brasil?", "", "The SMALLEST planet"]
+
+    assert cleaner.clean_many(texts) == [cleaner.clean_input(text) for text in texts]
+    assert cleaner.clean_many(iter(texts))[1] == ""
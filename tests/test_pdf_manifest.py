@@ -0,0 +1,80 @@
+import io
+import os
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.knowledgeBase.EmbeddingCache import CachedEmbeddings, EmbeddingCache
+from src.knowledgeBase.LexicalIndex import LexicalIndex
+from src.knowledgeBase.PdfVectorHelper import MANIFEST_FILE, PdfVectorHelper
+
+
+def upload(name, text):
+    """Stand-in for a Streamlit upload whose "PDF" bytes are its text."""
+    pdf = io.BytesIO(text.encode())
+    pdf.name = name
+    return pdf
+
+
+@pytest.fixture
+def helper(tmp_path, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    helper = PdfVectorHelper()
+    helper.embeddings = CachedEmbeddings(DeterministicFakeEmbedding(size=16),
+                                         EmbeddingCache(str(tmp_path / "embeddings.sqlite3")))
+    helper.vector_store_path = str(tmp_path / "pdf_index")
+    extracted = []
+
+    def get_pdf_pages(pdf_docs, progress_callback=None):
+        for pdf in pdf_docs:
+            extracted.append(pdf.name)
+            yield pdf, 0, pdf.getvalue().decode()
+
+    monkeypatch.setattr(helper, "get_pdf_pages", get_pdf_pages)
+    helper.extracted = extracted
+    return helper
+
+
+def test_documents_are_keyed_by_content_hash(helper):
+    first = upload("a.pdf", "Alpha document text.")
+    renamed_copy = upload("copy of a.pdf", "Alpha document text.")
+
+    assert helper.get_document_id(first) == helper.get_document_id(renamed_copy)
+    assert helper.get_document_id(first) != helper.get_document_id(upload("b.pdf", "Beta document text."))
+    # Hashing leaves the upload readable from the start
+    assert first.read() == b"Alpha document text."
+
+
+def test_only_new_documents_are_extracted(helper):
+    alpha, beta = upload("a.pdf", "Alpha document text."), upload("b.pdf", "Beta document text.")
+
+    assert helper.sync_documents([alpha]) == (1, 0)
+    assert helper.sync_documents([alpha, beta]) == (1, 0)
+    assert helper.extracted == ["a.pdf", "b.pdf"]
+
+    manifest = helper.get_manifest()
+    assert {entry["name"] for entry in manifest.values()} == {"a.pdf", "b.pdf"}
+    assert helper.sync_documents([alpha, beta]) == (0, 0)
+
+
+def test_removing_a_document_deletes_only_its_chunks(helper):
+    alpha, beta = upload("a.pdf", "Alpha document text."), upload("b.pdf", "Beta document text.")
+    helper.sync_documents([alpha, beta])
+    beta_id = helper.get_document_id(beta)
+    beta_chunks = helper.get_manifest()[beta_id]["chunk_ids"]
+
+    assert helper.sync_documents([beta]) == (0, 1)
+
+    assert list(helper.get_manifest()) == [beta_id]
+    vector_store = helper._load_vector_store(helper.vector_store_path)
+    assert sorted(vector_store.index_to_docstore_id.values()) == sorted(beta_chunks)
+    assert helper.extracted == ["a.pdf", "b.pdf"]
+
+
+def test_manifest_and_lexical_index_live_in_the_generation(helper):
+    helper.sync_documents([upload("a.pdf", "Alpha document text.")])
+
+    assert sorted(os.listdir(helper.vector_store_path)) == ["CURRENT", "gen-1"]
+    generation = os.listdir(os.path.join(helper.vector_store_path, "gen-1"))
+    assert MANIFEST_FILE in generation and LexicalIndex.FILE_NAME in generation
+    assert LexicalIndex.load(helper.vector_store_path).search("alpha", k=1)
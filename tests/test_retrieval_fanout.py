@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from langchain_core.documents import Document
+
+from src.knowledgeBase.RetrievalFanout import RetrievalFanout
+
+
+def source(*texts, delay=0.0, error=None):
+    async def search(question):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return [Document(page_content=text, id=text) for text in texts]
+    return search
+
+
+def source_of(*docs):
+    async def search(question):
+        return list(docs)
+    return search
+
+
+def retrieve(fanout, sources, question):
+    return asyncio.run(fanout.aretrieve(sources, question))
+
+
+def test_rankings_of_all_sources_are_merged():
+    fanout = RetrievalFanout(timeout=5, k=4)
+    retrieval = retrieve(fanout, {"PDFs": source("p1", "p2"), "Web": source("w1", "w2")}, "question")
+
+    # The first passage of each source ties for best
+    assert {doc.page_content for doc in retrieval["docs"][:2]} == {"p1", "w1"}
+    assert [doc.metadata["retrieval_source"] for doc in retrieval["docs"]].count("Web") == 2
+    assert retrieval["sources"]["PDFs"]["status"] == "ok"
+
+
+def test_sources_are_queried_concurrently():
+    fanout = RetrievalFanout(timeout=5)
+    started = time.perf_counter()
+    retrieve(fanout, {name: source(name, delay=0.2) for name in ("a", "b", "c")}, "question")
+
+    assert time.perf_counter() - started < 0.5
+
+
+def test_slow_source_is_skipped_at_the_deadline():
+    fanout = RetrievalFanout(timeout=0.1)
+    started = time.perf_counter()
+    retrieval = retrieve(fanout, {"Fast": source("fast"), "Slow": source("slow", delay=1)}, "question")
+
+    assert time.perf_counter() - started < 0.5
+    assert retrieval["sources"]["Slow"]["status"] == "timeout"
+    assert [doc.page_content for doc in retrieval["docs"]] == ["fast"]
+
+
+def test_failing_source_does_not_affect_the_others():
+    fanout = RetrievalFanout(timeout=5)
+    retrieval = retrieve(fanout, {"Good": source("good"), "Bad": source(error=RuntimeError("index missing"))},
+                         "question")
+
+    assert retrieval["sources"]["Bad"] == {"status": "failed", "count": 0, "seconds": None,
+                                           "error": "index missing"}
+    assert [doc.page_content for doc in retrieval["docs"]] == ["good"]
+
+
+def test_source_documents_are_not_modified():
+    doc = Document(page_content="shared", id="shared", metadata={"source": "page"})
+    retrieve(RetrievalFanout(timeout=5), {"A": source_of(doc), "B": source("other")}, "question")
+
+    assert doc.metadata == {"source": "page"}
+
+
+def test_stats_count_outcomes_per_source():
+    fanout = RetrievalFanout(timeout=5)
+    retrieve(fanout, {"Good": source("good"), "Bad": source(error=RuntimeError("boom"))}, "question")
+    retrieve(fanout, {"Good": source("good", "more"), "Bad": source("recovered")}, "question")
+
+    stats = fanout.stats()
+    assert stats["calls"] == 2
+    assert stats["passages"] == 4
+    assert stats["sources"] == {"Good": {"ok": 2, "failed": 0, "timeout": 0},
+                                "Bad": {"ok": 1, "failed": 1, "timeout": 0}}
@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from src.knowledgeBase.IndexRegistry import index_registry
+from src.knowledgeBase.SessionStores import SessionStores
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return SessionStores(root=str(tmp_path / "stores"), idle_seconds=60)
+
+
+def age(stores, session_id, seconds):
+    """Pretend a session was last seen this many seconds ago."""
+    last_seen = os.path.join(stores.root, session_id, ".last_seen")
+    past = time.time() - seconds
+    os.utime(last_seen, (past, past))
+
+
+def test_each_session_gets_its_own_store_directory(stores):
+    first = stores.store_path("pdf_faiss_index", "session-a")
+    second = stores.store_path("pdf_faiss_index", "session-b")
+
+    assert first != second
+    assert first == os.path.join(stores.root, "session-a", "pdf_faiss_index")
+    assert stores.store_path("web_faiss_index", "session-a") != first
+
+
+def test_idle_sessions_are_collected(stores):
+    for session_id in ("idle", "active"):
+        stores.touch(session_id)
+        os.makedirs(stores.store_path("pdf_faiss_index", session_id))
+    age(stores, "idle", 120)
+
+    assert stores.collect_idle(force=True) == 1
+    assert sorted(os.listdir(stores.root)) == ["active"]
+
+
+def test_touch_keeps_a_session_alive(stores):
+    stores.touch("session")
+    age(stores, "session", 120)
+    stores.touch("session")
+
+    assert stores.collect_idle(force=True) == 0
+    assert os.listdir(stores.root) == ["session"]
+
+
+def test_collected_stores_are_dropped_from_the_registry(stores):
+    stores.touch("idle")
+    path = stores.store_path("pdf_faiss_index", "idle")
+    os.makedirs(path)
+    with open(os.path.join(path, "CURRENT"), "w") as current_file:
+        current_file.write("gen-1")
+    index_registry.get(path, lambda store_path: "loaded")
+    age(stores, "idle", 120)
+
+    stores.collect_idle(force=True)
+
+    assert os.path.abspath(path) not in {key[0] for key in index_registry._entries}
+
+
+def test_scans_are_throttled(stores):
+    stores.touch("idle")
+    age(stores, "idle", 120)
+    stores.collect_interval = 3600
+    stores._last_collect = time.time()
+
+    assert stores.collect_idle() == 0
+    assert stores.collect_idle(force=True) == 1
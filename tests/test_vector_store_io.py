@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.knowledgeBase.IndexFactory import build_vector_store
+from src.knowledgeBase.VectorStoreIO import CURRENT_FILE, load_store, migrate_legacy_store, save_store, sidecar_path
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=16)
+
+
+def store_of(texts):
+    return build_vector_store(texts, EMBEDDINGS, index_type="flat")
+
+
+def test_saves_switch_generations_and_keep_the_previous_one(tmp_path):
+    path = str(tmp_path / "store")
+    for n in range(3):
+        save_store(store_of([f"version {n}"]), path)
+
+    with open(os.path.join(path, CURRENT_FILE)) as current_file:
+        assert current_file.read() == "gen-3"
+    assert sorted(name for name in os.listdir(path) if name.startswith("gen-")) == ["gen-2", "gen-3"]
+
+    loaded = load_store(path, EMBEDDINGS)
+    assert loaded.similarity_search("version 2", k=1)[0].page_content == "version 2"
+
+
+def test_open_reader_keeps_its_pair_across_saves(tmp_path):
+    path = str(tmp_path / "store")
+    save_store(store_of(["old text"]), path)
+    reader = load_store(path, EMBEDDINGS)
+
+    save_store(store_of(["new text", "another new text"]), path)
+    save_store(store_of(["newest text"]), path)
+
+    assert [doc.page_content for doc in reader.similarity_search("old text", k=5)] == ["old text"]
+
+
+def test_legacy_pickled_store_needs_explicit_migration(tmp_path):
+    path = str(tmp_path / "store")
+    FAISS.from_texts(["pickled text"], EMBEDDINGS).save_local(path)
+
+    with pytest.raises(FileNotFoundError):
+        load_store(path, EMBEDDINGS)
+
+    assert migrate_legacy_store(path)
+    assert not os.path.exists(os.path.join(path, "index.pkl"))
+    assert load_store(path, EMBEDDINGS).similarity_search("pickled text", k=1)[0].page_content == "pickled text"
+    assert not migrate_legacy_store(path)
+
+
+def write_text(name, text):
+    def write(directory):
+        with open(os.path.join(directory, name), "w") as sidecar_file:
+            sidecar_file.write(text)
+    return write
+
+
+def test_sidecars_are_written_into_the_generation(tmp_path):
+    path = str(tmp_path / "store")
+    save_store(store_of(["first"]), path, sidecars={"notes.txt": write_text("notes.txt", "first")})
+    first_sidecar = sidecar_path(path, "notes.txt")
+
+    save_store(store_of(["second"]), path, sidecars={"notes.txt": write_text("notes.txt", "second")})
+
+    assert sidecar_path(path, "notes.txt") == os.path.join(path, "gen-2", "notes.txt")
+    with open(sidecar_path(path, "notes.txt")) as sidecar_file:
+        assert sidecar_file.read() == "second"
+    # The previous generation keeps the sidecar that matches its vectors
+    with open(first_sidecar) as sidecar_file:
+        assert sidecar_file.read() == "first"
+
+
+def test_sidecar_in_store_directory_is_read_until_next_save(tmp_path):
+    path = str(tmp_path / "store")
+    save_store(store_of(["text"]), path)
+    write_text("notes.txt", "old layout")(path)
+
+    assert sidecar_path(path, "notes.txt") == os.path.join(path, "notes.txt")
+
+    save_store(store_of(["text"]), path, sidecars={"notes.txt": write_text("notes.txt", "new layout")})
+    assert not os.path.exists(os.path.join(path, "notes.txt"))
+    assert sidecar_path(path, "notes.txt") == os.path.join(path, "gen-2", "notes.txt")
@@ -0,0 +1,95 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.knowledgeBase.WebFetcher import WebFetcher
+
+# Seconds every /slow/<n> page takes to answer
+SLOW_DELAY = 0.5
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves /page/<n>, /slow/<n> (after SLOW_DELAY), /hang (longer than any timeout) and /fail (500)."""
+
+    def do_GET(self):
+        self.server.user_agents.append(self.headers.get("User-Agent"))
+        if self.path.startswith("/slow/"):
+            time.sleep(SLOW_DELAY)
+        elif self.path == "/hang":
+            time.sleep(5)
+        elif self.path == "/fail":
+            self.send_error(500)
+            return
+
+        body = f"<html><head><title>{self.path}</title></head><body>Content of {self.path}</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    httpd.daemon_threads = True
+    httpd.user_agents = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_runs_pages_concurrently(server):
+    _, base = server
+    fetcher = WebFetcher(max_workers=8, per_host_limit=8)
+    urls = [f"{base}/slow/{n}" for n in range(8)]
+
+    started = time.perf_counter()
+    documents, failures = fetcher.fetch(urls)
+    elapsed = time.perf_counter() - started
+
+    assert failures == {}
+    assert [doc.metadata["source"] for doc in documents] == urls
+    # Sequential fetching would take 8 * SLOW_DELAY
+    assert elapsed < 3 * SLOW_DELAY
+
+
+def test_fetch_respects_per_host_limit(server):
+    _, base = server
+    fetcher = WebFetcher(max_workers=8, per_host_limit=2)
+
+    started = time.perf_counter()
+    documents, failures = fetcher.fetch([f"{base}/slow/{n}" for n in range(4)])
+    elapsed = time.perf_counter() - started
+
+    assert len(documents) == 4 and failures == {}
+    # Two at a time means at least two rounds
+    assert elapsed >= 2 * SLOW_DELAY
+
+
+def test_failing_and_timed_out_urls_do_not_affect_the_others(server):
+    _, base = server
+    fetcher = WebFetcher(timeout=0.5)
+    urls = [f"{base}/page/1", f"{base}/fail", f"{base}/hang", f"{base}/page/2"]
+
+    documents, failures = fetcher.fetch(urls)
+
+    assert [doc.metadata["source"] for doc in documents] == [f"{base}/page/1", f"{base}/page/2"]
+    assert "Content of /page/1" in documents[0].page_content
+    assert set(failures) == {f"{base}/fail", f"{base}/hang"}
+
+
+def test_shared_session_sends_browser_headers(server):
+    httpd, base = server
+    fetcher = WebFetcher()
+
+    fetcher.fetch([f"{base}/page/1"])
+
+    assert httpd.user_agents == [fetcher.session.headers["User-Agent"]]
+    assert not httpd.user_agents[0].startswith("python-requests")
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import wikipedia
+
+from src.knowledgeBase.WikiHelper import WikiCache, WikiHelper
+
+# Seconds every stubbed summary request takes
+SUMMARY_DELAY = 0.2
+
+
+class WikipediaStub:
+    """Local stand-in for the wikipedia API, recording every request."""
+
+    def __init__(self, pages, search_results):
+        self.pages = pages
+        self.search_results = search_results
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def search(self, query, results=10, suggestion=False):
+        with self._lock:
+            self.calls.append(("search", query))
+        return self.search_results.get(query, [])[:results]
+
+    def summary(self, title, sentences=0, auto_suggest=True):
+        with self._lock:
+            self.calls.append(("summary", title))
+        time.sleep(SUMMARY_DELAY)
+        page = self.pages.get(title)
+        if isinstance(page, Exception):
+            raise page
+        if page is None:
+            raise wikipedia.exceptions.PageError(pageid=title)
+        return page
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = WikipediaStub(
+        pages={
+            "Mercury (planet)": "Mercury is the smallest planet.",
+            "Mercury (element)": "Mercury is a chemical element.",
+            "Mercury": wikipedia.exceptions.DisambiguationError("Mercury", ["Mercury (planet)", "Mercury (element)"]),
+        },
+        search_results={"mercury": ["Mercury", "Mercury (planet)", "Mercury (element)"]},
+    )
+    monkeypatch.setattr(wikipedia, "search", stub.search)
+    monkeypatch.setattr(wikipedia, "summary", stub.summary)
+    return stub
+
+
+@pytest.fixture
+def helper(tmp_path):
+    return WikiHelper(cache=WikiCache(str(tmp_path / "wiki.sqlite3")))
+
+
+def test_failing_first_result_falls_back_to_the_next(stub, helper):
+    answer = helper.search_wikipedia("mercury")
+
+    assert answer.startswith("Closest Wikipedia match for 'mercury':\nMercury is the smallest planet.")
+    assert "- Mercury (element)" in answer
+
+
+def test_only_search_results_are_summarized(stub, helper):
+    helper.search_wikipedia("mercury")
+
+    assert sorted(title for kind, title in stub.calls if kind == "summary") == \
+        ["Mercury", "Mercury (element)", "Mercury (planet)"]
+
+
+def test_summaries_are_fetched_concurrently(stub, helper):
+    started = time.perf_counter()
+    helper.search_wikipedia("mercury")
+
+    # Three sequential summaries would take 3 * SUMMARY_DELAY
+    assert time.perf_counter() - started < 2 * SUMMARY_DELAY
+
+
+def test_repeated_question_is_served_from_the_cache(stub, helper, tmp_path):
+    first = helper.search_wikipedia("mercury")
+    stub.calls.clear()
+
+    # A new helper over the same file, as after a restart
+    restarted = WikiHelper(cache=WikiCache(str(tmp_path / "wiki.sqlite3")))
+    assert restarted.search_wikipedia("mercury") == first
+    assert stub.calls == []
+
+
+def test_no_results_makes_no_summary_requests(stub, helper):
+    answer = helper.search_wikipedia("nothing like this")
+
+    assert answer == "No Wikipedia entries found for 'nothing like this'. Please try a different search term."
+    assert stub.calls == [("search", "nothing like this")]
+
+
+def test_timeouts_are_not_cached(stub, helper):
+    stub.pages["Mercury (planet)"] = wikipedia.exceptions.HTTPTimeoutError("mercury")
+    helper.search_wikipedia("mercury")
+
+    stub.pages["Mercury (planet)"] = "Mercury is the smallest planet."
+    stub.calls.clear()
+    answer = helper.search_wikipedia("mercury")
+
+    assert "Mercury is the smallest planet." in answer
+    assert stub.calls == [("summary", "Mercury (planet)")]
+
+
+def test_expired_entries_are_fetched_again(stub, tmp_path):
+    helper = WikiHelper(cache=WikiCache(str(tmp_path / "wiki.sqlite3"), ttl_seconds=0))
+    helper.search_wikipedia("mercury")
+    stub.calls.clear()
+
+    helper.search_wikipedia("mercury")
+    assert ("search", "mercury") in stub.calls
+
+
+
+def test_expired_rows_are_purged_on_open_and_write(tmp_path):
+    path = str(tmp_path / "wiki.sqlite3")
+    cache = WikiCache(path)
+    cache.set("search:old", ["Old"])
+    assert len(cache) == 1
+
+    # Reopening with a shorter TTL drops the row that is now expired
+    time.sleep(0.01)
+    assert len(WikiCache(path, ttl_seconds=0)) == 0
+
+    cache = WikiCache(path, ttl_seconds=0.05)
+    cache.set("search:a", ["A"])
+    time.sleep(0.1)
+    cache.set("search:b", ["B"])
+    assert len(cache) == 1
+    assert cache.get("search:b") == ["B"]
+
+
+def test_entry_count_is_capped_oldest_first(tmp_path):
+    cache = WikiCache(str(tmp_path / "wiki.sqlite3"), max_entries=3)
+    for index in range(5):
+        cache.set(f"search:{index}", [index])
+        time.sleep(0.001)
+
+    assert len(cache) == 3
+    assert cache.get("search:0") is None
+    assert cache.get("search:1") is None
+    assert cache.get("search:4") == [4]
+
+
+def test_async_search_matches_sync(stub, helper):
+    assert asyncio.run(helper.asearch_wikipedia("mercury")) == helper.search_wikipedia("mercury")
+
+
+def test_search_documents_leaves_out_results_without_summary(stub, helper):
+    docs = asyncio.run(helper.asearch_documents("mercury"))
+
+    assert [doc.metadata["title"] for doc in docs] == ["Mercury (planet)", "Mercury (element)"]
@@ -0,0 +1,68 @@
+import xml.etree.ElementTree as ET
+
+from src.knowledgeBase import WikiOfflineIndex as offline
+
+PAGE = """<page><title>{title}</title><ns>{ns}</ns><revision><text>{text}</text></revision></page>"""
+ARTICLES = {
+    "Brasília": "Brasília is the federal capital of Brazil and seat of government of the Federal District.",
+    "Lisbon": "Lisbon is the capital and largest city of Portugal, on the northern bank of the Tagus.",
+    "Mercury": "Mercury is the smallest planet in the Solar System and the closest to the Sun.",
+}
+
+
+def write_dump(path, n_filler=0):
+    pages = [PAGE.format(title=title, ns=0, text=text) for title, text in ARTICLES.items()]
+    pages.append(PAGE.format(title="Talk:Lisbon", ns=1, text="Not an article, should be skipped entirely."))
+    pages += [PAGE.format(title=f"Filler {n}", ns=0, text=f"Filler article number {n} about nothing.")
+              for n in range(n_filler)]
+    path.write_text(f"<mediawiki>{''.join(pages)}</mediawiki>", encoding="utf-8")
+    return str(path)
+
+
+def test_iter_articles_skips_other_namespaces(tmp_path):
+    titles = [title for title, _ in offline.iter_articles(write_dump(tmp_path / "dump.xml"))]
+
+    assert titles == list(ARTICLES)
+
+
+def test_iter_articles_does_not_keep_parsed_pages(tmp_path, monkeypatch):
+    roots = []
+    iterparse = ET.iterparse
+
+    def recording_iterparse(source, events=None):
+        for event, element in iterparse(source, events=events):
+            if not roots:
+                roots.append(element)
+            yield event, element
+
+    monkeypatch.setattr(offline.ET, "iterparse", recording_iterparse)
+    assert len(list(offline.iter_articles(write_dump(tmp_path / "dump.xml", n_filler=50)))) == 53
+
+    # Cleared pages must not stay attached to the root
+    assert len(roots[0]) == 0
+
+
+def test_search_ranks_matching_article_first(tmp_path):
+    index_dir = tmp_path / "index"
+    assert offline.build_index(write_dump(tmp_path / "dump.xml", n_filler=20), str(index_dir), block_size=4) == 23
+
+    index = offline.WikiOfflineIndex(str(index_dir))
+    doc_id, _ = index.search("capital of Portugal", k=3)[0]
+
+    assert index.document(doc_id)["title"] == "Lisbon"
+    assert index.search("no such words here") == []
+
+
+def test_block_size_does_not_change_the_index(tmp_path):
+    dump = write_dump(tmp_path / "dump.xml", n_filler=10)
+    offline.build_index(dump, str(tmp_path / "one_run"), block_size=1000)
+    offline.build_index(dump, str(tmp_path / "many_runs"), block_size=3)
+
+    single = offline.WikiOfflineIndex(str(tmp_path / "one_run"))
+    spilled = offline.WikiOfflineIndex(str(tmp_path / "many_runs"))
+
+    assert (single.postings == spilled.postings).all()
+    assert (single.doc_lengths == spilled.doc_lengths).all()
+    assert (single.doc_offsets == spilled.doc_offsets).all()
+    assert single.avg_doc_length == spilled.avg_doc_length
+    assert len(single.doc_offsets) == single.n_docs == 13